@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import User, UserActivity
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -8,3 +8,9 @@ class CustomUserAdmin(UserAdmin):
     search_fields = ("username", "email")
     ordering = ("username",)
     
+
+@admin.register(UserActivity)
+class UserActivityAdmin(admin.ModelAdmin):
+    list_display = ("user", "bookmark_count", "visited_count", "photo_count", "review_count")
+    search_fields = ("user__username",)
+    readonly_fields = ("user", "bookmark_count", "visited_count", "photo_count", "review_count")
@@ -0,0 +1,27 @@
+from content.models import Photo, Review
+from interactions.models import Bookmark, Visited
+from .models import UserActivity
+
+
+def load_dashboard(user, limit=5):
+    """
+    The profile dashboard of ``user``: the four activity counts from their
+    ``UserActivity`` row, and the latest ``limit`` bookmarks, visits, photos
+    and reviews.
+
+    The counts cost one primary key lookup however long the history is. Each
+    list is a lazy ``LIMIT`` walk of a ``(user, newest first)`` index, so it
+    only reaches the database if the page shows it.
+    """
+    activity = UserActivity.objects.for_user(user)
+    return {
+        'activity': activity,
+        'bookmarks_count': activity.bookmark_count,
+        'visited_count': activity.visited_count,
+        'photos_count': activity.photo_count,
+        'reviews_count': activity.review_count,
+        'bookmarks': Bookmark.objects.filter(user=user).select_related('restaurant').order_by('-created_at')[:limit],
+        'visited': Visited.objects.filter(user=user).select_related('restaurant').order_by('-visited_on')[:limit],
+        'photos': Photo.objects.filter(uploaded_by=user).order_by('-uploaded_at')[:limit],
+        'reviews': Review.objects.filter(user=user).select_related('user').order_by('-created_at')[:limit],
+    }
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from accounts.models import UserActivity
+
+
+class Command(BaseCommand):
+    help = "Recount every user's bookmarks, visits, photos and reviews."
+
+    def handle(self, *args, **options):
+        count = UserActivity.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt activity counters for {count} users."))
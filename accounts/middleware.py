@@ -1,17 +1,35 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction
 from django.utils import timezone
-from zoneinfo import ZoneInfo
+from myrestaurant.middleware import AsyncCapableMiddleware
+from .timezones import get_zone
+
 
-class TimezoneMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+async def _loaded_user(user):
+    return user
 
+
+class TimezoneMiddleware(AsyncCapableMiddleware):
     def __call__(self, request):
-        if request.user.is_authenticated and getattr(request.user, "timezone", None):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.activate(request.user)
+        # The user is loaded now; async views awaiting auser() get it without a second query.
+        request.auser = partial(_loaded_user, request.user)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Resolved here once, for async views and the sync ones alike.
+        request.user = await request.auser()
+        self.activate(request.user)
+        return await self.get_response(request)
+
+    def activate(self, user):
+        if user.is_authenticated and getattr(user, "timezone", None):
             try:
-                timezone.activate(ZoneInfo(request.user.timezone))
+                timezone.activate(get_zone(user.timezone))
             except Exception:
                 timezone.deactivate()
         else:
             timezone.deactivate()
-
-        return self.get_response(request)
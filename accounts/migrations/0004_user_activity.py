@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_user_activity(apps, schema_editor):
+    UserActivity = apps.get_model('accounts', 'UserActivity')
+    sources = {
+        'bookmark_count': (apps.get_model('interactions', 'Bookmark'), 'user'),
+        'visited_count': (apps.get_model('interactions', 'Visited'), 'user'),
+        'photo_count': (apps.get_model('content', 'Photo'), 'uploaded_by'),
+        'review_count': (apps.get_model('content', 'Review'), 'user'),
+    }
+
+    activities = {}
+    for counter, (model, user_field) in sources.items():
+        rows = (
+            model.objects.order_by()
+            .filter(**{f'{user_field}__isnull': False})
+            .values_list(user_field)
+            .annotate(n=Count('pk'))
+        )
+        for user_id, n in rows:
+            activity = activities.setdefault(user_id, UserActivity(user_id=user_id))
+            setattr(activity, counter, n)
+
+    UserActivity.objects.bulk_create(activities.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_timezone'),
+        ('content', '0007_photo_uploader_index'),
+        ('interactions', '0002_interaction_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('bookmark_count', models.PositiveIntegerField(default=0)),
+                ('visited_count', models.PositiveIntegerField(default=0)),
+                ('photo_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'user activity',
+            },
+        ),
+        migrations.RunPython(backfill_user_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:31
+
+import accounts.timezones
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_activity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='timezone',
+            field=models.CharField(choices=accounts.timezones.timezone_choices, default='UTC', max_length=50),
+        ),
+    ]
@@ -1,14 +1,118 @@
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from zoneinfo import available_timezones
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F
+from .timezones import timezone_choices
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
 
     timezone = models.CharField(
     max_length=50,
-    choices=[(tz, tz) for tz in sorted(available_timezones())],
+    choices=timezone_choices,
     default="UTC"
     )
     
     REQUIRED_FIELDS = ['email']
+
+
+class UserActivityManager(models.Manager):
+    # Each counter and the rows it counts: (model label, field pointing at the user).
+    SOURCES = {
+        'bookmark_count': ('interactions.Bookmark', 'user'),
+        'visited_count': ('interactions.Visited', 'user'),
+        'photo_count': ('content.Photo', 'uploaded_by'),
+        'review_count': ('content.Review', 'user'),
+    }
+
+    def counter_for(self, model):
+        return next(counter for counter, (label, _) in self.SOURCES.items() if label == model._meta.label)
+
+    def for_user(self, user):
+        """``user``'s counters; all zero, and unsaved, if they have done nothing yet."""
+        return self.filter(user_id=user.pk).first() or self.model(user_id=user.pk)
+
+    def apply_change(self, user_id, **deltas):
+        """
+        Add ``deltas`` (``bookmark_count=1``, ``review_count=-1``, ...) to
+        ``user_id``'s counters in one statement. The row is created by the
+        first addition; removals alone never create it, so a user being
+        deleted isn't given a new one.
+        """
+        deltas = {counter: delta for counter, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        # Counters stop at zero; any that drifted are put right by rebuild().
+        if all(delta < 0 for delta in deltas.values()):
+            self.filter(user_id=user_id).update(**{
+                counter: models.Case(
+                    models.When(**{f'{counter}__lt': -delta}, then=0),
+                    default=F(counter) + delta,
+                )
+                for counter, delta in deltas.items()
+            })
+            return
+
+        meta = self.model._meta
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        counters = list(self.SOURCES)
+        columns = ', '.join(quote(column) for column in [meta.get_field('user').column, *counters])
+        placeholders = ', '.join(['%s'] * (len(counters) + 1))
+        updates = ', '.join(
+            f'{quote(counter)} = CASE WHEN {quote(counter)} + %s < 0 THEN 0 ELSE {quote(counter)} + %s END'
+            for counter in deltas
+        )
+        sql = (
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) VALUES ({placeholders}) '
+            f'ON CONFLICT ({quote(meta.get_field("user").column)}) DO UPDATE SET {updates}'
+        )
+        params = [user_id, *(max(deltas.get(counter, 0), 0) for counter in counters)]
+        for delta in deltas.values():
+            params += [delta, delta]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def rebuild(self):
+        """Recount every user's activity from the tables it counts."""
+        activities = {}
+        for counter, (label, user_field) in self.SOURCES.items():
+            rows = (
+                apps.get_model(label).objects.order_by()
+                .filter(**{f'{user_field}__isnull': False})
+                .values_list(user_field)
+                .annotate(n=Count('pk'))
+            )
+            for user_id, n in rows:
+                activity = activities.setdefault(user_id, self.model(user_id=user_id))
+                setattr(activity, counter, n)
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(activities.values(), batch_size=1000)
+        return len(activities)
+
+
+class UserActivity(models.Model):
+    """How many bookmarks, visits, photos and reviews a user has, kept current as they change."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='activity'
+    )
+    bookmark_count = models.PositiveIntegerField(default=0)
+    visited_count = models.PositiveIntegerField(default=0)
+    photo_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+
+    objects = UserActivityManager()
+
+    class Meta:
+        verbose_name_plural = 'user activity'
+
+    def __str__(self):
+        return (
+            f"{self.user_id}: {self.bookmark_count} bookmarks, {self.visited_count} visited, "
+            f"{self.photo_count} photos, {self.review_count} reviews"
+        )
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from .models import UserActivity
+
+
+def _counter_receivers(counter, user_field):
+    attname = f'{user_field}_id'
+
+    def count_created(sender, instance, created, raw, **kwargs):
+        user_id = getattr(instance, attname)
+        if created and not raw and user_id is not None:
+            UserActivity.objects.apply_change(user_id, **{counter: 1})
+
+    def count_deleted(sender, instance, **kwargs):
+        user_id = getattr(instance, attname)
+        if user_id is not None:
+            UserActivity.objects.apply_change(user_id, **{counter: -1})
+
+    return count_created, count_deleted
+
+
+# Bulk writes that skip these signals (RestaurantMarkManager, seed_dataset)
+# update the counters themselves or rebuild them.
+for counter, (label, user_field) in UserActivity.objects.SOURCES.items():
+    model = apps.get_model(label)
+    count_created, count_deleted = _counter_receivers(counter, user_field)
+    post_save.connect(count_created, sender=model, weak=False, dispatch_uid=f'user_activity_{counter}_created')
+    post_delete.connect(count_deleted, sender=model, weak=False, dispatch_uid=f'user_activity_{counter}_deleted')
@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from restaurants.models import Restaurant
+from interactions.models import Bookmark, Visited
+from content.models import Review
+from myrestaurant.testing import QueryBudgetTestMixin
+
+User = get_user_model()
+
+class AccountsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    urlconf = 'accounts.urls'
+    query_budgets = {
+        'login': 0,
+        'register': 0,
+        'logout': 4,
+        'password_reset': 0,
+        'password_reset_done': 0,
+        'password_reset_confirm': 1,
+        'password_reset_complete': 0,
+        'profile': 5,
+        'edit_profile': 2,
+        'change_password': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="budget", email="budget@example.com", password="Strongpass123")
+        for i in range(6):
+            restaurant = Restaurant.objects.create(
+                name=f"Place {i}", city="Test City", address=f"{i} Street",
+                cost_for_two=500, veg_type="veg",
+            )
+            Bookmark.objects.create(user=self.user, restaurant=restaurant)
+            Visited.objects.create(user=self.user, restaurant=restaurant)
+            Review.objects.create(user=self.user, content_object=restaurant, rating=4)
+
+    def login(self):
+        self.client.login(username="budget", password="Strongpass123")
+
+    def test_anonymous_pages(self):
+        for name in ('login', 'register', 'password_reset', 'password_reset_done', 'password_reset_complete'):
+            with self.subTest(name=name):
+                self.assertWithinQueryBudget(self.client.get(reverse(f'accounts:{name}')))
+
+    def test_password_reset_confirm(self):
+        url = reverse('accounts:password_reset_confirm', args=['MQ', 'invalid-token'])
+        self.assertWithinQueryBudget(self.client.get(url))
+
+    def test_logout(self):
+        self.login()
+        self.assertWithinQueryBudget(self.client.post(reverse('accounts:logout')))
+
+    def test_profile_pages(self):
+        self.login()
+        for name in ('profile', 'edit_profile', 'change_password'):
+            with self.subTest(name=name):
+                self.assertWithinQueryBudget(self.client.get(reverse(f'accounts:{name}')))
@@ -0,0 +1,40 @@
+from django.test import RequestFactory, SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.choices import CallableChoiceIterator
+from accounts.middleware import TimezoneMiddleware
+from accounts.forms import ProfileUpdateForm
+from accounts.timezones import get_zone, timezone_choices
+
+User = get_user_model()
+
+
+class TimezoneChoicesTests(SimpleTestCase):
+    def test_choices_are_sorted_zone_names(self):
+        names = [name for name, _ in timezone_choices()]
+
+        self.assertIn("Asia/Kolkata", names)
+        self.assertEqual(names, sorted(names))
+        self.assertIs(timezone_choices(), timezone_choices())
+
+    def test_model_and_form_use_the_lazy_choices(self):
+        self.assertIsInstance(User._meta.get_field("timezone").choices, CallableChoiceIterator)
+        self.assertIn(("UTC", "UTC"), list(ProfileUpdateForm().fields["timezone"].choices))
+
+    def test_zones_are_shared(self):
+        self.assertIs(get_zone("Asia/Kolkata"), get_zone("Asia/Kolkata"))
+
+
+class TimezoneMiddlewareTests(SimpleTestCase):
+    def active_zone(self, zone):
+        request = RequestFactory().get("/")
+        request.user = User(username="zoned", timezone=zone)
+        middleware = TimezoneMiddleware(lambda request: HttpResponse(timezone.get_current_timezone_name()))
+        return middleware(request).content.decode()
+
+    def test_activates_the_users_zone(self):
+        self.assertEqual(self.active_zone("Asia/Kolkata"), "Asia/Kolkata")
+
+    def test_unknown_zone_falls_back_to_the_default(self):
+        self.assertEqual(self.active_zone("Mars/Olympus"), "UTC")
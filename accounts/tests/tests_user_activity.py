@@ -0,0 +1,128 @@
+import json
+import tempfile
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from accounts.models import UserActivity
+from restaurants.models import Restaurant
+from interactions.models import Bookmark, Visited
+from content.models import Photo, Review
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class UserActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="active", email="active@example.com", password="pass1234")
+        self.restaurants = [
+            Restaurant.objects.create(name=f"Place {i}", city="Pune", address=f"{i} Street", cost_for_two=500, veg_type="veg")
+            for i in range(3)
+        ]
+
+    def counts(self):
+        activity = UserActivity.objects.for_user(self.user)
+        return (activity.bookmark_count, activity.visited_count, activity.photo_count, activity.review_count)
+
+    def add_photo(self):
+        return Photo.objects.create(
+            content_object=self.restaurants[0], uploaded_by=self.user,
+            image=SimpleUploadedFile("p.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+        )
+
+    def test_new_users_have_zero_counts_without_a_row(self):
+        self.assertEqual(self.counts(), (0, 0, 0, 0))
+        self.assertFalse(UserActivity.objects.exists())
+
+    def test_saves_and_deletes_are_counted(self):
+        bookmark = Bookmark.objects.create(user=self.user, restaurant=self.restaurants[0])
+        Visited.objects.create(user=self.user, restaurant=self.restaurants[0])
+        photo = self.add_photo()
+        review = Review.objects.create(user=self.user, content_object=self.restaurants[0], rating=4)
+        self.assertEqual(self.counts(), (1, 1, 1, 1))
+
+        review.rating = 5
+        review.save()
+        bookmark.delete()
+        photo.delete()
+        self.assertEqual(self.counts(), (0, 1, 0, 1))
+
+    def test_bulk_marks_and_sync_are_counted(self):
+        Bookmark.objects.mark(self.user, [r.pk for r in self.restaurants])
+        Bookmark.objects.mark(self.user, [self.restaurants[0].pk])
+        Visited.objects.mark(self.user, [self.restaurants[1].pk])
+        Bookmark.objects.unmark(self.user, [self.restaurants[2].pk])
+        self.assertEqual(self.counts(), (2, 1, 0, 0))
+
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse("interactions:sync"),
+            json.dumps({"changes": [
+                {"type": "bookmark", "restaurant": self.restaurants[0].pk, "state": False},
+                {"type": "visited", "restaurant": self.restaurants[2].pk, "state": True},
+            ]}),
+            content_type="application/json",
+        )
+        self.assertEqual(self.counts(), (1, 2, 0, 0))
+
+    def test_review_upsert_counts_a_review_once(self):
+        content_type = ContentType.objects.get_for_model(Restaurant)
+        for rating in (3, 5):
+            Review.objects.upsert(self.user, content_type, self.restaurants[0].pk, rating)
+
+        self.assertEqual(self.counts(), (0, 0, 0, 1))
+
+    def test_counts_never_go_below_zero(self):
+        UserActivity.objects.apply_change(self.user.pk, bookmark_count=1)
+        UserActivity.objects.apply_change(self.user.pk, bookmark_count=-3, review_count=-1)
+
+        self.assertEqual(self.counts(), (0, 0, 0, 0))
+
+    def test_deleting_the_user_deletes_the_counts(self):
+        Bookmark.objects.create(user=self.user, restaurant=self.restaurants[0])
+        self.user.delete()
+
+        self.assertFalse(UserActivity.objects.exists())
+
+    def test_rebuild_recounts_from_the_tables(self):
+        Bookmark.objects.create(user=self.user, restaurant=self.restaurants[0])
+        self.add_photo()
+        UserActivity.objects.update(bookmark_count=7, photo_count=0)
+        Photo.objects.create(
+            content_object=self.restaurants[1], uploaded_by=None,
+            image=SimpleUploadedFile("q.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+        )
+
+        out = StringIO()
+        call_command("rebuild_user_activity", stdout=out)
+
+        self.assertIn("1 users", out.getvalue())
+        self.assertEqual(self.counts(), (1, 0, 1, 0))
+
+
+class ProfileDashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="diner", email="diner@example.com", password="pass1234")
+        self.client.force_login(self.user)
+
+    def test_profile_queries_do_not_grow_with_history(self):
+        def profile_queries():
+            # Session, user, counters, and the bookmarks and visits the page shows.
+            with self.assertNumQueries(5):
+                return self.client.get(reverse("accounts:profile"))
+
+        profile_queries()
+        for i in range(8):
+            restaurant = Restaurant.objects.create(name=f"Spot {i}", city="Pune", address="1 Street", cost_for_two=500, veg_type="veg")
+            Bookmark.objects.create(user=self.user, restaurant=restaurant)
+            Review.objects.create(user=self.user, content_object=restaurant, rating=4)
+        response = profile_queries()
+
+        self.assertEqual(response.context["bookmarks_count"], 8)
+        self.assertEqual(response.context["reviews_count"], 8)
+        self.assertEqual(len(response.context["bookmarks"]), 5)
+        self.assertEqual(response.context["bookmarks"][0].restaurant.name, "Spot 7")
@@ -0,0 +1,18 @@
+from functools import cache
+from zoneinfo import ZoneInfo, available_timezones
+
+
+@cache
+def timezone_choices():
+    """
+    Every IANA zone as ``(name, name)``, sorted. Finding them walks the
+    tzdata files, so it is done the first time a form or check needs them
+    rather than on import.
+    """
+    return [(name, name) for name in sorted(available_timezones())]
+
+
+@cache
+def get_zone(name):
+    """One shared ``ZoneInfo`` per zone name; raises like ``ZoneInfo`` for unknown ones."""
+    return ZoneInfo(name)
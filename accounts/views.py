@@ -9,8 +9,7 @@ from django.utils.decorators import method_decorator
 from .forms import RegisterForm, ProfileUpdateForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
-from interactions.models import Bookmark, Visited
-from content.models import Review, Photo
+from .dashboard import load_dashboard
 
 class RegisterView(FormView):
     template_name = "accounts/register.html"
@@ -43,42 +42,12 @@ class LogoutView(RedirectView):
 
 class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'accounts/profile.html'
+    read_from_replica = True
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-
-        sections = {
-            'bookmarks': self._get_bookmarks(user),
-            'visited': self._get_visited(user),
-            'photos': self._get_photos(user),
-            'reviews': self._get_reviews(user),
-        }
-
-        for name, qs in sections.items():
-            context[f"{name}_count"] = qs.count()
-            context[name] = qs[:5]
-
+        context.update(load_dashboard(self.request.user))
         return context
-    
-    def _get_bookmarks(self, user):
-        return Bookmark.objects.filter(user=user) \
-            .select_related('restaurant') \
-            .order_by('-created_at')
-
-    def _get_visited(self, user):
-        return Visited.objects.filter(user=user) \
-            .select_related('restaurant') \
-            .order_by('-visited_on')
-
-    def _get_photos(self, user):
-        return Photo.objects.filter(uploaded_by=user) \
-            .order_by('-uploaded_at')
-
-    def _get_reviews(self, user):
-        return Review.objects.filter(user=user) \
-            .select_related('user') \
-            .order_by('-created_at')
 
 class ProfileEditView(LoginRequiredMixin, UpdateView):
     form_class = ProfileUpdateForm
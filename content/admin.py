@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Review, Photo
+from .models import Review, Photo, PhotoRendition, RatingSummary
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -7,7 +7,23 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ("rating", "created_at")
     search_fields = ("user__username", "comment")
 
+class PhotoRenditionInline(admin.TabularInline):
+    model = PhotoRendition
+    extra = 0
+    can_delete = False
+    readonly_fields = ("size", "format", "image", "width", "height", "created_at")
+
 @admin.register(Photo)
 class PhotoAdmin(admin.ModelAdmin):
     list_display = ("uploaded_by", "content_type", "object_id", "image", "uploaded_at")
     list_filter = ("uploaded_at",)
+    inlines = (PhotoRenditionInline,)
+
+@admin.register(RatingSummary)
+class RatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ("content_type", "object_id", "average", "review_count", "updated_at")
+    list_filter = ("content_type",)
+    readonly_fields = (
+        "content_type", "object_id", "review_count", "rating_total", "average",
+        "stars_1", "stars_2", "stars_3", "stars_4", "stars_5",
+    )
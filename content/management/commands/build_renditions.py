@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from content.models import Photo
+from django.db import connection
+from content.renditions import RENDITION_FORMATS, RENDITION_SIZES, build_photo_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate missing card, gallery and full renditions for every photo."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.PHOTO_RENDITION_WORKERS,
+            help="Number of worker threads encoding images in parallel.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        expected = len(RENDITION_SIZES) * len(RENDITION_FORMATS)
+        photo_ids = (
+            Photo.objects
+            .annotate(rendition_count=Count("renditions"))
+            .filter(rendition_count__lt=expected)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for _ in pool.map(self.build, photo_ids.iterator(chunk_size=options["batch_size"])):
+                total += 1
+                if total % options["batch_size"] == 0:
+                    self.stdout.write(f"Processed {total} photos...")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} photos."))
+
+    def build(self, photo_id):
+        try:
+            build_photo_renditions(photo_id)
+        finally:
+            connection.close()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from content.models import RatingSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute every rating summary from the review table."
+
+    def handle(self, *args, **options):
+        count = RatingSummary.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rating summaries."))
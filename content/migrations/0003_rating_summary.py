@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_summaries(apps, schema_editor):
+    Review = apps.get_model('content', 'Review')
+    RatingSummary = apps.get_model('content', 'RatingSummary')
+
+    summaries = {}
+    rows = (
+        Review.objects.order_by()
+        .values('content_type_id', 'object_id', 'rating')
+        .annotate(n=Count('id'))
+    )
+    for row in rows:
+        key = (row['content_type_id'], row['object_id'])
+        summary = summaries.setdefault(key, RatingSummary(content_type_id=key[0], object_id=key[1]))
+        summary.review_count += row['n']
+        summary.rating_total += row['rating'] * row['n']
+        setattr(summary, f"stars_{row['rating']}", row['n'])
+
+    for summary in summaries.values():
+        summary.average = summary.rating_total / summary.review_count
+
+    RatingSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_review_unique_review_per_user_and_object'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'average'], name='ratingsummary_ct_avg_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_rating_summary_per_object')],
+            },
+        ),
+        migrations.RunPython(backfill_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_rating_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.CharField(choices=[('card', 'Card'), ('gallery', 'Gallery'), ('full', 'Full')], max_length=10)),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=4)),
+                ('image', models.ImageField(upload_to='renditions/')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('photo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='content.photo')),
+            ],
+            options={
+                'ordering': ['photo_id', 'width'],
+                'constraints': [models.UniqueConstraint(fields=('photo', 'size', 'format'), name='unique_rendition_per_photo_size_format')],
+            },
+        ),
+    ]
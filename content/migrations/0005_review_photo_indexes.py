@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_photo_rendition'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['content_type', 'object_id', 'id'], name='photo_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photorendition',
+            index=models.Index(fields=['photo', 'width'], name='rendition_photo_width_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['content_type', 'object_id', '-created_at'], name='review_object_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.signals import post_save
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 
 class ReviewManager(models.Manager):
@@ -11,6 +15,49 @@ class ReviewManager(models.Manager):
         ct = ContentType.objects.get_for_model(instance)
         return self.filter(content_type=ct, object_id=instance.pk)
 
+    def upsert(self, user, content_type, object_id, rating, comment=''):
+        """
+        Create or update ``user``'s review of the object and return it.
+
+        Whether the review is new, and the rating it replaces, are decided
+        inside the write: the existing row is read with ``select_for_update``
+        in the same transaction, and a first review is inserted in a
+        savepoint. If a concurrent request inserted it meanwhile, the insert
+        fails on the unique constraint and the now committed row is locked
+        and updated instead.
+
+        ``bulk_create`` and ``update`` send no signals, so this sends
+        ``post_save`` itself, with the previous rating the summary handler
+        would have read in ``pre_save``.
+        """
+        using = router.db_for_write(self.model)
+        reviews = self.db_manager(using).filter(user=user, content_type=content_type, object_id=object_id)
+        locked = reviews.select_for_update().values_list(
+            'pk', 'created_at', 'content_type_id', 'object_id', 'rating'
+        )
+        now = timezone.now()
+        review = self.model(
+            user=user, content_type=content_type, object_id=object_id,
+            rating=rating, comment=comment, created_at=now, updated_at=now,
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            previous = locked.first()
+            if previous is None:
+                try:
+                    with transaction.atomic(using=using):
+                        self.db_manager(using).bulk_create([review])
+                except IntegrityError:
+                    previous = locked.first()
+            if previous is not None:
+                review.pk, review.created_at = previous[:2]
+                reviews.filter(pk=review.pk).update(rating=rating, comment=comment, updated_at=now)
+            review._previous_rating = previous[2:] if previous else None
+            post_save.send(
+                sender=self.model, instance=review, created=previous is None,
+                update_fields=None, raw=False, using=using,
+            )
+        return review
+
 
 class Review(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -30,13 +77,21 @@ class Review(models.Model):
     objects = ReviewManager()
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'content_type', 'object_id'],
                 name='unique_review_per_user_and_object'
             )
         ]
+        indexes = [
+            # The review feed seeks on (created_at, id) newest first, optionally within one star rating.
+            models.Index(fields=['content_type', 'object_id', '-created_at', '-id'], name='review_object_feed_idx'),
+            models.Index(
+                fields=['content_type', 'object_id', 'rating', '-created_at', '-id'], name='review_object_rating_idx'
+            ),
+            models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} ({self.rating}★) on {self.content_object}"
@@ -62,6 +117,10 @@ class Photo(models.Model):
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'id'], name='photo_object_idx'),
+            models.Index(fields=['uploaded_by', '-uploaded_at'], name='photo_uploader_idx'),
+        ]
 
     def clean(self):
         if not self.content_object:
@@ -73,3 +132,192 @@ class Photo(models.Model):
 
     def __str__(self):
         return f"Photo for {self.content_object}"
+
+
+class PhotoRendition(models.Model):
+    SIZE_CHOICES = [
+        ('card', 'Card'),
+        ('gallery', 'Gallery'),
+        ('full', 'Full'),
+    ]
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+
+    photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name='renditions')
+    size = models.CharField(max_length=10, choices=SIZE_CHOICES)
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    image = models.ImageField(upload_to='renditions/')
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['photo_id', 'width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['photo', 'size', 'format'],
+                name='unique_rendition_per_photo_size_format'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['photo', 'width'], name='rendition_photo_width_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_size_display()} {self.get_format_display()} of photo {self.photo_id}"
+
+
+class RatingSummaryManager(models.Manager):
+    def for_instance(self, instance):
+        ct = ContentType.objects.get_for_model(instance)
+        return self.filter(content_type=ct, object_id=instance.pk)
+
+    def apply_change(self, content_type_id, object_id, added=None, removed=None):
+        """
+        Fold a review's rating into the summary (``added``), out of it
+        (``removed``), or both at once for an edited review, in one UPDATE.
+        """
+        if added == removed:
+            return
+
+        if added is not None:
+            self.get_or_create(content_type_id=content_type_id, object_id=object_id)
+
+        count_delta = (added is not None) - (removed is not None)
+        total_delta = (added or 0) - (removed or 0)
+        review_count = F('review_count') + count_delta
+        rating_total = F('rating_total') + total_delta
+
+        changes = {
+            'review_count': review_count,
+            'rating_total': rating_total,
+            'average': Coalesce(
+                Cast(rating_total, FloatField()) / NullIf(review_count, Value(0)),
+                Value(0.0),
+                output_field=FloatField(),
+            ),
+        }
+        if added is not None:
+            changes[f'stars_{added}'] = F(f'stars_{added}') + 1
+        if removed is not None:
+            changes[f'stars_{removed}'] = F(f'stars_{removed}') - 1
+
+        self.filter(content_type_id=content_type_id, object_id=object_id).update(**changes)
+
+    def rebuild(self):
+        """Recompute every summary from the review table."""
+        summaries = {}
+        rows = (
+            Review.objects.order_by()
+            .values('content_type_id', 'object_id', 'rating')
+            .annotate(n=models.Count('id'))
+        )
+        for row in rows:
+            key = (row['content_type_id'], row['object_id'])
+            summary = summaries.setdefault(key, RatingSummary(content_type_id=key[0], object_id=key[1]))
+            summary.review_count += row['n']
+            summary.rating_total += row['rating'] * row['n']
+            setattr(summary, f"stars_{row['rating']}", row['n'])
+
+        for summary in summaries.values():
+            summary.average = summary.rating_total / summary.review_count
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(summaries.values(), batch_size=1000)
+        return len(summaries)
+
+
+class RatingSummary(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    average = models.FloatField(default=0)
+
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RatingSummaryManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'],
+                name='unique_rating_summary_per_object'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['content_type', 'average'], name='ratingsummary_ct_avg_idx'),
+        ]
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'stars_{star}') for star in range(1, 6)}
+
+    def __str__(self):
+        return f"{self.average:.1f}★ from {self.review_count} reviews on {self.content_object}"
+
+
+class CoverPhotoModel(models.Model):
+    """
+    Abstract base for objects that show a cover photo on cards.
+
+    The cover is the object's oldest photo, copied here by the Photo signals
+    so rendering a card needs no photo query.
+    """
+    cover_photo = models.ForeignKey(
+        Photo, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    cover_image = models.ImageField(upload_to='photos/', blank=True, editable=False)
+    cover_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    cover_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    COVER_FIELDS = ('cover_photo', 'cover_image', 'cover_width', 'cover_height')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # The cover columns belong to the Photo signals; a stale instance must not overwrite them.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COVER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def cover_fields(photo):
+        """Column values that make ``photo`` (or nothing, for ``None``) the cover."""
+        if photo is None:
+            return {'cover_photo': None, 'cover_image': '', 'cover_width': None, 'cover_height': None}
+        try:
+            width, height = photo.image.width, photo.image.height
+        except (OSError, ValueError):
+            width = height = None
+        return {
+            'cover_photo': photo,
+            'cover_image': photo.image.name,
+            'cover_width': width,
+            'cover_height': height,
+        }
+
+
+class RatedQuerySet(models.QuerySet):
+    """QuerySet for reviewable models exposing ``rating_summary`` as a GenericRelation."""
+
+    def with_rating(self):
+        return self.annotate(
+            avg_rating=Coalesce(F('rating_summary__average'), Value(0.0), output_field=FloatField()),
+            review_count=Coalesce(F('rating_summary__review_count'), Value(0)),
+        )
@@ -0,0 +1,142 @@
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection, transaction
+from PIL import Image, ImageOps
+
+from .models import Photo, PhotoRendition
+
+logger = logging.getLogger(__name__)
+
+RENDITION_SIZES = {
+    'card': (400, 300),
+    'gallery': (1024, 768),
+    'full': (1920, 1440),
+}
+
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Photos whose build is queued or running in this process.
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+
+
+def build_renditions(photo):
+    """Generate every missing size/format variant of ``photo`` and record it."""
+    existing = set(photo.renditions.values_list('size', 'format'))
+    missing = [
+        (size, fmt) for size in RENDITION_SIZES for fmt in RENDITION_FORMATS
+        if (size, fmt) not in existing
+    ]
+    if not missing:
+        return []
+
+    with photo.image.open('rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original = original.convert('RGB')
+
+    created = []
+    for size, fmt in missing:
+        variant = original.copy()
+        variant.thumbnail(RENDITION_SIZES[size], Image.Resampling.LANCZOS)
+
+        pil_format, options = RENDITION_FORMATS[fmt]
+        buffer = BytesIO()
+        variant.save(buffer, pil_format, **options)
+
+        rendition = PhotoRendition(photo=photo, size=size, format=fmt, width=variant.width, height=variant.height)
+        rendition.image.save(f'{photo.pk}/{size}.{fmt}', ContentFile(buffer.getvalue()), save=False)
+        try:
+            with transaction.atomic():
+                rendition.save()
+        except IntegrityError:
+            # Another process built this variant first; drop our copy of the file.
+            logger.info("Rendition %s/%s of photo %s already exists", size, fmt, photo.pk)
+            rendition.image.delete(save=False)
+            continue
+        created.append(rendition)
+    return created
+
+
+def build_photo_renditions(photo_id):
+    """Build one photo's renditions, logging instead of raising on unreadable images."""
+    try:
+        photo = Photo.objects.filter(pk=photo_id).first()
+        if photo is not None:
+            build_renditions(photo)
+    except (OSError, ValueError):
+        logger.warning("Could not build renditions for photo %s", photo_id, exc_info=True)
+    finally:
+        # Done or failed, a later render may queue the photo again.
+        with _scheduled_lock:
+            _scheduled.discard(photo_id)
+
+
+def _run_in_worker(photo_id):
+    try:
+        build_photo_renditions(photo_id)
+    except Exception:
+        # Nothing reads the future; without this the error would vanish with it.
+        logger.exception("Rendition build for photo %s failed", photo_id)
+    finally:
+        # Pool threads keep their own connection; don't leave it open between jobs.
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PHOTO_RENDITION_WORKERS,
+                thread_name_prefix='photo-renditions',
+            )
+        return _executor
+
+
+def schedule_renditions(photo_id):
+    """
+    Queue rendition generation for a photo once the current transaction commits.
+
+    A photo already queued or being built in this process isn't queued
+    again; with ``PHOTO_RENDITIONS_ASYNC`` off the work runs inline instead
+    of in the pool.
+    """
+    def submit():
+        # Claimed only once committed, so a rolled back transaction leaves nothing behind.
+        with _scheduled_lock:
+            if photo_id in _scheduled:
+                return
+            _scheduled.add(photo_id)
+        if settings.PHOTO_RENDITIONS_ASYNC:
+            _get_executor().submit(_run_in_worker, photo_id)
+        else:
+            build_photo_renditions(photo_id)
+
+    transaction.on_commit(submit)
+
+
+def attach_cover_renditions(objects):
+    """
+    Load the cover photo renditions of ``objects`` in one query and set them
+    as ``cover_renditions``, so cards can emit a srcset without photo queries.
+    """
+    objects = list(objects)
+    photo_ids = {obj.cover_photo_id for obj in objects if obj.cover_photo_id}
+    renditions = defaultdict(list)
+    if photo_ids:
+        for rendition in PhotoRendition.objects.filter(photo_id__in=photo_ids):
+            renditions[rendition.photo_id].append(rendition)
+    for obj in objects:
+        obj.cover_renditions = renditions.get(obj.cover_photo_id, [])
+    return objects
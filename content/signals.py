@@ -0,0 +1,88 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Review, RatingSummary, Photo, PhotoRendition, CoverPhotoModel
+from .renditions import schedule_renditions
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, raw, **kwargs):
+    instance._previous_rating = None
+    if instance.pk and not raw:
+        instance._previous_rating = (
+            Review.objects
+            .filter(pk=instance.pk)
+            .values_list('content_type_id', 'object_id', 'rating')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_summary_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    target = (instance.content_type_id, instance.object_id)
+    previous = getattr(instance, '_previous_rating', None)
+    removed = None
+
+    if previous:
+        if previous[:2] == target:
+            removed = previous[2]
+        else:
+            RatingSummary.objects.apply_change(*previous[:2], removed=previous[2])
+
+    RatingSummary.objects.apply_change(*target, added=instance.rating, removed=removed)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_summary_on_delete(sender, instance, **kwargs):
+    RatingSummary.objects.apply_change(
+        instance.content_type_id, instance.object_id, removed=instance.rating
+    )
+
+
+def _cover_model(content_type_id):
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is not None and issubclass(model, CoverPhotoModel):
+        return model
+    return None
+
+
+@receiver(post_save, sender=Photo)
+def set_cover_photo(sender, instance, created, raw, **kwargs):
+    model = _cover_model(instance.content_type_id)
+    if not created or raw or model is None:
+        return
+    model.objects.filter(pk=instance.object_id, cover_photo__isnull=True).update(
+        **CoverPhotoModel.cover_fields(instance)
+    )
+
+
+@receiver(post_delete, sender=Photo)
+def repair_cover_photo(sender, instance, **kwargs):
+    model = _cover_model(instance.content_type_id)
+    if model is None:
+        return
+    # SET_NULL has already cleared the cover if it pointed at this photo.
+    orphaned = model.objects.filter(pk=instance.object_id, cover_photo__isnull=True)
+    if not orphaned.exclude(cover_image='').exists():
+        return
+    replacement = (
+        Photo.objects
+        .filter(content_type_id=instance.content_type_id, object_id=instance.object_id)
+        .order_by('id')
+        .first()
+    )
+    orphaned.update(**CoverPhotoModel.cover_fields(replacement))
+
+
+@receiver(post_save, sender=Photo)
+def queue_photo_renditions(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        schedule_renditions(instance.pk)
+
+
+@receiver(post_delete, sender=PhotoRendition)
+def delete_rendition_file(sender, instance, **kwargs):
+    instance.image.delete(save=False)
@@ -34,6 +34,48 @@ document.addEventListener('DOMContentLoaded', function() {
 
     initStarRating();
 
+    async function loadMoreReviews(link) {
+        if (link.dataset.loading) return;
+        link.dataset.loading = 'true';
+        try {
+            const response = await fetch(link.href, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            link.outerHTML = await response.text();
+            observeMoreReviews();
+        } catch (error) {
+            console.error('Error loading reviews:', error);
+            delete link.dataset.loading;
+        }
+    }
+
+    // Infinite scroll: fetch the next page once its link comes into view.
+    const moreReviewsObserver = 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    moreReviewsObserver.unobserve(entry.target);
+                    loadMoreReviews(entry.target);
+                }
+            });
+        })
+        : null;
+
+    function observeMoreReviews() {
+        if (!moreReviewsObserver) return;
+        document.querySelectorAll('[data-review-feed-more]').forEach(link => moreReviewsObserver.observe(link));
+    }
+
+    observeMoreReviews();
+
+    document.body.addEventListener('click', (e) => {
+        const link = e.target.closest('[data-review-feed-more]');
+        if (!link) return;
+        e.preventDefault();
+        loadMoreReviews(link);
+    });
+
     document.body.addEventListener('submit', async (e) => {
         const reviewForm = e.target.closest('#review-form');
         if (!reviewForm) return;
@@ -63,6 +105,12 @@ document.addEventListener('DOMContentLoaded', function() {
             if (reviewsSection) {
                 reviewsSection.innerHTML = data.html;
                 initStarRating(reviewsSection);
+                observeMoreReviews();
+            }
+            if (data.rating && data.rating.count) {
+                document.querySelectorAll('[data-rating-average]').forEach(element => {
+                    element.textContent = `⭐ ${data.rating.average.toFixed(1)}`;
+                });
             }
 
         } catch (error) {
@@ -0,0 +1,66 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from content.renditions import RENDITION_SIZES, schedule_renditions
+
+register = template.Library()
+
+
+def _render(original, renditions, size, attrs):
+    by_format = {}
+    for rendition in sorted(renditions, key=lambda r: r.width):
+        by_format.setdefault(rendition.format, []).append(rendition)
+
+    jpegs = by_format.get('jpeg', [])
+    fallback = next((r for r in jpegs if r.size == size), None)
+    if fallback is None:
+        return format_html('<img src="{}"{}>', original.url, _attributes(attrs))
+
+    attrs = dict(attrs, width=fallback.width, height=fallback.height)
+    sizes = attrs.pop('sizes', f'{RENDITION_SIZES[size][0]}px')
+    webp = by_format.get('webp', [])
+    source = ''
+    if webp:
+        source = format_html('<source type="image/webp" srcset="{}" sizes="{}">', _srcset(webp), sizes)
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        source, fallback.image.url, _srcset(jpegs), sizes, _attributes(attrs),
+    )
+
+
+def _srcset(renditions):
+    return ', '.join(f'{r.image.url} {r.width}w' for r in renditions)
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
+
+
+@register.simple_tag
+def photo_img(photo, size, **attrs):
+    """
+    Render ``photo`` as a responsive ``<picture>`` at the given rendition size.
+
+    Photos without renditions yet fall back to the original file and get
+    their renditions queued, so the next request can serve them.
+    """
+    renditions = list(photo.renditions.all())
+    if not renditions:
+        schedule_renditions(photo.pk)
+    return _render(photo.image, renditions, size, attrs)
+
+
+@register.simple_tag
+def cover_img(obj, size, **attrs):
+    """
+    Render the cover photo of a ``CoverPhotoModel`` object.
+
+    Renditions are read from ``cover_renditions`` (see
+    ``attach_cover_renditions``); without it the original cover is used.
+    """
+    renditions = getattr(obj, 'cover_renditions', None)
+    if not renditions:
+        if renditions is not None and obj.cover_photo_id:
+            schedule_renditions(obj.cover_photo_id)
+        if obj.cover_width:
+            attrs = dict(attrs, width=obj.cover_width, height=obj.cover_height)
+    return _render(obj.cover_image, renditions or [], size, attrs)
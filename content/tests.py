@@ -1,9 +1,22 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import BytesIO
+from unittest import mock
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection
+from django.db.models import QuerySet
+from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from restaurants.templatetags.app_filters import form_action_url
 from restaurants.models import Restaurant, MenuItem, Cuisine
-from content.models import Review
+from content import renditions
+from content.models import Review, RatingSummary, Photo
 
 User = get_user_model()
 
@@ -97,6 +110,67 @@ class ReviewSystemTests(TestCase):
         self.assertEqual(review.rating, 5)
         self.assertEqual(review.comment, 'It was fantastic!')
     
+    def test_ajax_review_returns_the_fragment_and_rating(self):
+        self.login_user()
+        Review.objects.create(user=self.user, content_object=self.restaurant, rating=3)
+        url = reverse('restaurants:restaurant_detail', kwargs={'pk': self.restaurant.pk})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url, {'rating': 5, 'comment': 'Even better now'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['rating'], {'average': 5.0, 'count': 1})
+        self.assertIn('Even better now', data['html'])
+        self.assertIn('Edit Your Review', data['html'])
+        self.assertEqual(Review.objects.get().rating, 5)
+        # Nothing of the rest of the page, like its photos, cuisines or rated menu items.
+        self.assertFalse([
+            q for q in queries
+            if any(table in q['sql'] for table in ('content_photo', 'restaurants_cuisine', 'content_ratingsummary" ON'))
+        ])
+        self.assertLessEqual(len(queries), 12)
+
+    def test_ajax_review_errors_keep_the_rating(self):
+        self.login_user()
+        response = self.client.post(
+            reverse('restaurants:menu_item_detail', kwargs={'menu_id': self.menu_item.pk}),
+            {'rating': 9}, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        data = response.json()
+        self.assertEqual(data['status'], 'error')
+        self.assertEqual(data['rating'], {'average': 0.0, 'count': 0})
+        self.assertFalse(Review.objects.exists())
+
+    def test_upsert_moves_the_summary_by_the_change(self):
+        content_type = ContentType.objects.get_for_model(self.restaurant)
+        first = Review.objects.upsert(self.user, content_type, self.restaurant.pk, 2)
+        second = Review.objects.upsert(self.user, content_type, self.restaurant.pk, 4, 'Improved')
+
+        self.assertEqual(first.pk, second.pk)
+        summary = RatingSummary.objects.for_instance(self.restaurant).get()
+        self.assertEqual((summary.review_count, summary.average, summary.stars_2, summary.stars_4), (1, 4.0, 0, 1))
+
+    def test_upsert_updates_a_review_inserted_concurrently(self):
+        content_type = ContentType.objects.get_for_model(self.restaurant)
+        existing = Review.objects.create(user=self.user, content_object=self.restaurant, rating=2)
+        real_first = QuerySet.first
+        reads = []
+
+        def first(queryset):
+            # The locking read misses a review another request inserts just after it.
+            reads.append(queryset)
+            return None if len(reads) == 1 else real_first(queryset)
+
+        with mock.patch.object(QuerySet, 'first', first):
+            review = Review.objects.upsert(self.user, content_type, self.restaurant.pk, 4)
+
+        self.assertEqual(review.pk, existing.pk)
+        summary = RatingSummary.objects.for_instance(self.restaurant).get()
+        self.assertEqual((summary.review_count, summary.average, summary.stars_2, summary.stars_4), (1, 4.0, 0, 1))
+
     # --- Template and Filter Tests ---
     
     def test_form_action_url_filter(self):
@@ -123,3 +197,155 @@ class ReviewSystemTests(TestCase):
         self.assertContains(response, "testuser")
         self.assertContains(response, "4")
         self.assertContains(response, "A very good place!")
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username="user1", email="user1@example.com", password="password123")
+        self.user2 = User.objects.create_user(username="user2", email="user2@example.com", password="password123")
+        self.restaurant = Restaurant.objects.create(
+            name="Testaurant",
+            city="Test City",
+            address="123 Test Street",
+            cost_for_two=1000,
+            veg_type="veg"
+        )
+
+    def summary(self):
+        return RatingSummary.objects.for_instance(self.restaurant).get()
+
+    def test_summary_created_on_first_review(self):
+        Review.objects.create(user=self.user1, content_object=self.restaurant, rating=4)
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 1)
+        self.assertEqual(summary.rating_total, 4)
+        self.assertEqual(summary.average, 4.0)
+        self.assertEqual(summary.histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 0})
+
+    def test_summary_updated_on_edit(self):
+        review = Review.objects.create(user=self.user1, content_object=self.restaurant, rating=2)
+        Review.objects.create(user=self.user2, content_object=self.restaurant, rating=5)
+        review.rating = 4
+        review.save()
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 2)
+        self.assertEqual(summary.average, 4.5)
+        self.assertEqual(summary.stars_2, 0)
+        self.assertEqual(summary.stars_4, 1)
+
+    def test_summary_updated_on_delete(self):
+        review = Review.objects.create(user=self.user1, content_object=self.restaurant, rating=2)
+        Review.objects.create(user=self.user2, content_object=self.restaurant, rating=5)
+        review.delete()
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 1)
+        self.assertEqual(summary.average, 5.0)
+
+        Review.objects.all().delete()
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 0)
+        self.assertEqual(summary.average, 0.0)
+
+    def test_with_rating_annotation_reads_summary(self):
+        Review.objects.create(user=self.user1, content_object=self.restaurant, rating=3)
+        Review.objects.create(user=self.user2, content_object=self.restaurant, rating=4)
+        restaurant = Restaurant.objects.with_rating().get(pk=self.restaurant.pk)
+        self.assertEqual(restaurant.avg_rating, 3.5)
+        self.assertEqual(restaurant.review_count, 2)
+        self.assertEqual(self.restaurant.ratings, 3.5)
+
+    def test_rebuild_matches_incremental_summary(self):
+        Review.objects.create(user=self.user1, content_object=self.restaurant, rating=3)
+        Review.objects.create(user=self.user2, content_object=self.restaurant, rating=4)
+        RatingSummary.objects.all().delete()
+        RatingSummary.objects.rebuild()
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 2)
+        self.assertEqual(summary.average, 3.5)
+        self.assertEqual(summary.histogram, {1: 0, 2: 0, 3: 1, 4: 1, 5: 0})
+
+
+@override_settings(PHOTO_RENDITIONS_ASYNC=False, MEDIA_ROOT=tempfile.mkdtemp())
+class PhotoRenditionTests(TestCase):
+    def setUp(self):
+        renditions._scheduled.clear()
+        self.restaurant = Restaurant.objects.create(
+            name="Testaurant",
+            city="Test City",
+            address="123 Test Street",
+            cost_for_two=1000,
+            veg_type="veg"
+        )
+
+    def make_image(self, name="photo.jpg", size=(2400, 1600)):
+        buffer = BytesIO()
+        Image.new("RGB", size, color=(200, 80, 40)).save(buffer, "JPEG")
+        return SimpleUploadedFile(name=name, content=buffer.getvalue(), content_type="image/jpeg")
+
+    def test_renditions_built_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+
+        variants = {(r.size, r.format): (r.width, r.height) for r in photo.renditions.all()}
+        self.assertEqual(len(variants), 6)
+        self.assertEqual(variants[("card", "webp")], (400, 267))
+        self.assertEqual(variants[("full", "jpeg")], (1920, 1280))
+
+    def test_small_originals_are_not_upscaled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image(size=(300, 200)))
+        self.assertEqual({(r.width, r.height) for r in photo.renditions.all()}, {(300, 200)})
+
+    def test_photo_img_emits_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+        html = Template('{% load photo_tags %}{% photo_img photo "gallery" alt="Front" %}').render(
+            Context({"photo": photo})
+        )
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertRegex(html, r'<img src="[^"]*/gallery[^"]*\.jpeg"')
+        self.assertIn("400w", html)
+        self.assertIn('alt="Front"', html)
+
+    def test_missing_renditions_are_built_lazily(self):
+        photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+        self.assertFalse(photo.renditions.exists())
+        renditions._scheduled.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            html = Template('{% load photo_tags %}{% photo_img photo "card" %}').render(Context({"photo": photo}))
+        self.assertIn(photo.image.url, html)
+        self.assertEqual(photo.renditions.count(), 6)
+
+    def test_finished_and_failed_builds_can_be_queued_again(self):
+        with self.assertLogs("content.renditions", "WARNING"), self.captureOnCommitCallbacks(execute=True):
+            photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+            broken = Photo.objects.create(
+                content_object=self.restaurant,
+                image=SimpleUploadedFile("broken.jpg", b"not an image", content_type="image/jpeg"),
+            )
+        self.assertEqual(renditions._scheduled, set())
+
+        photo.renditions.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            renditions.schedule_renditions(photo.pk)
+        self.assertEqual(photo.renditions.count(), 6)
+        self.assertFalse(broken.renditions.exists())
+
+    def test_variant_built_concurrently_is_skipped(self):
+        photo = Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+
+        rendition_dir = default_storage.path(f"renditions/{photo.pk}")
+        files_before = set(os.listdir(rendition_dir)) if os.path.isdir(rendition_dir) else set()
+
+        with mock.patch.object(renditions.PhotoRendition, "save", side_effect=IntegrityError):
+            self.assertEqual(renditions.build_renditions(photo), [])
+        self.assertEqual(set(os.listdir(rendition_dir)), files_before)
+
+    def test_cover_renditions_attached_in_one_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Photo.objects.create(content_object=self.restaurant, image=self.make_image())
+        restaurants = list(Restaurant.objects.all())
+        with self.assertNumQueries(1):
+            renditions.attach_cover_renditions(restaurants)
+        self.assertEqual(len(restaurants[0].cover_renditions), 6)
@@ -1,3 +1,24 @@
-from django.shortcuts import render
+from django.contrib.contenttypes.models import ContentType
+from django.template.loader import render_to_string
+from .models import RatingSummary, Review
 
-# Create your views here.
+
+def render_reviews(request, obj, review_form):
+    """
+    Render ``partials/_reviews.html`` for ``obj`` on its own, with only the
+    queries the fragment needs, and return it with the object's rating
+    summary as ``(html, rating)``.
+    """
+    content_type = ContentType.objects.get_for_model(obj)
+    reviews = Review.objects.filter(content_type=content_type, object_id=obj.pk)
+    html = render_to_string(
+        "partials/_reviews.html",
+        {"object": obj, "review_form": review_form, "latest_reviews": reviews.select_related("user")[:3]},
+        request=request,
+    )
+    summary = RatingSummary.objects.filter(content_type=content_type, object_id=obj.pk).first()
+    rating = {
+        "average": round(summary.average, 2) if summary else 0.0,
+        "count": summary.review_count if summary else 0,
+    }
+    return html, rating
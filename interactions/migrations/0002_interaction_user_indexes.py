@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0001_initial'),
+        ('restaurants', '0006_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['user', '-created_at'], name='bookmark_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visited',
+            index=models.Index(fields=['user', '-visited_on'], name='visited_user_visited_idx'),
+        ),
+    ]
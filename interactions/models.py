@@ -1,16 +1,91 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import models
+from django.db import connections, models, router
+from django.utils import timezone
+from accounts.models import UserActivity
 from restaurants.models import Restaurant
 
 
+class RestaurantMarkManager(models.Manager):
+    """
+    Idempotent writes for the per-user restaurant marks (bookmarks, visits).
+
+    They bypass the model signals, so they keep the user's activity counters
+    up to date themselves.
+    """
+
+    def mark(self, user, restaurant_ids):
+        """
+        Give ``user`` a row for each of ``restaurant_ids`` in one
+        ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Rows that already
+        exist and ids without a restaurant are skipped; returns how many rows
+        were added.
+        """
+        restaurant_ids = list(restaurant_ids)
+        if not restaurant_ids:
+            return 0
+        meta = self.model._meta
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        stamp = next(field for field in meta.concrete_fields if getattr(field, 'auto_now_add', False))
+        restaurants = quote(Restaurant._meta.db_table)
+        columns = ', '.join(quote(column) for column in (
+            meta.get_field('user').column, meta.get_field('restaurant').column, stamp.column,
+        ))
+        placeholders = ', '.join(['%s'] * len(restaurant_ids))
+        sql = (
+            f'INSERT INTO {quote(meta.db_table)} ({columns}) '
+            f'SELECT %s, {restaurants}.{quote("id")}, %s FROM {restaurants} '
+            f'WHERE {restaurants}.{quote("id")} IN ({placeholders}) '
+            'ON CONFLICT DO NOTHING'
+        )
+        params = [user.pk, stamp.get_db_prep_value(timezone.now(), connection), *restaurant_ids]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            added = cursor.rowcount
+        UserActivity.objects.apply_change(user.pk, **{UserActivity.objects.counter_for(self.model): added})
+        return added
+
+    async def amark(self, user, restaurant_ids):
+        return await sync_to_async(self.mark)(user, restaurant_ids)
+
+    def unmark(self, user, restaurant_ids):
+        """Remove ``user``'s rows for ``restaurant_ids`` in one DELETE; returns how many there were."""
+        restaurant_ids = list(restaurant_ids)
+        if not restaurant_ids:
+            return 0
+        meta = self.model._meta
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        placeholders = ', '.join(['%s'] * len(restaurant_ids))
+        sql = (
+            f'DELETE FROM {quote(meta.db_table)} '
+            f'WHERE {quote(meta.get_field("user").column)} = %s '
+            f'AND {quote(meta.get_field("restaurant").column)} IN ({placeholders})'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, *restaurant_ids])
+            removed = cursor.rowcount
+        UserActivity.objects.apply_change(user.pk, **{UserActivity.objects.counter_for(self.model): -removed})
+        return removed
+
+    async def aunmark(self, user, restaurant_ids):
+        return await sync_to_async(self.unmark)(user, restaurant_ids)
+
+
 class Bookmark(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='bookmarks')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = RestaurantMarkManager()
+
     class Meta:
         unique_together = ('user', 'restaurant')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='bookmark_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} bookmarked {self.restaurant}"
@@ -21,9 +96,14 @@ class Visited(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='visited')
     visited_on = models.DateTimeField(auto_now_add=True)
 
+    objects = RestaurantMarkManager()
+
     class Meta:
         unique_together = ('user', 'restaurant')
         ordering = ['-visited_on']
+        indexes = [
+            models.Index(fields=['user', '-visited_on'], name='visited_user_visited_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} visited {self.restaurant}"
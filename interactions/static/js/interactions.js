@@ -2,15 +2,18 @@ import { showToast } from './toast.js';
 
 document.addEventListener('DOMContentLoaded', function() {
     async function sendAjaxRequest(form) {
-        const url = form.action;
-        const formData = new FormData(form);
+        // Ask for the state the user is looking for instead of a flip, so a
+        // double click or a retried request can't undo itself.
+        const url = form.dataset.stateUrl;
+        const method = form.dataset.active === 'true' ? 'DELETE' : 'PUT';
+        const csrfToken = form.querySelector('[name="csrfmiddlewaretoken"]').value;
 
         try {
             const response = await fetch(url, {
-                method: 'POST',
-                body: formData,
+                method: method,
                 headers: {
                     'X-Requested-With': 'XMLHttpRequest',
+                    'X-CSRFToken': csrfToken,
                 }
             });
             if (!response.ok) {
@@ -58,6 +61,7 @@ document.addEventListener('DOMContentLoaded', function() {
         );
 
         allButtons.forEach(btn => {
+            btn.closest('form').dataset.active = isBookmarked;
             const icon = btn.querySelector('i');
             if (icon) {
                 icon.classList.toggle('bi-bookmark-fill', isBookmarked);
@@ -73,12 +77,15 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function updateVisitedUI(button, isVisited) {
+        button.closest('form').dataset.active = isVisited;
         button.textContent = isVisited ? 'Visited' : 'Mark as Visited';
         button.classList.toggle('btn-success', isVisited);
         button.classList.toggle('btn-outline-secondary', !isVisited);
     }
 
-    document.querySelectorAll('form[action*="toggle"]').forEach(form => {
-        form.addEventListener('submit', handleFormSubmit);
+    document.body.addEventListener('submit', (event) => {
+        if (event.target.matches('form[action*="toggle"]')) {
+            handleFormSubmit(event);
+        }
     });
 });
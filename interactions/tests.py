@@ -3,6 +3,7 @@ from .models import Bookmark, Visited
 from restaurants.models import Restaurant
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from myrestaurant.testing import QueryBudgetTestMixin
 
 # Create your tests here.
 User = get_user_model()
@@ -127,3 +128,177 @@ class ToggleVisitedViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         visited_exists = Visited.objects.filter(user=self.user, restaurant=self.restaurant).exists()
         self.assertFalse(visited_exists)
+
+class InteractionsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    urlconf = 'interactions.urls'
+    query_budgets = {
+        'bookmark_list': 3,
+        'toggle_bookmark': 4,
+        'visited_list': 3,
+        'toggle_visited': 4,
+        'bookmark': 4,
+        'visited': 4,
+        'sync': 10,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='budget', password='pass1234')
+        for i in range(4):
+            self.restaurant = Restaurant.objects.create(
+                name=f'Place {i}', city='Test City', address=f'{i} Street',
+                cost_for_two=500, veg_type='veg',
+            )
+            Bookmark.objects.create(user=self.user, restaurant=self.restaurant)
+            Visited.objects.create(user=self.user, restaurant=self.restaurant)
+        self.client.login(username='budget', password='pass1234')
+
+    def test_bookmark_list(self):
+        self.assertWithinQueryBudget(self.client.get(reverse('interactions:bookmark_list')))
+
+    def test_visited_list(self):
+        self.assertWithinQueryBudget(self.client.get(reverse('interactions:visited_list')))
+
+    def test_toggle_bookmark(self):
+        url = reverse('interactions:toggle_bookmark', args=[self.restaurant.pk])
+        self.assertWithinQueryBudget(self.client.post(url))
+
+    def test_toggle_visited(self):
+        url = reverse('interactions:toggle_visited', args=[self.restaurant.pk])
+        self.assertWithinQueryBudget(self.client.post(url))
+
+    def test_bookmark(self):
+        url = reverse('interactions:bookmark', args=[self.restaurant.pk])
+        self.assertWithinQueryBudget(self.client.put(url))
+
+    def test_visited(self):
+        url = reverse('interactions:visited', args=[self.restaurant.pk])
+        self.assertWithinQueryBudget(self.client.delete(url))
+
+    def test_sync(self):
+        pks = list(Restaurant.objects.values_list('pk', flat=True))
+        changes = [
+            {'type': kind, 'restaurant': pk, 'state': pk % 2 == 0}
+            for kind in ('bookmark', 'visited') for pk in pks
+        ]
+        response = self.client.post(reverse('interactions:sync'), {'changes': changes}, content_type='application/json')
+        self.assertWithinQueryBudget(response)
+
+
+class AsyncInteractionViewsTests(TestCase):
+    """The async views served through the ASGI request path."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='asyncuser', email='async@example.com', password='pass1234')
+        self.restaurant = Restaurant.objects.create(
+            name='Async Place', city='Test City', address='1 Street', cost_for_two=500, veg_type='veg'
+        )
+        self.toggle_url = reverse('interactions:toggle_bookmark', args=[self.restaurant.pk])
+
+    async def test_toggle_adds_then_removes_the_bookmark(self):
+        await self.async_client.aforce_login(self.user)
+
+        first = await self.async_client.post(self.toggle_url)
+        self.assertEqual(first.json(), {'is_bookmarked': True, 'status': 'success'})
+        self.assertTrue(await Bookmark.objects.filter(user=self.user, restaurant=self.restaurant).aexists())
+
+        second = await self.async_client.post(self.toggle_url)
+        self.assertEqual(second.json(), {'is_bookmarked': False, 'status': 'success'})
+        self.assertFalse(await Bookmark.objects.filter(user=self.user).aexists())
+
+    async def test_toggle_of_a_missing_restaurant_is_404(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('interactions:toggle_visited', args=[self.restaurant.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(await Visited.objects.aexists())
+
+    async def test_anonymous_toggle_redirects_to_login(self):
+        response = await self.async_client.post(self.toggle_url)
+        self.assertRedirects(response, f'/accounts/login/?next={self.toggle_url}', fetch_redirect_response=False)
+
+    async def test_lists_render_the_users_restaurants(self):
+        await Visited.objects.acreate(user=self.user, restaurant=self.restaurant)
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('interactions:visited_list'))
+        self.assertContains(response, 'Async Place')
+        self.assertEqual(list(response.context['restaurants']), [self.restaurant])
+
+
+class RestaurantMarkViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='marker', email='marker@example.com', password='pass1234')
+        self.restaurant = Restaurant.objects.create(
+            name='Marked Place', city='Test City', address='1 Street', cost_for_two=500, veg_type='veg'
+        )
+        self.url = reverse('interactions:bookmark', args=[self.restaurant.pk])
+        self.client.force_login(self.user)
+
+    def test_put_and_delete_are_idempotent(self):
+        for _ in range(2):
+            response = self.client.put(self.url)
+            self.assertEqual(response.json(), {'is_bookmarked': True, 'status': 'success'})
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 1)
+
+        for _ in range(2):
+            response = self.client.delete(self.url)
+            self.assertEqual(response.json(), {'is_bookmarked': False, 'status': 'success'})
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_each_change_is_one_statement_plus_the_counter(self):
+        with self.assertNumQueries(2):
+            Bookmark.objects.mark(self.user, [self.restaurant.pk])
+        # Nothing changed, so there is no counter to update.
+        with self.assertNumQueries(1):
+            Bookmark.objects.mark(self.user, [self.restaurant.pk])
+        with self.assertNumQueries(2):
+            Bookmark.objects.unmark(self.user, [self.restaurant.pk])
+
+    def test_marking_a_missing_restaurant_is_404(self):
+        response = self.client.put(reverse('interactions:visited', args=[self.restaurant.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Visited.objects.exists())
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.put(self.url).status_code, 302)
+
+
+class SyncInteractionsViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='syncer', email='syncer@example.com', password='pass1234')
+        self.first, self.second = (
+            Restaurant.objects.create(name=name, city='Test City', address='1 Street', cost_for_two=500, veg_type='veg')
+            for name in ('First', 'Second')
+        )
+        Bookmark.objects.create(user=self.user, restaurant=self.second)
+        self.client.force_login(self.user)
+
+    def sync(self, changes):
+        return self.client.post(reverse('interactions:sync'), {'changes': changes}, content_type='application/json')
+
+    def test_applies_the_last_change_per_restaurant(self):
+        response = self.sync([
+            {'type': 'bookmark', 'restaurant': self.first.pk, 'state': True},
+            {'type': 'bookmark', 'restaurant': self.second.pk, 'state': False},
+            {'type': 'visited', 'restaurant': self.first.pk, 'state': True},
+            {'type': 'visited', 'restaurant': self.first.pk, 'state': False},
+            {'type': 'visited', 'restaurant': self.second.pk, 'state': True},
+            {'type': 'bookmark', 'restaurant': self.second.pk + 100, 'state': True},
+        ])
+
+        self.assertEqual(response.json(), {
+            'status': 'success',
+            'bookmark': {'added': 1, 'removed': 1},
+            'visited': {'added': 1, 'removed': 0},
+        })
+        self.assertEqual(list(Bookmark.objects.values_list('restaurant', flat=True)), [self.first.pk])
+        self.assertEqual(list(Visited.objects.values_list('restaurant', flat=True)), [self.second.pk])
+
+    def test_rejects_malformed_changes(self):
+        for changes in ('nope', [{'type': 'like', 'restaurant': self.first.pk, 'state': True}],
+                        [{'type': 'bookmark', 'restaurant': '1', 'state': True}]):
+            response = self.sync(changes)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['status'], 'error')
+        self.assertEqual(Bookmark.objects.count(), 1)
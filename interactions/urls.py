@@ -8,4 +8,7 @@ urlpatterns = [
     path('toggle_bookmark/<int:pk>/', views.ToggleBookmarkView.as_view(), name='toggle_bookmark'),
     path('visited/', views.VisitedListView.as_view(), name="visited_list" ),
     path('restaurant/<int:pk>/toggle_visited/', views.ToggleVisitedView.as_view(), name='toggle_visited'),
+    path('bookmark/<int:pk>/', views.BookmarkView.as_view(), name='bookmark'),
+    path('restaurant/<int:pk>/visited/', views.VisitedView.as_view(), name='visited'),
+    path('sync/', views.SyncInteractionsView.as_view(), name='sync'),
 ]
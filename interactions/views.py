@@ -1,15 +1,36 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
 from .models import Bookmark, Visited
 from django.views import View
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect
 from restaurants.models import Restaurant
 from django.db.models import Exists, OuterRef, Value, BooleanField
 from django.urls import reverse
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from content.renditions import attach_cover_renditions
+from myrestaurant.writes import serialized_write
 
 # Create your views here.
 
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """
+    ``LoginRequiredMixin`` for views with async handlers.
+
+    The user is loaded with ``auser()`` and stored on the request, so the
+    handler and any sync code it calls can read ``request.user`` without
+    querying from the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+
 class BookmarkAnnotationMixin:
     def annotate_with_bookmarks(self, queryset):
         if self.request.user.is_authenticated:
@@ -25,6 +46,20 @@ class BookmarkAnnotationMixin:
             is_bookmarked=Value(False, output_field=BooleanField())
         )
 
+    def mark_bookmarked(self, restaurants):
+        """Set ``is_bookmarked`` on already-loaded restaurants, e.g. ones read from cache."""
+        bookmarked_ids = set()
+        if self.request.user.is_authenticated:
+            bookmarked_ids = set(
+                Bookmark.objects.filter(
+                    user=self.request.user,
+                    restaurant__in=[restaurant.pk for restaurant in restaurants]
+                ).values_list('restaurant_id', flat=True)
+            )
+        for restaurant in restaurants:
+            restaurant.is_bookmarked = restaurant.pk in bookmarked_ids
+        return restaurants
+
 class VisitedAnnotationMixin:
     def annotate_with_visited(self, queryset):
         if self.request.user.is_authenticated:
@@ -42,46 +77,167 @@ class VisitedAnnotationMixin:
 
         return queryset
 
-class BookmarkListView(LoginRequiredMixin,BookmarkAnnotationMixin, ListView):
+class CoverRenditionsMixin:
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context[self.context_object_name] = attach_cover_renditions(context[self.context_object_name])
+        return context
+
+class AsyncListMixin:
+    """
+    A ``ListView.get`` that loads the list with the async ORM.
+
+    The context is still built by the sync mixins in a worker thread, and
+    Django renders the template response in one too.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [obj async for obj in self.get_queryset()]
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+
+async def _mark_restaurant(model, user, pk):
+    if not await model.objects.amark(user, [pk]):
+        # Nothing added: the row was already there, or there is no such restaurant.
+        if not await Restaurant.objects.filter(pk=pk).aexists():
+            raise Http404('No restaurant matches the given query.')
+
+
+@serialized_write
+async def mark_restaurant(model, user, pk):
+    await _mark_restaurant(model, user, pk)
+
+
+@serialized_write
+async def unmark_restaurant(model, user, pk):
+    await model.objects.aunmark(user, [pk])
+
+
+@serialized_write
+async def toggle_restaurant(model, user, pk):
+    """Add or remove ``user``'s ``model`` row for restaurant ``pk``; True if it now exists."""
+    if await model.objects.aunmark(user, [pk]):
+        return False
+    await _mark_restaurant(model, user, pk)
+    return True
+
+
+MARK_MODELS = {'bookmark': Bookmark, 'visited': Visited}
+MAX_SYNC_CHANGES = 500
+
+
+def parse_changes(body):
+    """
+    The final state per ``(type, restaurant)`` of a sync request's changes;
+    they are listed in the order they were made, so the last one wins.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise ValueError('The body must be JSON.')
+    changes = payload.get('changes') if isinstance(payload, dict) else None
+    if not isinstance(changes, list):
+        raise ValueError('"changes" must be a list.')
+    if len(changes) > MAX_SYNC_CHANGES:
+        raise ValueError(f'At most {MAX_SYNC_CHANGES} changes can be synced at once.')
+
+    states = {}
+    for change in changes:
+        if (
+            not isinstance(change, dict)
+            or change.get('type') not in MARK_MODELS
+            or type(change.get('restaurant')) is not int
+            or not isinstance(change.get('state'), bool)
+        ):
+            raise ValueError(
+                'Each change needs a "type" of bookmark or visited, an integer "restaurant" and a boolean "state".'
+            )
+        states[change['type'], change['restaurant']] = change['state']
+    return states
+
+
+@serialized_write
+def apply_changes(user, states):
+    """Apply ``parse_changes`` output with at most one INSERT and one DELETE per type."""
+    applied = {}
+    for name, model in MARK_MODELS.items():
+        added = model.objects.mark(user, [pk for (kind, pk), state in states.items() if kind == name and state])
+        removed = model.objects.unmark(user, [pk for (kind, pk), state in states.items() if kind == name and not state])
+        applied[name] = {'added': added, 'removed': removed}
+    return applied
+
+class BookmarkListView(AsyncLoginRequiredMixin, AsyncListMixin, BookmarkAnnotationMixin, CoverRenditionsMixin, ListView):
     model = Restaurant
     template_name = 'bookmark_list.html'
     context_object_name = 'restaurants'
+    read_from_replica = True
 
     def get_queryset(self):
-        queryset= Restaurant.objects.filter(bookmarks__user=self.request.user).distinct()
+        queryset= Restaurant.objects.filter(bookmarks__user=self.request.user).with_rating().distinct()
         return self.annotate_with_bookmarks(queryset)
 
-class ToggleBookmarkView(LoginRequiredMixin, View):
-    def post(self, request, pk):
-        restaurant = get_object_or_404(Restaurant, pk=pk)
-        bookmark, created = Bookmark.objects.get_or_create(
-            user=request.user,
-            restaurant=restaurant
-        )
-        if not created:
-            bookmark.delete()
-        return JsonResponse({'is_bookmarked': created, 'status': 'success'})
+class ToggleBookmarkView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk):
+        is_bookmarked = await toggle_restaurant(Bookmark, request.user, pk)
+        return JsonResponse({'is_bookmarked': is_bookmarked, 'status': 'success'})
 
-class VisitedListView(LoginRequiredMixin,BookmarkAnnotationMixin, ListView):
+class VisitedListView(AsyncLoginRequiredMixin, AsyncListMixin, BookmarkAnnotationMixin, CoverRenditionsMixin, ListView):
     model = Restaurant
     template_name = 'visited_restaurants_list.html'
     context_object_name = 'restaurants'
+    read_from_replica = True
 
     def get_queryset(self):
         queryset= (
             Restaurant.objects
             .filter(visited__user=self.request.user)
+            .with_rating()
             .order_by('-visited__visited_on')
             .distinct()
         )
         return self.annotate_with_bookmarks(queryset)
 
-class ToggleVisitedView(LoginRequiredMixin, View):
-    def post(self, request, pk):
-        restaurant = get_object_or_404(Restaurant, pk=pk)
-        visited_obj, created = Visited.objects.get_or_create(user=request.user, restaurant=restaurant)
+class ToggleVisitedView(AsyncLoginRequiredMixin, View):
+    async def post(self, request, pk):
+        is_visited = await toggle_restaurant(Visited, request.user, pk)
+        return JsonResponse({'is_visited': is_visited, 'status': 'success'})
+
+class RestaurantMarkView(AsyncLoginRequiredMixin, View):
+    """
+    PUT gives the user the ``model`` row for the restaurant and DELETE takes
+    it away, each in a single statement; repeating either changes nothing.
+    """
+    model = None
+    state_name = None
+
+    async def put(self, request, pk):
+        await mark_restaurant(self.model, request.user, pk)
+        return JsonResponse({self.state_name: True, 'status': 'success'})
+
+    async def delete(self, request, pk):
+        await unmark_restaurant(self.model, request.user, pk)
+        return JsonResponse({self.state_name: False, 'status': 'success'})
+
+class BookmarkView(RestaurantMarkView):
+    model = Bookmark
+    state_name = 'is_bookmarked'
+
+class VisitedView(RestaurantMarkView):
+    model = Visited
+    state_name = 'is_visited'
+
+class SyncInteractionsView(LoginRequiredMixin, View):
+    """
+    Apply the bookmark and visited changes a client made while offline.
 
-        if not created:
-            visited_obj.delete()
+    The JSON body is ``{"changes": [{"type": "bookmark", "restaurant": 3,
+    "state": true}, ...]}``; the changes are applied in one transaction.
+    """
 
-        return JsonResponse({'is_visited': created, 'status': 'success'})
+    def post(self, request):
+        try:
+            states = parse_changes(request.body)
+        except ValueError as error:
+            return JsonResponse({'status': 'error', 'error': str(error)}, status=400)
+        return JsonResponse({'status': 'success', **apply_changes(request.user, states)})
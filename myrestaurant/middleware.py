@@ -0,0 +1,162 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from myrestaurant.routers import REPLICA_ALIAS, reads_from, replica_configured, set_read_alias
+
+logger = logging.getLogger("myrestaurant.sql")
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class QueryMetrics:
+    def __init__(self):
+        self.statements = []
+        self.total = 0.0
+        self.slowest = None
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.statements.append(sql)
+            self.total += duration
+            if self.slowest is None or duration > self.slowest[0]:
+                self.slowest = (duration, sql)
+
+
+class AsyncCapableMiddleware:
+    """Base for middleware that runs natively under both WSGI and ASGI."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+class QueryMetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Count and time the SQL run by each request.
+
+    The totals go out as a ``Server-Timing`` header and one log line per
+    request, tagged with the resolved URL name; ``request.sql_metrics`` keeps
+    the statements for tests asserting query budgets.
+    """
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request.sql_metrics = QueryMetrics()
+        with self.measure(metrics):
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # The async ORM queries from a worker thread with its own connections,
+        # so the wrappers are installed there rather than on the event loop's.
+        metrics = request.sql_metrics = QueryMetrics()
+        stack = await sync_to_async(self.measure)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        # Headers go out before a streamed body is produced, so they only
+        # cover the view itself; the log line waits for the whole body.
+        slowest = metrics.slowest or (0.0, "")
+        response["Server-Timing"] = (
+            f'db;dur={metrics.total * 1000:.1f};desc="{metrics.count} queries", '
+            f"db-slowest;dur={slowest[0] * 1000:.1f}"
+        )
+        if response.streaming:
+            response.streaming_content = self.stream(request, response, response.streaming_content, metrics)
+        else:
+            self.log(request, response, metrics)
+        return response
+
+    def measure(self, metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return stack
+
+    def stream(self, request, response, content, metrics):
+        with self.measure(metrics):
+            yield from content
+        self.log(request, response, metrics)
+
+    def log(self, request, response, metrics):
+        slowest = metrics.slowest or (0.0, "")
+        match = request.resolver_match
+        logger.info(
+            "view=%s status=%s queries=%d sql_ms=%.1f slowest_ms=%.1f slowest_sql=%r",
+            match.view_name if match else "-",
+            response.status_code,
+            metrics.count,
+            metrics.total * 1000,
+            slowest[0] * 1000,
+            slowest[1][:200],
+            extra={
+                "view": match.view_name if match else None,
+                "queries": metrics.count,
+                "sql_ms": metrics.total * 1000,
+            },
+        )
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Serve the reads of replica-safe views from the read replica.
+
+    A view opts in with ``read_from_replica = True``; only its GET, HEAD and
+    OPTIONS requests use the replica, so form posts on the same view still
+    read the primary. A request that may have written sets a short-lived
+    cookie, and while it is present that browser reads from the primary,
+    so it sees its own writes before the replica catches up.
+    """
+
+    cookie_name = "read_primary"
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with reads_from(DEFAULT_DB_ALIAS):
+            response = self.get_response(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        with reads_from(DEFAULT_DB_ALIAS):
+            response = await self.get_response(request)
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS and replica_configured():
+            response.set_cookie(
+                self.cookie_name, "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view_class, "read_from_replica", False)
+            and self.cookie_name not in request.COOKIES
+            and replica_configured()
+        ):
+            set_read_alias(REPLICA_ALIAS)
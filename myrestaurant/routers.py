@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = "replica"
+
+_read_alias = ContextVar("read_alias", default=DEFAULT_DB_ALIAS)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def set_read_alias(alias):
+    """Send the rest of the current ``reads_from`` block's reads to ``alias``."""
+    _read_alias.set(alias)
+
+
+@contextmanager
+def reads_from(alias):
+    """Send the ORM reads made inside the block to ``alias``."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Route reads to the replica only while ``reads_from(REPLICA_ALIAS)`` is
+    active, which ``ReplicaRoutingMiddleware`` does for the read-only views.
+    Everything else, and every write, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,38 @@
+from importlib import import_module
+
+from django.core.cache import cache
+
+
+class QueryBudgetTestMixin:
+    """
+    Hold every route of ``urlconf`` to a maximum number of SQL queries.
+
+    ``query_budgets`` maps each URL name to its budget; a route without one
+    fails ``test_every_route_has_a_query_budget``, so new views cannot skip
+    the check. Counts come from ``QueryMetricsMiddleware`` and include the
+    session and user lookups of the request. A streamed body is consumed
+    first so its queries are counted too.
+    """
+
+    urlconf = None
+    query_budgets = {}
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_every_route_has_a_query_budget(self):
+        names = {pattern.name for pattern in import_module(self.urlconf).urlpatterns}
+        self.assertEqual(names, set(self.query_budgets))
+
+    def assertWithinQueryBudget(self, response):
+        if response.streaming:
+            response.getvalue()
+        request = response.wsgi_request
+        name = request.resolver_match.url_name
+        metrics = request.sql_metrics
+        self.assertLessEqual(
+            metrics.count,
+            self.query_budgets[name],
+            msg="%s ran %d queries:\n%s" % (name, metrics.count, "\n".join(metrics.statements)),
+        )
@@ -25,6 +25,7 @@ urlpatterns = [
     path("restaurants/", include('restaurants.urls', namespace='restaurants')),
     path('accounts/', include('accounts.urls', namespace='accounts')),
     path('interactions/', include('interactions.urls', namespace='interactions')),
+    path('api/', include('restaurants.api_urls', namespace='api')),
     path('', RedirectView.as_view(url='/restaurants/', permanent=True)),
 ]
 
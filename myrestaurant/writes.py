@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+_write_lock = threading.RLock()
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def serialized_write(func=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Run ``func`` as one short write transaction on ``using``.
+
+    On SQLite the transactions of this process go through one at a time, so
+    its threads queue here instead of contending for the file lock, and a
+    transaction that still finds the database locked by another process is
+    rolled back and retried with jittered exponential backoff. Other
+    backends just get the transaction.
+
+    A coroutine function is retried the same way, but the async ORM can hold
+    neither the lock nor a transaction: each of its statements commits on its
+    own, and the function must be safe to run again after any of them fails.
+    """
+    if func is None:
+        return functools.partial(serialized_write, using=using)
+    if iscoroutinefunction(func):
+        return _retried_coroutine(func, using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        sqlite = connections[using].vendor == "sqlite"
+        retries = settings.SQLITE_WRITE_RETRIES if sqlite else 0
+        for attempt in range(retries + 1):
+            try:
+                with _write_lock if sqlite else nullcontext(), transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == retries or not is_lock_error(error):
+                    raise
+            time.sleep(settings.SQLITE_WRITE_BACKOFF * 2 ** attempt * random.uniform(1, 2))
+
+    return wrapper
+
+
+def _retried_coroutine(func, using):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        retries = settings.SQLITE_WRITE_RETRIES if connections[using].vendor == "sqlite" else 0
+        for attempt in range(retries + 1):
+            try:
+                return await func(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == retries or not is_lock_error(error):
+                    raise
+            await asyncio.sleep(settings.SQLITE_WRITE_BACKOFF * 2 ** attempt * random.uniform(1, 2))
+
+    return wrapper
@@ -1,28 +1,122 @@
-from django.contrib import admin
-from django.db.models import Avg
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .imports import CatalogFileError, CatalogImporter, detect_format, read_records
 from .models import Cuisine, Restaurant, MenuItem
+from .page_cache import invalidate_restaurant_pages
+from .spotlight import invalidate_spotlight
 
 @admin.register(Cuisine)
 class CuisineAdmin(admin.ModelAdmin):
     list_display = ("name",)
     search_fields = ("name",)
 
+class CatalogImportForm(forms.Form):
+    restaurants = forms.FileField(
+        required=False, help_text="CSV or JSONL, upserted on external_id; JSONL may nest menu_items."
+    )
+    menu_items = forms.FileField(
+        required=False, help_text="CSV or JSONL with each item's restaurant external_id."
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        uploads = [cleaned_data.get(name) for name in ("restaurants", "menu_items")]
+        if not any(uploads):
+            raise forms.ValidationError("Choose at least one file.")
+        for upload in filter(None, uploads):
+            try:
+                detect_format(upload.name)
+            except ValueError as e:
+                raise forms.ValidationError(str(e))
+        return cleaned_data
+
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     list_display = ("name", "city", "cost_for_two", "avg_rating_display", "spotlight")
     list_filter = ("spotlight", "city", "veg_type")
-    search_fields = ("name", "city")
+    search_fields = ("name", "city", "external_id")
+    actions = ("add_to_spotlight", "remove_from_spotlight")
+    change_list_template = "admin/restaurants/restaurant/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_catalog_view),
+                name="restaurants_restaurant_import",
+            ),
+        ] + super().get_urls()
+
+    def import_catalog_view(self, request):
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            raise PermissionDenied
+
+        form = CatalogImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            importer = CatalogImporter()
+            try:
+                if form.cleaned_data["restaurants"]:
+                    importer.import_restaurants(self._records(form.cleaned_data["restaurants"]))
+                if form.cleaned_data["menu_items"]:
+                    importer.import_menu_items(self._records(form.cleaned_data["menu_items"]))
+            except CatalogFileError as e:
+                failure = e
+            else:
+                failure = None
+
+            summary = ", ".join(f"{count} {name}" for name, count in sorted(importer.stats.items()))
+            for error in importer.errors:
+                self.message_user(request, error, messages.WARNING)
+            if failure is None:
+                self.message_user(request, f"Import finished: {summary or 'nothing to do'}.")
+                return redirect("admin:restaurants_restaurant_changelist")
+            # Batches before the unreadable one are already committed.
+            form.add_error(None, f"{failure} Import stopped after: {summary or 'nothing'}.")
+
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title="Import restaurants and menus",
+            form=form,
+        )
+        return TemplateResponse(request, "admin/restaurants/restaurant/import_catalog.html", context)
+
+    def _records(self, upload):
+        # Decode as the upload is read, so large files are never held whole.
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        return read_records(stream, detect_format(upload.name))
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         
-        return qs.annotate(avg_rating= Avg("reviews__rating"))
+        return qs.with_rating()
 
     def avg_rating_display(self, obj):
         return round(obj.avg_rating or 0, 1)
     avg_rating_display.short_description = "Rating"
     avg_rating_display.admin_order_field = "avg_rating" 
 
+    @admin.action(description="Add selected restaurants to the spotlight")
+    def add_to_spotlight(self, request, queryset):
+        self.set_spotlight(queryset, True)
+
+    @admin.action(description="Remove selected restaurants from the spotlight")
+    def remove_from_spotlight(self, request, queryset):
+        self.set_spotlight(queryset, False)
+
+    def set_spotlight(self, queryset, spotlight):
+        ids = list(queryset.values_list("pk", flat=True))
+        Restaurant.objects.filter(pk__in=ids).update(spotlight=spotlight)
+        # update() skips the signals, so evict what they would have, as the importer does.
+        invalidate_spotlight()
+        invalidate_restaurant_pages(ids)
+
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ("name", "restaurant", "price", "cuisine")
@@ -0,0 +1,342 @@
+"""
+Read-only JSON endpoints over the catalog.
+
+Every resource has a table of ``ApiField``s. ``fields=`` (and
+``fields[<include>]=`` for included relations) picks the ones to return, and
+only the columns, annotations and prefetches those fields need are loaded.
+Responses carry a strong ETag built from the page cache versions, so a
+repeat poll is answered with 304 before any query runs.
+"""
+from collections import namedtuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse
+from django.views import View
+from django.views.decorators.http import condition
+
+from content.models import Photo, Review
+from restaurants.filters import RestaurantFilter
+from restaurants.models import Cuisine, MenuItem, Restaurant
+from restaurants.page_cache import (
+    CUISINES_TAG, LIST_TAG, MENU_ITEMS_TAG, menu_item_tag, page_version, restaurant_tag,
+)
+from restaurants.pagination import KeysetPaginator
+
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+# ``columns`` go to ``.only()``; ``rating`` fields need ``with_rating()``.
+ApiField = namedtuple("ApiField", ["columns", "value", "prefetch", "rating"], defaults=[(), None, None, False])
+
+
+def _attr(name):
+    return ApiField((name,), lambda obj: getattr(obj, name))
+
+
+def _isoformat(name):
+    def value(obj):
+        moment = getattr(obj, name)
+        return moment.isoformat() if moment else None
+    return ApiField((name,), value)
+
+
+def _image_url(name):
+    def value(obj):
+        image = getattr(obj, name)
+        return image.url if image else None
+    return ApiField((name,), value)
+
+
+_ID = ApiField(("id",), lambda obj: obj.pk)
+_URL = ApiField(("id",), lambda obj: obj.get_absolute_url())
+_AVG_RATING = ApiField(value=lambda obj: round(obj.avg_rating, 2), rating=True)
+_REVIEW_COUNT = ApiField(value=lambda obj: obj.review_count, rating=True)
+
+RESTAURANT_FIELDS = {
+    "id": _ID,
+    "external_id": _attr("external_id"),
+    "name": _attr("name"),
+    "description": _attr("description"),
+    "city": _attr("city"),
+    "address": _attr("address"),
+    "cost_for_two": _attr("cost_for_two"),
+    "veg_type": _attr("veg_type"),
+    "is_open": _attr("is_open"),
+    "opening_time": _isoformat("opening_time"),
+    "closing_time": _isoformat("closing_time"),
+    "spotlight": _attr("spotlight"),
+    "latitude": _attr("latitude"),
+    "longitude": _attr("longitude"),
+    # Only set when the list is filtered with ``near``.
+    "distance": ApiField(value=lambda obj: round(obj.distance, 3) if hasattr(obj, "distance") else None),
+    "cuisines": ApiField(value=lambda obj: [c.name for c in obj.cuisines.all()], prefetch="cuisines"),
+    "avg_rating": _AVG_RATING,
+    "review_count": _REVIEW_COUNT,
+    "cover_image": _image_url("cover_image"),
+    "updated_at": _isoformat("updated_at"),
+    "url": _URL,
+}
+RESTAURANT_DEFAULTS = (
+    "id", "name", "city", "cost_for_two", "veg_type", "cuisines",
+    "avg_rating", "review_count", "cover_image", "url",
+)
+
+MENU_ITEM_FIELDS = {
+    "id": _ID,
+    "restaurant": ApiField(("restaurant",), lambda obj: obj.restaurant_id),
+    "cuisine": ApiField(("cuisine",), lambda obj: obj.cuisine_id),
+    "name": _attr("name"),
+    "description": _attr("description"),
+    "price": _attr("price"),
+    "is_available": _attr("is_available"),
+    "avg_rating": _AVG_RATING,
+    "review_count": _REVIEW_COUNT,
+    "cover_image": _image_url("cover_image"),
+    "url": _URL,
+}
+MENU_ITEM_DEFAULTS = ("id", "name", "price", "is_available", "avg_rating", "review_count", "cover_image", "url")
+
+PHOTO_FIELDS = {
+    "id": _ID,
+    "image": _image_url("image"),
+    "uploaded_at": _isoformat("uploaded_at"),
+}
+PHOTO_DEFAULTS = ("id", "image")
+
+CUISINE_FIELDS = {
+    "id": _ID,
+    "name": _attr("name"),
+}
+CUISINE_DEFAULTS = ("id", "name")
+
+REVIEW_FIELDS = {
+    "id": _ID,
+    "user": ApiField(("user__username",), lambda obj: obj.user.username),
+    "rating": _attr("rating"),
+    "comment": _attr("comment"),
+    "created_at": _isoformat("created_at"),
+    "updated_at": _isoformat("updated_at"),
+}
+REVIEW_DEFAULTS = ("id", "user", "rating", "comment", "created_at")
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_fieldset(value, available, defaults, label="fields"):
+    """The names listed in a comma separated ``value``, or ``defaults`` when it is blank."""
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    if not names:
+        return list(defaults)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(f"Unknown {label}: {', '.join(unknown)}.")
+    return list(dict.fromkeys(names))
+
+
+def select(queryset, available, fields, *columns):
+    """Restrict ``queryset`` to what ``fields`` need: columns, ratings and prefetches."""
+    chosen = [available[name] for name in fields]
+    queryset = queryset.only("id", *columns, *(column for field in chosen for column in field.columns))
+    if any(field.rating for field in chosen) and "avg_rating" not in queryset.query.annotations:
+        queryset = queryset.with_rating()
+    prefetches = [field.prefetch for field in chosen if field.prefetch]
+    return queryset.prefetch_related(*prefetches) if prefetches else queryset
+
+
+def serialize(obj, available, fields):
+    return {name: available[name].value(obj) for name in fields}
+
+
+class ApiView(View):
+    """
+    Base for the JSON endpoints.
+
+    ``includes`` maps the relations a caller may ask for with ``include=`` to
+    their field table and defaults. Subclasses return the page cache tags
+    their payload depends on from ``get_etag_tags``.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    read_from_replica = True
+    available_fields = {}
+    default_fields = ()
+    includes = {}
+
+    def get_etag_tags(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.parse_fieldsets()
+            response = condition(etag_func=self.get_etag)(super().dispatch)(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": error.message}, status=error.status)
+        except Http404:
+            return JsonResponse({"error": "Not found."}, status=404)
+        return response
+
+    def parse_fieldsets(self):
+        query = self.request.GET
+        self.fields = parse_fieldset(query.get("fields"), self.available_fields, self.default_fields)
+        included = parse_fieldset(query.get("include"), self.includes, (), label="includes")
+        self.included_fields = {
+            name: parse_fieldset(
+                query.get(f"fields[{name}]"), self.includes[name][0], self.includes[name][1],
+                label=f"{name} fields",
+            )
+            for name in included
+        }
+
+    def get_etag(self, request, *args, **kwargs):
+        return page_version(request, self.get_etag_tags())
+
+    def prefetch_includes(self, queryset):
+        if "menu_items" in self.included_fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                "menu_items",
+                queryset=select(MenuItem.objects.all(), MENU_ITEM_FIELDS, self.included_fields["menu_items"], "restaurant"),
+            ))
+        if "photos" in self.included_fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                "photos",
+                queryset=select(
+                    Photo.objects.order_by("id"), PHOTO_FIELDS, self.included_fields["photos"],
+                    "content_type", "object_id",
+                ),
+            ))
+        return queryset
+
+    def serialize(self, obj):
+        data = serialize(obj, self.available_fields, self.fields)
+        for name, fields in self.included_fields.items():
+            data[name] = [serialize(related, self.includes[name][0], fields) for related in getattr(obj, name).all()]
+        return data
+
+    def get_page_size(self):
+        try:
+            size = int(self.request.GET.get("limit", PAGE_SIZE))
+        except ValueError:
+            raise ApiError("limit must be a number.")
+        if not 1 <= size <= MAX_PAGE_SIZE:
+            raise ApiError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+        return size
+
+    def paginate(self, queryset, sort_key):
+        paginator = KeysetPaginator(queryset, sort_key, self.get_page_size())
+        page = paginator.page(self.request.GET.get("cursor"))
+        return JsonResponse({
+            "data": [self.serialize(obj) for obj in page],
+            "next_cursor": page.next_cursor,
+        })
+
+
+class RestaurantApiMixin:
+    available_fields = RESTAURANT_FIELDS
+    default_fields = RESTAURANT_DEFAULTS
+    includes = {
+        "menu_items": (MENU_ITEM_FIELDS, MENU_ITEM_DEFAULTS),
+        "photos": (PHOTO_FIELDS, PHOTO_DEFAULTS),
+    }
+
+
+class RestaurantListApiView(RestaurantApiMixin, ApiView):
+    """Restaurants filtered and ordered like the HTML list, a keyset page at a time."""
+
+    def get_etag_tags(self):
+        tags = [LIST_TAG, CUISINES_TAG]
+        # Menu item ratings don't touch the list pages, so they have their own tag.
+        if "menu_items" in self.included_fields:
+            tags.append(MENU_ITEMS_TAG)
+        return tags
+
+    def get(self, request, *args, **kwargs):
+        filterset = RestaurantFilter(request.GET, queryset=Restaurant.objects.with_rating())
+        if not filterset.is_valid():
+            raise ApiError(filterset.errors.get_json_data())
+
+        sort_key = filterset.get_sort_key()
+        field = sort_key.lstrip("-")
+        # The cursor holds the sort value of the last row; keep it from being deferred.
+        sort_columns = [field] if field in ("name", "cost_for_two") else []
+        queryset = select(filterset.qs, self.available_fields, self.fields, *sort_columns)
+        return self.paginate(self.prefetch_includes(queryset), sort_key)
+
+
+class RestaurantDetailApiView(RestaurantApiMixin, ApiView):
+    def get_etag_tags(self):
+        return [restaurant_tag(self.kwargs["pk"]), CUISINES_TAG]
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.prefetch_includes(select(Restaurant.objects.all(), self.available_fields, self.fields))
+        restaurant = queryset.filter(pk=kwargs["pk"]).first()
+        if restaurant is None:
+            raise Http404
+        return JsonResponse({"data": self.serialize(restaurant)})
+
+
+class MenuItemDetailApiView(ApiView):
+    available_fields = MENU_ITEM_FIELDS
+    default_fields = MENU_ITEM_DEFAULTS
+    includes = {"photos": (PHOTO_FIELDS, PHOTO_DEFAULTS)}
+
+    def get_etag_tags(self):
+        return [menu_item_tag(self.kwargs["pk"]), CUISINES_TAG]
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.prefetch_includes(select(MenuItem.objects.all(), self.available_fields, self.fields))
+        menu_item = queryset.filter(pk=kwargs["pk"]).first()
+        if menu_item is None:
+            raise Http404
+        return JsonResponse({"data": self.serialize(menu_item)})
+
+
+class CuisineListApiView(ApiView):
+    available_fields = CUISINE_FIELDS
+    default_fields = CUISINE_DEFAULTS
+
+    def get_etag_tags(self):
+        return [CUISINES_TAG]
+
+    def get(self, request, *args, **kwargs):
+        cuisines = select(Cuisine.objects.all(), self.available_fields, self.fields)
+        return JsonResponse({"data": [self.serialize(cuisine) for cuisine in cuisines]})
+
+
+class ReviewListApiView(ApiView):
+    """Newest first reviews of one restaurant (``?restaurant=``) or menu item (``?menu_item=``)."""
+
+    available_fields = REVIEW_FIELDS
+    default_fields = REVIEW_DEFAULTS
+    targets = {
+        "restaurant": (Restaurant, restaurant_tag),
+        "menu_item": (MenuItem, menu_item_tag),
+    }
+
+    def get_target(self):
+        given = [(name, self.request.GET[name]) for name in self.targets if self.request.GET.get(name)]
+        if len(given) != 1:
+            raise ApiError("Pass exactly one of: restaurant, menu_item.")
+        name, pk = given[0]
+        if not pk.isdigit():
+            raise ApiError(f"{name} must be an id.")
+        return name, int(pk)
+
+    def get_etag_tags(self):
+        name, pk = self.get_target()
+        return [self.targets[name][1](pk)]
+
+    def get(self, request, *args, **kwargs):
+        name, pk = self.get_target()
+        content_type = ContentType.objects.get_for_model(self.targets[name][0])
+        queryset = Review.objects.filter(content_type=content_type, object_id=pk)
+        # A deferred user can't be joined, so only join it when the username is wanted.
+        if "user" in self.fields:
+            queryset = queryset.select_related("user")
+        queryset = select(queryset, self.available_fields, self.fields, "created_at")
+        return self.paginate(queryset, "-created_at")
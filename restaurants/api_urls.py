@@ -0,0 +1,12 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('restaurants/', api.RestaurantListApiView.as_view(), name='restaurant_list'),
+    path('restaurants/<int:pk>/', api.RestaurantDetailApiView.as_view(), name='restaurant_detail'),
+    path('menu-items/<int:pk>/', api.MenuItemDetailApiView.as_view(), name='menu_item_detail'),
+    path('cuisines/', api.CuisineListApiView.as_view(), name='cuisine_list'),
+    path('reviews/', api.ReviewListApiView.as_view(), name='review_list'),
+]
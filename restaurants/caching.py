@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache as default_cache
+
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _record(key, outcome):
+    # Counted per key family, e.g. "restaurants:page", not per individual key.
+    namespace = ":".join(key.split(":")[:2])
+    with _stats_lock:
+        _stats[namespace, outcome] += 1
+
+
+def get_stats():
+    """Hit, stale and miss counts of this process, as ``{namespace: {outcome: n}}``."""
+    with _stats_lock:
+        stats = {}
+        for (namespace, outcome), count in _stats.items():
+            stats.setdefault(namespace, {HIT: 0, STALE: 0, MISS: 0})[outcome] = count
+        return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=0, lock_wait=5, cache=None):
+    """
+    Return the cached value of ``key``, calling ``compute`` to fill it.
+
+    Values are fresh for ``timeout`` seconds and may then be served stale for
+    another ``stale_timeout`` seconds. Only the caller holding the key's lock
+    recomputes: while it works, others get the stale value, or, when there is
+    none, wait up to ``lock_wait`` seconds for it. A ``None`` from ``compute``
+    is returned but not stored.
+    """
+    cache = cache or default_cache
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            _record(key, HIT)
+            return value
+        if not cache.add(lock_key, True, LOCK_TIMEOUT):
+            _record(key, STALE)
+            return value
+    elif not cache.add(lock_key, True, LOCK_TIMEOUT):
+        deadline = time.monotonic() + lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                _record(key, HIT)
+                return entry[0]
+            if cache.get(lock_key) is None:
+                break
+        # The holder gave up or is too slow; compute without the lock rather than fail.
+        _record(key, MISS)
+        return _compute(cache, key, compute, timeout, stale_timeout)
+
+    _record(key, MISS)
+    try:
+        return _compute(cache, key, compute, timeout, stale_timeout)
+    finally:
+        cache.delete(lock_key)
+
+
+def _compute(cache, key, compute, timeout, stale_timeout):
+    value = compute()
+    if value is not None:
+        cache.set(key, (value, time.time() + timeout), timeout + stale_timeout)
+    return value
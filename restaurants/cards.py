@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+BOOKMARK_SLOT = "<!-- card:bookmark -->"
+
+
+def card_cache_key(restaurant):
+    """
+    The cache key of a restaurant's card body, built from the values the list
+    query loads, so a change to any of them retires the card on every worker.
+    """
+    renditions = len(getattr(restaurant, "cover_renditions", ()))
+    return (
+        f"restaurants:card:{restaurant.pk}:{restaurant.updated_at.timestamp()}:"
+        f"{restaurant.avg_rating}:{restaurant.review_count}:{restaurant.cover_photo_id}:{renditions}"
+    )
+
+
+def render_cards(restaurants, request):
+    """
+    Render restaurant cards, reusing the shared HTML cached per restaurant.
+
+    The cached body holds a placeholder where the per-user bookmark control
+    is rendered on every request, so one fragment serves all visitors.
+    """
+    restaurants = list(restaurants)
+    keys = {restaurant.pk: card_cache_key(restaurant) for restaurant in restaurants}
+    cached = cache.get_many(keys.values())
+
+    body_template = get_template("partials/_restaurant_card.html")
+    control_template = get_template("partials/_card_bookmark.html")
+    fresh = {}
+    cards = []
+    for restaurant in restaurants:
+        key = keys[restaurant.pk]
+        body = cached.get(key)
+        if body is None:
+            body = fresh[key] = body_template.render({"restaurant": restaurant, "bookmark_slot": BOOKMARK_SLOT})
+        control = control_template.render({"restaurant": restaurant}, request)
+        cards.append(body.replace(BOOKMARK_SLOT, control))
+
+    if fresh:
+        cache.set_many(fresh, CARD_CACHE_TIMEOUT)
+    return mark_safe("".join(cards))
@@ -0,0 +1,140 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from content.models import RatingSummary
+from restaurants.imports import CSV_LIST_SEPARATOR, MENU_ITEM_FIELDS, RESTAURANT_FIELDS
+from restaurants.models import MenuItem, Restaurant
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+EXPORT_KINDS = ("restaurants", "menu_items")
+CHUNK_SIZE = 500
+
+RESTAURANT_COLUMNS = ("id", "external_id", *RESTAURANT_FIELDS, "cuisines", "avg_rating", "review_count")
+MENU_ITEM_COLUMNS = ("id", "restaurant", *MENU_ITEM_FIELDS, "cuisine", "avg_rating", "review_count")
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _ratings(model, ids):
+    return {
+        object_id: (average, count)
+        for object_id, average, count in RatingSummary.objects.filter(
+            content_type=ContentType.objects.get_for_model(model), object_id__in=ids
+        ).values_list("object_id", "average", "review_count")
+    }
+
+
+def _chunks(chunk_size, menu_items=True):
+    """
+    Walk the restaurants in primary key order, one chunk at a time, with the
+    cuisines and ratings of the chunk, and with ``menu_items`` their menu
+    items, loaded in a few batched queries.
+    """
+    rows = (
+        Restaurant.objects.order_by("pk")
+        .values("id", "external_id", *RESTAURANT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while restaurants := list(islice(rows, chunk_size)):
+        ids = [restaurant["id"] for restaurant in restaurants]
+
+        cuisines = defaultdict(list)
+        for restaurant_id, name in (
+            Restaurant.cuisines.through.objects
+            .filter(restaurant_id__in=ids)
+            .order_by("cuisine__name")
+            .values_list("restaurant_id", "cuisine__name")
+        ):
+            cuisines[restaurant_id].append(name)
+
+        ratings = _ratings(Restaurant, ids)
+        external_ids = {}
+        for restaurant in restaurants:
+            external_ids[restaurant["id"]] = restaurant["external_id"]
+            restaurant["cuisines"] = cuisines[restaurant["id"]]
+            restaurant["avg_rating"], restaurant["review_count"] = ratings.get(restaurant["id"], (0.0, 0))
+            restaurant["menu_items"] = []
+
+        if not menu_items:
+            yield restaurants
+            continue
+
+        by_id = {restaurant["id"]: restaurant for restaurant in restaurants}
+        items = list(
+            MenuItem.objects.filter(restaurant_id__in=ids)
+            .order_by("restaurant_id", "pk")
+            .values("id", "restaurant_id", *MENU_ITEM_FIELDS, "cuisine__name")
+        )
+        item_ratings = _ratings(MenuItem, [item["id"] for item in items])
+        for item in items:
+            restaurant_id = item.pop("restaurant_id")
+            item["restaurant"] = external_ids[restaurant_id]
+            item["cuisine"] = item.pop("cuisine__name")
+            item["avg_rating"], item["review_count"] = item_ratings.get(item["id"], (0.0, 0))
+            by_id[restaurant_id]["menu_items"].append(item)
+
+        yield restaurants
+
+
+def _json_default(value):
+    # Times are the only values left that json cannot encode itself.
+    return value.isoformat()
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else value
+
+
+def export_catalog(format="jsonl", kind="restaurants", chunk_size=CHUNK_SIZE):
+    """
+    Yield the catalog as text, one chunk of restaurants per string.
+
+    JSONL restaurant records nest their ``menu_items``; CSV has one file per
+    ``kind``, with menu items keyed by their restaurant's ``external_id``.
+    Both round-trip through ``restaurants.imports``, except for restaurants
+    without an ``external_id``: they export a blank key, which the importer
+    rejects, and their menu items go with them.
+    """
+    if format not in EXPORT_FORMATS or kind not in EXPORT_KINDS:
+        raise ValueError(f"Cannot export {kind!r} as {format!r}.")
+    if format == "jsonl" and kind == "restaurants":
+        columns = None
+    else:
+        columns = RESTAURANT_COLUMNS if kind == "restaurants" else MENU_ITEM_COLUMNS
+
+    writer = csv.writer(_Echo())
+    if format == "csv":
+        yield writer.writerow(columns)
+
+    # Only nested JSONL and the menu item files show menu items.
+    for restaurants in _chunks(chunk_size, menu_items=columns is None or kind == "menu_items"):
+        if kind == "restaurants":
+            records = restaurants
+        else:
+            records = [item for restaurant in restaurants for item in restaurant["menu_items"]]
+
+        if format == "csv":
+            yield "".join(
+                writer.writerow([_csv_value(record[column]) for column in columns]) for record in records
+            )
+        else:
+            yield "".join(
+                json.dumps(
+                    {column: record[column] for column in columns} if columns else record,
+                    default=_json_default,
+                ) + "\n"
+                for record in records
+            )
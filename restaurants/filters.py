@@ -1,10 +1,65 @@
+import math
 import django_filters
+from django import forms
+from django.core.exceptions import ValidationError
 from django.db import models
+from restaurants import geo
 from restaurants.models import Restaurant, Cuisine
+from restaurants.search import search
+
+
+class PointField(forms.CharField):
+    """A ``"latitude,longitude"`` pair, cleaned to a tuple of floats."""
+    default_error_messages = {
+        'invalid': 'Enter a location as "latitude,longitude".',
+    }
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError(self.error_messages['invalid'], code='invalid')
+        if not (math.isfinite(latitude) and math.isfinite(longitude)
+                and -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError(self.error_messages['invalid'], code='invalid')
+        return latitude, longitude
+
+
+class PointFilter(django_filters.Filter):
+    field_class = PointField
+
+
+class CountFilter(django_filters.NumberFilter):
+    field_class = forms.IntegerField
+
+
+class RestaurantOrderingFilter(django_filters.OrderingFilter):
+    def filter(self, qs, value):
+        # Distance is only annotated once ``near`` has placed the user.
+        if value and 'distance' not in qs.query.annotations:
+            value = [field for field in value if field.lstrip('-') != 'distance']
+        return super().filter(qs, value)
+
 
 class RestaurantFilter(django_filters.FilterSet):
+    DEFAULT_RADIUS_KM = 10
+
+    SEARCH_FIELDS = {
+        'q': None,
+        'name': 'name',
+        'city': 'city',
+        'menu_item': 'menu_items',
+    }
+
+    q = django_filters.CharFilter(
+        method='filter_by_search',
+        label='Search'
+    )
     name = django_filters.CharFilter(
-        lookup_expr='icontains',
+        method='filter_by_search',
         label='Restaurant Name'
     )
     cuisines = django_filters.ModelChoiceFilter(
@@ -12,12 +67,11 @@ class RestaurantFilter(django_filters.FilterSet):
         label='Cuisine'
     )
     menu_item = django_filters.CharFilter(
-        field_name='menu_items__name',
-        lookup_expr='icontains',
+        method='filter_by_search',
         label='Menu Item'
     )
     city = django_filters.CharFilter(
-        lookup_expr='icontains',
+        method='filter_by_search',
         label='City'
     )
     cost_for_two_min = django_filters.NumberFilter(
@@ -42,20 +96,74 @@ class RestaurantFilter(django_filters.FilterSet):
         method='filter_by_min_rating',
         label='Rating'
     )
-    
-    ordering = django_filters.OrderingFilter(
+    near = PointFilter(
+        method='filter_by_distance',
+        label='Near (latitude,longitude)'
+    )
+    radius = django_filters.NumberFilter(
+        method='filter_by_radius',
+        min_value=0.1,
+        max_value=100,
+        label='Within (km)'
+    )
+    k = CountFilter(
+        method='filter_by_radius',
+        min_value=1,
+        max_value=100,
+        label='Nearest (count)'
+    )
+
+    ordering = RestaurantOrderingFilter(
         choices=[
             ('-avg_rating', 'Rating: High to Low'),
             ('avg_rating', 'Rating: Low to High'),
             ('cost_for_two', 'Cost for Two: Low to High'),
             ('-cost_for_two', 'Cost for Two: High to Low'),
+            ('distance', 'Distance: Nearest First'),
         ],
         label='Sort By'
     )
 
+    def __init__(self, data=None, queryset=None, **kwargs):
+        if queryset is None:
+            queryset = Restaurant.objects.with_rating()
+        super().__init__(data, queryset, **kwargs)
+
+    def get_sort_key(self):
+        """
+        The single ordering field for ``qs``: nearest first when placed with
+        ``near``, relevance for searches, else name.
+        """
+        self.errors
+        cleaned_data = getattr(self.form, 'cleaned_data', {})
+        near = cleaned_data.get('near')
+        ordering = [field for field in cleaned_data.get('ordering') or [] if near or field != 'distance']
+        if ordering:
+            return ordering[0]
+        if near:
+            return 'distance'
+        return '-search_rank' if cleaned_data.get('q') else 'name'
+
+    def filter_by_search(self, queryset, name, value):
+        return search(queryset, value, field=self.SEARCH_FIELDS[name], rank=name == 'q')
+
     def filter_by_min_rating(self, queryset, name, value):
         return queryset.filter(avg_rating__gte=value)
 
+    def filter_by_distance(self, queryset, name, value):
+        k = self.form.cleaned_data.get('k')
+        if k:
+            # The k nearest at whatever distance; the rows stay a plain
+            # queryset so ordering and pagination still apply to them.
+            pks = list(geo.nearest(queryset, *value, k).values_list('pk', flat=True))
+            return queryset.filter(pk__in=pks).annotate(distance=geo.distance_km(*value))
+        radius = self.form.cleaned_data.get('radius') or self.DEFAULT_RADIUS_KM
+        return geo.within(queryset, *value, float(radius))
+
+    def filter_by_radius(self, queryset, name, value):
+        # Applied by ``near``; a radius or count on its own places nobody.
+        return queryset
+
     class Meta:
         model = Restaurant
         fields = []
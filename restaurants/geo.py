@@ -0,0 +1,129 @@
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """The geohash of a point: interleaved longitude/latitude bisections, five bits a character."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """``(height, width)`` in degrees of the geohash cells of ``precision`` characters."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def covered_radius(latitude, precision):
+    """
+    How far from a point, in km, the 3x3 block of cells around the point's
+    own cell is certain to reach: one cell in every direction, narrowest
+    where the block is closest to a pole.
+    """
+    height, width = cell_size(precision)
+    widest_latitude = min(abs(latitude) + 2 * height, 90)
+    return min(height * KM_PER_DEGREE, width * KM_PER_DEGREE * math.cos(math.radians(widest_latitude)))
+
+
+def covering_cells(latitude, longitude, precision):
+    """The geohash of the point's cell and of the eight cells around it."""
+    height, width = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        lat = latitude + lat_step * height
+        if not -90 <= lat <= 90:
+            continue
+        for lng_step in (-1, 0, 1):
+            lng = (longitude + lng_step * width + 180) % 360 - 180
+            cells.add(encode_geohash(lat, lng, precision))
+    return sorted(cells)
+
+
+def _prefix_query(prefix):
+    """
+    Rows whose geohash starts with ``prefix``, as a range on the column so
+    that any backend walks its plain index: from the prefix up to the next
+    prefix of the same length in geohash order.
+    """
+    following = prefix.rstrip(GEOHASH_ALPHABET[-1])
+    if not following:
+        return Q(geohash__gte=prefix)
+    following = following[:-1] + GEOHASH_ALPHABET[GEOHASH_ALPHABET.index(following[-1]) + 1]
+    return Q(geohash__gte=prefix, geohash__lt=following)
+
+
+def candidates(queryset, latitude, longitude, radius_km):
+    """
+    ``queryset`` cut down, with the geohash index, to the rows in the cells
+    that cover ``radius_km`` around the point. Rows further away may remain;
+    none within the radius are dropped.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if covered_radius(latitude, precision) >= radius_km:
+            query = Q()
+            for cell in covering_cells(latitude, longitude, precision):
+                query |= _prefix_query(cell)
+            return queryset.filter(query)
+    # Wider than the coarsest cells reach: every located row is a candidate.
+    return queryset.exclude(geohash="")
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance in km from the point to a row's coordinates, as an expression."""
+    lat, lng = math.radians(latitude), math.radians(longitude)
+    half_chord = (
+        Power(Sin((Radians(F("latitude")) - Value(lat)) / 2), 2)
+        + Value(math.cos(lat)) * Cos(Radians(F("latitude"))) * Power(Sin((Radians(F("longitude")) - Value(lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(half_chord), output_field=FloatField())
+
+
+def within(queryset, latitude, longitude, radius_km):
+    """Rows no more than ``radius_km`` from the point, annotated with their ``distance`` in km."""
+    return (
+        candidates(queryset, latitude, longitude, radius_km)
+        .annotate(distance=distance_km(latitude, longitude))
+        .filter(distance__lte=radius_km)
+    )
+
+
+def nearest(queryset, latitude, longitude, k):
+    """
+    The ``k`` rows closest to the point, nearest first, annotated with
+    their ``distance``.
+
+    The search starts in the smallest block of cells and widens it until
+    the block holds ``k`` rows within the distance it is certain to cover;
+    the ``k`` nearest are then all inside it.
+    """
+    # Six characters cover about half a kilometre, a short walk.
+    for precision in range(6, 0, -1):
+        radius = covered_radius(latitude, precision)
+        nearby = within(queryset, latitude, longitude, radius)
+        if len(nearby.values("pk")[:k]) == k:
+            return nearby.order_by("distance", "pk")[:k]
+    located = queryset.exclude(geohash="").annotate(distance=distance_km(latitude, longitude))
+    return located.order_by("distance", "pk")[:k]
@@ -0,0 +1,37 @@
+"""
+Geocoding: coordinates for a restaurant's address.
+
+``settings.GEOCODER`` names the backend, a class whose
+``geocode(address, city)`` returns ``(latitude, longitude)`` or ``None``.
+The default answers from a local JSON fixture, so development, tests and the
+benchmarks need no network; a hosted service goes behind the same method.
+"""
+import json
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def _key(text):
+    return " ".join(text.casefold().split())
+
+
+class FixtureGeocoder:
+    """
+    Coordinates read from a JSON file of ``"addresses"`` (keyed
+    ``"<address>, <city>"``) and ``"cities"``, each mapping to
+    ``[latitude, longitude]``. An address not listed gets its city's centre.
+    """
+
+    def __init__(self, path=None):
+        with open(path or settings.GEOCODER_FIXTURE, encoding="utf-8") as f:
+            data = json.load(f)
+        self.addresses = {_key(address): tuple(point) for address, point in data.get("addresses", {}).items()}
+        self.cities = {_key(city): tuple(point) for city, point in data.get("cities", {}).items()}
+
+    def geocode(self, address, city):
+        return self.addresses.get(_key(f"{address}, {city}")) or self.cities.get(_key(city))
+
+
+def get_geocoder():
+    return import_string(settings.GEOCODER)()
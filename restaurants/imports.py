@@ -0,0 +1,325 @@
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import BooleanField
+from restaurants.models import Cuisine, MenuItem, Restaurant
+from restaurants.page_cache import CUISINES_TAG, invalidate_pages, invalidate_restaurant_pages
+from restaurants.search import refresh_search_documents
+from restaurants.spotlight import invalidate_spotlight
+
+RESTAURANT_FIELDS = (
+    "name", "description", "city", "address", "cost_for_two", "veg_type",
+    "is_open", "opening_time", "closing_time", "spotlight", "latitude", "longitude",
+)
+# Updated only by records that carry them, so a catalog without coordinates keeps the geocoded ones.
+LOCATION_FIELDS = ("latitude", "longitude")
+MENU_ITEM_FIELDS = ("name", "description", "price", "is_available")
+CSV_LIST_SEPARATOR = "|"
+MAX_REPORTED_ERRORS = 100
+
+
+class CatalogFileError(ValueError):
+    """The file stopped being readable partway: bad encoding or broken CSV."""
+
+
+def detect_format(filename):
+    if filename.lower().endswith(".csv"):
+        return "csv"
+    if filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {filename!r}; expected .csv or .jsonl.")
+
+
+def read_records(stream, format):
+    """
+    Yield ``(line number, record)`` pairs from a text stream, one at a time.
+
+    CSV list columns (``cuisines``) hold ``|``-separated values; JSONL
+    records may nest a restaurant's ``menu_items``. A stream that can't be
+    decoded or parsed any further raises ``CatalogFileError``.
+    """
+    try:
+        yield from _read_records(stream, format)
+    except UnicodeDecodeError as e:
+        raise CatalogFileError(f"The file is not valid UTF-8 ({e.reason}).") from e
+    except csv.Error as e:
+        raise CatalogFileError(f"The CSV could not be parsed: {e}.") from e
+
+
+def _read_records(stream, format):
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if record.get("cuisines") is not None:
+                record["cuisines"] = [
+                    name for name in record["cuisines"].split(CSV_LIST_SEPARATOR) if name.strip()
+                ]
+            yield reader.line_num, record
+    elif format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+                    continue
+                if not isinstance(record, dict):
+                    record = ValueError("Expected a JSON object.")
+                yield line_number, record
+    else:
+        raise ValueError(f"Unknown import format {format!r}.")
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+BOOLEAN_STRINGS = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+
+
+def _field_values(model, record, fields):
+    values = {}
+    errors = {}
+    for name in fields:
+        value = record.get(name)
+        if value in (None, ""):
+            continue
+        field = model._meta.get_field(name)
+        if isinstance(field, BooleanField) and isinstance(value, str):
+            value = BOOLEAN_STRINGS.get(value.strip().lower(), value)
+        try:
+            values[name] = field.to_python(value)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+def _check_lists(record):
+    errors = {}
+    if record.get("cuisines") is not None and not isinstance(record["cuisines"], list):
+        errors["cuisines"] = ["Expected a list of names."]
+    menu_items = record.get("menu_items")
+    if menu_items is not None and not (
+        isinstance(menu_items, list) and all(isinstance(item, dict) for item in menu_items)
+    ):
+        errors["menu_items"] = ["Expected a list of objects."]
+    if errors:
+        raise ValidationError(errors)
+
+
+def _error_text(error):
+    if isinstance(error, ValidationError) and hasattr(error, "error_dict"):
+        return "; ".join(f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items())
+    if isinstance(error, ValidationError):
+        return " ".join(error.messages)
+    return str(error)
+
+
+class CatalogImporter:
+    """
+    Upsert restaurants and menu items from record streams in fixed-size batches.
+
+    Restaurants are matched on ``external_id`` and menu items on their
+    restaurant and name. Only one batch is held in memory at a time; bulk
+    writes skip the model signals, so each batch refreshes the search index
+    and caches of the restaurants it touched. ``progress`` is called with
+    ``(kind, batch number, rows, seconds)`` after every batch.
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = Counter()
+        self.errors = []
+        self._cuisines = None
+
+    def import_restaurants(self, records):
+        for number, batch in enumerate(_batched(records, self.batch_size), start=1):
+            start = time.perf_counter()
+            with transaction.atomic():
+                rows = self._import_restaurant_batch(batch)
+            self._report("restaurants", number, rows, time.perf_counter() - start)
+
+    def import_menu_items(self, records):
+        for number, batch in enumerate(_batched(records, self.batch_size), start=1):
+            start = time.perf_counter()
+            with transaction.atomic():
+                rows = self._import_menu_item_batch(batch)
+            self._report("menu items", number, rows, time.perf_counter() - start)
+
+    def _report(self, kind, number, rows, seconds):
+        if self.progress:
+            self.progress(kind, number, rows, seconds)
+
+    def _error(self, line_number, error):
+        self.stats["errors"] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line_number}: {_error_text(error)}")
+
+    def _import_restaurant_batch(self, batch):
+        restaurants = {}
+        for line_number, record in batch:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                external_id = str(record.get("external_id") or "").strip()
+                if not external_id:
+                    raise ValidationError({"external_id": ["This field is required."]})
+                _check_lists(record)
+                restaurant = Restaurant(external_id=external_id, **_field_values(Restaurant, record, RESTAURANT_FIELDS))
+                restaurant.full_clean(
+                    exclude=Restaurant.COVER_FIELDS, validate_unique=False, validate_constraints=False
+                )
+                if (restaurant.latitude is None) != (restaurant.longitude is None):
+                    raise ValidationError({"latitude": ["Give both latitude and longitude, or neither."]})
+                restaurant.update_geohash()
+            except (ValidationError, ValueError) as e:
+                self._error(line_number, e)
+                continue
+            # A key repeated within the batch keeps its last record.
+            restaurants[external_id] = (line_number, restaurant, record)
+        if not restaurants:
+            return 0
+
+        existing = set(
+            Restaurant.objects.filter(external_id__in=restaurants).values_list("external_id", flat=True)
+        )
+        located = [restaurant for _, restaurant, _ in restaurants.values() if restaurant.latitude is not None]
+        unlocated = [restaurant for _, restaurant, _ in restaurants.values() if restaurant.latitude is None]
+        other_fields = [name for name in RESTAURANT_FIELDS if name not in LOCATION_FIELDS]
+        for group, update_fields in (
+            (located, [*other_fields, *LOCATION_FIELDS, "geohash", "updated_at"]),
+            (unlocated, [*other_fields, "updated_at"]),
+        ):
+            if group:
+                Restaurant.objects.bulk_create(
+                    group, update_conflicts=True, unique_fields=["external_id"], update_fields=update_fields,
+                )
+        pks = dict(
+            Restaurant.objects.filter(external_id__in=restaurants).values_list("external_id", "pk")
+        )
+        self.stats["restaurants created"] += len(restaurants) - len(existing)
+        self.stats["restaurants updated"] += len(existing)
+
+        cuisines = {
+            pks[external_id]: record["cuisines"]
+            for external_id, (_, _, record) in restaurants.items()
+            if record.get("cuisines") is not None
+        }
+        self._set_cuisines(cuisines)
+
+        menu_items = [
+            (line_number, dict(item, restaurant=external_id))
+            for external_id, (line_number, _, record) in restaurants.items()
+            for item in record.get("menu_items") or ()
+        ]
+        if menu_items:
+            self._upsert_menu_items(menu_items, pks)
+
+        self._refresh(pks.values())
+        if any(restaurant.spotlight for _, restaurant, _ in restaurants.values()) or existing:
+            invalidate_spotlight()
+        return len(restaurants)
+
+    def _import_menu_item_batch(self, batch):
+        records = []
+        for line_number, record in batch:
+            if isinstance(record, Exception):
+                self._error(line_number, record)
+            else:
+                records.append((line_number, record))
+
+        keys = {str(record.get("restaurant") or "") for _, record in records}
+        pks = dict(Restaurant.objects.filter(external_id__in=keys).values_list("external_id", "pk"))
+        rows = self._upsert_menu_items(records, pks)
+        self._refresh({pks[key] for key in keys if key in pks})
+        return rows
+
+    def _upsert_menu_items(self, records, restaurant_pks):
+        items = {}
+        for line_number, record in records:
+            try:
+                restaurant_id = restaurant_pks.get(str(record.get("restaurant") or ""))
+                if restaurant_id is None:
+                    raise ValidationError({"restaurant": ["Unknown restaurant external_id."]})
+                item = MenuItem(restaurant_id=restaurant_id, **_field_values(MenuItem, record, MENU_ITEM_FIELDS))
+                if record.get("cuisine"):
+                    item.cuisine_id = self._cuisine_ids([record["cuisine"]])[0]
+                item.full_clean(
+                    exclude=[*MenuItem.COVER_FIELDS, "restaurant", "cuisine"],
+                    validate_unique=False, validate_constraints=False,
+                )
+            except (ValidationError, ValueError) as e:
+                self._error(line_number, e)
+                continue
+            items[restaurant_id, item.name] = item
+        if not items:
+            return 0
+
+        existing = {}
+        for pk, restaurant_id, name in (
+            MenuItem.objects.order_by("-pk")
+            .filter(restaurant_id__in={key[0] for key in items}, name__in={key[1] for key in items})
+            .values_list("pk", "restaurant_id", "name")
+        ):
+            # With duplicate names already in the table, the oldest row is the one updated.
+            existing[restaurant_id, name] = pk
+
+        to_update = []
+        to_create = []
+        for key, item in items.items():
+            if key in existing:
+                item.pk = existing[key]
+                to_update.append(item)
+            else:
+                to_create.append(item)
+        MenuItem.objects.bulk_create(to_create)
+        MenuItem.objects.bulk_update(to_update, ["description", "price", "cuisine", "is_available"])
+
+        self.stats["menu items created"] += len(to_create)
+        self.stats["menu items updated"] += len(to_update)
+        return len(items)
+
+    def _cuisine_ids(self, names):
+        if self._cuisines is None:
+            self._cuisines = {name.lower(): pk for pk, name in Cuisine.objects.values_list("pk", "name")}
+
+        names = [" ".join(str(name).split()) for name in names]
+        missing = {name.lower(): name for name in names if name.lower() not in self._cuisines}
+        missing = set(missing.values())
+        if missing:
+            Cuisine.objects.bulk_create([Cuisine(name=name) for name in missing], ignore_conflicts=True)
+            for pk, name in Cuisine.objects.filter(name__in=missing).values_list("pk", "name"):
+                self._cuisines[name.lower()] = pk
+            self.stats["cuisines created"] += len(missing)
+            invalidate_pages([CUISINES_TAG])
+        return [self._cuisines[name.lower()] for name in names]
+
+    def _set_cuisines(self, cuisines):
+        """Replace the cuisines of each restaurant in ``cuisines`` through the join table."""
+        if not cuisines:
+            return
+        Through = Restaurant.cuisines.through
+        Through.objects.filter(restaurant_id__in=cuisines).delete()
+        Through.objects.bulk_create(
+            [
+                Through(restaurant_id=restaurant_id, cuisine_id=cuisine_id)
+                for restaurant_id, names in cuisines.items()
+                for cuisine_id in set(self._cuisine_ids(names))
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _refresh(self, restaurant_ids):
+        restaurant_ids = list(restaurant_ids)
+        refresh_search_documents(restaurant_ids)
+        invalidate_restaurant_pages(restaurant_ids)
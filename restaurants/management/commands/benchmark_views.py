@@ -0,0 +1,221 @@
+import json
+import math
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from restaurants.models import Cuisine, MenuItem, Restaurant
+
+User = get_user_model()
+
+# Every scenario starts from an empty cache; this one is private to the process,
+# so clearing it can't touch a cache shared with running servers.
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+        "KEY_PREFIX": "benchmark",
+    }
+}
+
+
+def benchmark_settings(shared_cache=False, **overrides):
+    """
+    Settings to run the view scenarios under: the test client's host and,
+    unless ``shared_cache``, the private benchmark cache.
+    """
+    if not shared_cache:
+        overrides["CACHES"] = BENCHMARK_CACHES
+    return override_settings(ALLOWED_HOSTS=["testserver"], **overrides)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def view_scenarios(username):
+    """
+    ``(name, method, url, user, data)`` for every view, built from the first
+    rows of the database; ``data`` is the JSON body, if any. The export runs
+    as the first staff user, created when there is none.
+    """
+    restaurant = Restaurant.objects.order_by("pk").first()
+    menu_item = MenuItem.objects.order_by("pk").first()
+    cuisine = Cuisine.objects.order_by("pk").first()
+    users = User.objects.order_by("pk")
+    user = users.get(username=username) if username else users.first()
+    if restaurant is None or menu_item is None or cuisine is None or user is None:
+        raise CommandError("The database needs a user, cuisine, restaurant and menu item; run seed_dataset.")
+    staff = users.filter(is_staff=True).first()
+    if staff is None:
+        staff, _ = User.objects.get_or_create(
+            username="benchmark-staff", defaults={"email": "benchmark-staff@example.com", "is_staff": True},
+        )
+
+    list_url = reverse("restaurants:restaurant_list")
+    filters = {
+        "all": "",
+        "city": f"city={restaurant.city}",
+        "cuisine": f"cuisines={cuisine.pk}",
+        "min_rating": "min_rating=4",
+        "search": f"q={restaurant.name.split()[0]}",
+        "menu_item": f"menu_item={menu_item.name.split()[0]}",
+        "by_rating": "ordering=-avg_rating",
+        "veg_cost": "veg_type=veg&cost_for_two_max=1000&ordering=cost_for_two",
+    }
+    located = Restaurant.objects.exclude(geohash="").order_by("pk").values_list("latitude", "longitude").first()
+    if located:
+        filters["near"] = f"near={located[0]},{located[1]}&radius=5"
+
+    scenarios = []
+    for label, query in filters.items():
+        scenarios.append((f"restaurant_list:{label}", "get", f"{list_url}?{query}", None, None))
+    restaurant_reviews_url = reverse("restaurants:restaurant_reviews", args=[restaurant.pk])
+    export_url = reverse("restaurants:catalog_export")
+    bookmark_url = reverse("interactions:bookmark", args=[restaurant.pk])
+    visited_url = reverse("interactions:visited", args=[restaurant.pk])
+    changes = {"changes": [
+        {"type": "bookmark", "restaurant": restaurant.pk, "state": True},
+        {"type": "visited", "restaurant": restaurant.pk, "state": False},
+    ]}
+    scenarios += [
+        ("restaurant_list:all:user", "get", list_url, user, None),
+        ("restaurant_detail", "get", reverse("restaurants:restaurant_detail", args=[restaurant.pk]), None, None),
+        ("restaurant_detail:user", "get", reverse("restaurants:restaurant_detail", args=[restaurant.pk]), user, None),
+        ("menu_item_detail", "get", reverse("restaurants:menu_item_detail", args=[menu_item.pk]), None, None),
+        ("menu_item_detail:user", "get", reverse("restaurants:menu_item_detail", args=[menu_item.pk]), user, None),
+        ("restaurant_reviews", "get", restaurant_reviews_url, None, None),
+        ("restaurant_reviews:json", "get", f"{restaurant_reviews_url}?format=json", None, None),
+        ("menu_item_reviews", "get", reverse("restaurants:menu_item_reviews", args=[menu_item.pk]), None, None),
+        ("catalog_export", "get", export_url, staff, None),
+        ("catalog_export:menu_items_csv", "get", f"{export_url}?format=csv&kind=menu_items", staff, None),
+        ("bookmark_list", "get", reverse("interactions:bookmark_list"), user, None),
+        ("visited_list", "get", reverse("interactions:visited_list"), user, None),
+        ("toggle_bookmark", "post", reverse("interactions:toggle_bookmark", args=[restaurant.pk]), user, None),
+        ("toggle_visited", "post", reverse("interactions:toggle_visited", args=[restaurant.pk]), user, None),
+        ("bookmark:put", "put", bookmark_url, user, {}),
+        ("bookmark:delete", "delete", bookmark_url, user, None),
+        ("visited:put", "put", visited_url, user, {}),
+        ("visited:delete", "delete", visited_url, user, None),
+        ("sync", "post", reverse("interactions:sync"), user, changes),
+        ("login", "get", reverse("accounts:login"), None, None),
+        ("register", "get", reverse("accounts:register"), None, None),
+        ("profile", "get", reverse("accounts:profile"), user, None),
+        ("edit_profile", "get", reverse("accounts:edit_profile"), user, None),
+        ("change_password", "get", reverse("accounts:change_password"), user, None),
+    ]
+    # Logout is left out: it would end the session the other scenarios use.
+    return scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the restaurant, interaction and account views against the current "
+        "database and report p50/p95/p99 latency and query counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", default="", help="Run only scenarios whose name contains this text.")
+        parser.add_argument("--username", help="User for the logged-in scenarios; defaults to the first user.")
+        parser.add_argument(
+            "--page-cache", action="store_true",
+            help="Leave the anonymous page cache on instead of timing the views themselves.",
+        )
+        parser.add_argument(
+            "--shared-cache", action="store_true",
+            help="Time against the configured cache instead of a private one. It is cleared before every scenario.",
+        )
+        parser.add_argument("--baseline", help="JSON baseline to compare against.")
+        parser.add_argument("--save-baseline", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Allowed p95 slowdown over the baseline, as a fraction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        scenarios = [s for s in view_scenarios(options["username"]) if options["only"] in s[0]]
+        with benchmark_settings(options["shared_cache"], PAGE_CACHE_ENABLED=options["page_cache"]):
+            results = {
+                name: self.run(method, url, user, data, options["iterations"], options["warmup"])
+                for name, method, url, user, data in scenarios
+            }
+
+        self.report(results)
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump({"scenarios": results}, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Saved baseline to {options['save_baseline']}.")
+        if options["baseline"]:
+            self.compare(results, options["baseline"], options["tolerance"])
+
+    def run(self, method, url, user, data, iterations, warmup):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        cache.clear()
+        body = {} if data is None else {"data": json.dumps(data), "content_type": "application/json"}
+
+        timings = []
+        queries = 0
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **body)
+            if response.streaming:
+                # The export does its work while the body is read.
+                b"".join(response.streaming_content)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code >= 400:
+                raise CommandError(f"{method.upper()} {url} returned {response.status_code}.")
+            if i >= warmup:
+                timings.append(elapsed)
+                queries = max(queries, response.wsgi_request.sql_metrics.count)
+
+        return {
+            "p50": round(percentile(timings, 50), 2),
+            "p95": round(percentile(timings, 95), 2),
+            "p99": round(percentile(timings, 99), 2),
+            "queries": queries,
+        }
+
+    def report(self, results):
+        width = max(map(len, results), default=8)
+        self.stdout.write(f"{'scenario':<{width}}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'queries':>7}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<{width}}  {result['p50']:>9.2f}  {result['p95']:>9.2f}  "
+                f"{result['p99']:>9.2f}  {result['queries']:>7}"
+            )
+
+    def compare(self, results, path, tolerance):
+        with open(path) as f:
+            baseline = json.load(f)["scenarios"]
+
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f"{name}: not in baseline")
+                continue
+            change = (result["p95"] - before["p95"]) / before["p95"] if before["p95"] else 0.0
+            self.stdout.write(
+                f"{name}: p95 {before['p95']:.2f} -> {result['p95']:.2f} ms ({change:+.0%}), "
+                f"queries {before['queries']} -> {result['queries']}"
+            )
+            if change > tolerance:
+                regressions.append(f"{name} p95 {change:+.0%}")
+            if result["queries"] > before["queries"]:
+                regressions.append(f"{name} queries {before['queries']} -> {result['queries']}")
+
+        if regressions:
+            raise CommandError("Regressions against the baseline: " + "; ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from interactions.models import Bookmark
+from myrestaurant.writes import is_lock_error, serialized_write
+from restaurants.management.commands.benchmark_views import percentile
+from restaurants.models import Restaurant
+
+User = get_user_model()
+
+# Django's stock SQLite setup, with the same busy timeout as the tuned one so
+# only the pragmas, the locking mode and the write queue differ.
+MODES = {
+    "default": {
+        "journal_mode": "DELETE",
+        "options": {
+            "init_command": "PRAGMA synchronous=FULL",
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        "serialized": False,
+    },
+    "tuned": {
+        "journal_mode": settings.SQLITE_PRAGMAS["journal_mode"],
+        "options": {
+            "init_command": ";".join(f"PRAGMA {pragma}={value}" for pragma, value in settings.SQLITE_PRAGMAS.items()),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        "serialized": True,
+    },
+}
+
+
+def toggle_bookmark(user_id, restaurant_id):
+    bookmark, created = Bookmark.objects.get_or_create(user_id=user_id, restaurant_id=restaurant_id)
+    if not created:
+        bookmark.delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Toggle bookmarks from several threads at once, first with Django's default "
+        "SQLite setup and then with the tuned pragmas and serialized writer, and "
+        "report writes per second and lock errors for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run each mode for.")
+        parser.add_argument("--mode", choices=sorted(MODES), action="append", help="Run only this mode.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark measures SQLite write contention.")
+        if options["threads"] < 1:
+            raise CommandError("--threads must be at least 1.")
+
+        user_ids = list(User.objects.values_list("pk", flat=True)[:200])
+        restaurant_ids = list(Restaurant.objects.values_list("pk", flat=True)[:200])
+        if not user_ids or not restaurant_ids:
+            raise CommandError("The database needs users and restaurants; run seed_dataset.")
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+
+        self.stdout.write(f"{'mode':<8}  {'writes/s':>9}  {'writes':>7}  {'locked':>6}  {'p95 ms':>8}")
+        try:
+            for name in options["mode"] or MODES:
+                result = self.run(MODES[name], options["threads"], options["duration"], user_ids, restaurant_ids)
+                self.stdout.write(
+                    f"{name:<8}  {result['rate']:>9.1f}  {result['writes']:>7}  "
+                    f"{result['locked']:>6}  {result['p95']:>8.2f}"
+                )
+        finally:
+            self.switch_journal_mode(journal_mode)
+
+    def switch_journal_mode(self, journal_mode):
+        # The journal mode belongs to the database file, so switch it while nothing else is connected.
+        connections.close_all()
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        connection.close()
+
+    def run(self, mode, threads, duration, user_ids, restaurant_ids):
+        self.switch_journal_mode(mode["journal_mode"])
+        write = serialized_write(toggle_bookmark) if mode["serialized"] else transaction.atomic()(toggle_bookmark)
+        deadline = time.perf_counter() + duration
+        results = []
+        errors = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            timings, locked = [], 0
+            try:
+                # Each thread has its own connection wrapper; give it the mode's options
+                # in place of whatever SQLITE_PERFORMANCE_MODE configured.
+                connection.settings_dict = {**connection.settings_dict, "OPTIONS": mode["options"]}
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        write(rng.choice(user_ids), rng.choice(restaurant_ids))
+                    except OperationalError as error:
+                        if not is_lock_error(error):
+                            raise
+                        locked += 1
+                    else:
+                        timings.append((time.perf_counter() - start) * 1000)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+                results.append((timings, locked))
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise CommandError(f"A writer failed: {errors[0]}")
+
+        timings = [timing for worker_timings, _ in results for timing in worker_timings]
+        return {
+            "rate": len(timings) / elapsed,
+            "writes": len(timings),
+            "locked": sum(locked for _, locked in results),
+            "p95": percentile(timings, 95) if timings else 0.0,
+        }
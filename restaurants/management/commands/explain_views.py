@@ -0,0 +1,121 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from restaurants.management.commands.benchmark_views import benchmark_settings, view_scenarios
+
+
+def sqlite_issues(cursor, sql, params):
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    issues = []
+    for row in cursor.fetchall():
+        detail = row[-1]
+        # "SCAN t USING INDEX i" walks an index and FTS tables are virtual; a bare "SCAN t" reads every row.
+        if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+            issues.append(("full scan", detail))
+        elif "USE TEMP B-TREE" in detail:
+            issues.append(("temp sort", detail))
+    return issues
+
+
+def postgresql_issues(cursor, sql, params):
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    issues = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            issues.append(("full scan", f"Seq Scan on {node['Relation Name']}"))
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            issues.append(("temp sort", f"{node['Node Type']} by {', '.join(node.get('Sort Key', []))}"))
+        nodes.extend(node.get("Plans", []))
+    return issues
+
+
+EXPLAINERS = {
+    "sqlite": sqlite_issues,
+    "postgresql": postgresql_issues,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on every SELECT the views issue against the current database "
+        "and flag full table scans and temporary sorts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", default="", help="Check only scenarios whose name contains this text.")
+        parser.add_argument("--username", help="User for the logged-in scenarios; defaults to the first user.")
+        parser.add_argument(
+            "--ignore-table", action="append", default=[],
+            help="Don't flag plans on this table, e.g. a lookup table that is meant to be read whole.",
+        )
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when anything is flagged.")
+
+    def handle(self, *args, **options):
+        explain = EXPLAINERS.get(connection.vendor)
+        if explain is None:
+            raise CommandError(f"EXPLAIN is not supported for the {connection.vendor} backend.")
+
+        # Writes would change the data under the other scenarios, and EXPLAIN only reads.
+        scenarios = [
+            s for s in view_scenarios(options["username"])
+            if s[1] == "get" and options["only"] in s[0]
+        ]
+        flagged = 0
+        with benchmark_settings(PAGE_CACHE_ENABLED=False):
+            for name, method, url, user, data in scenarios:
+                statements = self.capture(url, user)
+                findings = []
+                with connection.cursor() as cursor:
+                    for sql, params in statements:
+                        issues = [
+                            (kind, detail) for kind, detail in explain(cursor, sql, params)
+                            if not any(table in detail for table in options["ignore_table"])
+                        ]
+                        if issues:
+                            findings.append((sql, issues))
+
+                self.report(name, url, len(statements), findings)
+                flagged += len(findings)
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{flagged} queries need an index or a different plan.")
+        style = self.style.WARNING if flagged else self.style.SUCCESS
+        self.stdout.write(style(f"{flagged} flagged queries across {len(scenarios)} scenarios."))
+
+    def capture(self, url, user):
+        """The distinct SELECTs, with their parameters, that one GET of ``url`` runs."""
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        cache.clear()
+
+        statements = {}
+
+        def record(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith("SELECT"):
+                statements.setdefault(sql, tuple(params or ()))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        if response.status_code >= 400:
+            raise CommandError(f"GET {url} returned {response.status_code}.")
+        return list(statements.items())
+
+    def report(self, name, url, count, findings):
+        self.stdout.write(f"{name} ({url}): {count} selects, {len(findings)} flagged")
+        for sql, issues in findings:
+            self.stdout.write(f"  {sql[:200]}")
+            for kind, detail in issues:
+                self.stdout.write(self.style.WARNING(f"    {kind}: {detail}"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from restaurants.exports import CHUNK_SIZE, EXPORT_FORMATS, EXPORT_KINDS, export_catalog
+
+
+class Command(BaseCommand):
+    help = "Write the catalog with cuisines and average ratings as CSV or JSONL, streaming it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="File to write; defaults to standard output.")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="jsonl")
+        parser.add_argument(
+            "--kind", choices=EXPORT_KINDS, default="restaurants",
+            help="JSONL restaurants nest their menu items; CSV needs one file per kind.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        chunks = export_catalog(options["format"], options["kind"], options["chunk_size"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['kind']} to {options['output']}."))
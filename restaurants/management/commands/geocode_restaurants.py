@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from restaurants.geocoding import get_geocoder
+from restaurants.models import Restaurant
+from restaurants.page_cache import invalidate_restaurant_pages
+
+LOCATION_FIELDS = ["latitude", "longitude", "geohash"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in restaurant coordinates, and their geohash, from the configured "
+        "geocoder. Only restaurants without coordinates are looked up unless --all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Geocode restaurants that already have coordinates too.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        geocoder = get_geocoder()
+        batch_size = options["batch_size"]
+        queryset = Restaurant.objects.order_by("pk").only("pk", "address", "city", *LOCATION_FIELDS)
+        if not options["all"]:
+            queryset = queryset.filter(latitude__isnull=True)
+
+        located = missed = last_pk = 0
+        # Batches seek on the pk, so rows written by one batch never shift the next.
+        while batch := list(queryset.filter(pk__gt=last_pk)[:batch_size]):
+            last_pk = batch[-1].pk
+            found = []
+            for restaurant in batch:
+                point = geocoder.geocode(restaurant.address, restaurant.city)
+                if point is None:
+                    missed += 1
+                    continue
+                restaurant.latitude, restaurant.longitude = point
+                restaurant.update_geohash()
+                found.append(restaurant)
+            if found:
+                Restaurant.objects.bulk_update(found, LOCATION_FIELDS)
+                invalidate_restaurant_pages([restaurant.pk for restaurant in found])
+            located += len(found)
+
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {located} restaurants; {missed} could not be located."))
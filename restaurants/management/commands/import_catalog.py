@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from restaurants.imports import CatalogFileError, CatalogImporter, detect_format, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert restaurants (matched on external_id) and menu items (matched on "
+        "restaurant and name) from CSV or JSONL files, streaming them in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("restaurants", nargs="?", help="Restaurant records; JSONL may nest menu_items.")
+        parser.add_argument("--menu-items", help="Menu item records keyed by their restaurant's external_id.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not options["restaurants"] and not options["menu_items"]:
+            raise CommandError("Give a restaurants file, --menu-items, or both.")
+
+        importer = CatalogImporter(batch_size=options["batch_size"], progress=self.progress)
+        try:
+            if options["restaurants"]:
+                with self.open_records(options["restaurants"], options["format"]) as records:
+                    importer.import_restaurants(records)
+            if options["menu_items"]:
+                with self.open_records(options["menu_items"], options["format"]) as records:
+                    importer.import_menu_items(records)
+        except CatalogFileError as e:
+            failure = e
+        else:
+            failure = None
+
+        for error in importer.errors:
+            self.stderr.write(error)
+        summary = ", ".join(f"{count} {name}" for name, count in sorted(importer.stats.items()))
+        if failure:
+            # Batches before the unreadable one are already committed.
+            raise CommandError(f"{failure} Import stopped after: {summary or 'nothing'}.")
+        self.stdout.write(self.style.SUCCESS(f"Import finished: {summary or 'nothing to do'}."))
+
+    @contextmanager
+    def open_records(self, path, format):
+        try:
+            format = format or detect_format(path)
+            stream = open(path, encoding="utf-8-sig", newline="")
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        with stream:
+            yield read_records(stream, format)
+
+    def progress(self, kind, number, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(f"{kind} batch {number}: {rows} rows in {seconds:.2f}s ({rate:.0f} rows/s)")
+
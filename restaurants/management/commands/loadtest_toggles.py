@@ -0,0 +1,185 @@
+import asyncio
+import queue
+import random
+import sys
+import threading
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.middleware.csrf import CSRF_ALLOWED_CHARS
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from myrestaurant.asgi import application as asgi_application
+from myrestaurant.wsgi import application as wsgi_application
+from restaurants.management.commands.benchmark_views import percentile
+from restaurants.models import Restaurant
+
+User = get_user_model()
+
+
+def wsgi_post(path, headers):
+    """POST ``path`` to the WSGI application in this thread and return the status code."""
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "CONTENT_LENGTH": "0",
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        **{"HTTP_" + name.upper().replace("-", "_"): value for name, value in headers.items()},
+    }
+    statuses = []
+    result = wsgi_application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b"".join(result)
+    finally:
+        # Like a real server: this sends request_finished, which tidies up the connection.
+        result.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_post(path, headers):
+    """POST ``path`` to the ASGI application on the running loop and return the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    body = [{"type": "http.request", "body": b"", "more_body": False}]
+    statuses = []
+
+    async def receive():
+        if body:
+            return body.pop()
+        # The client never disconnects; Django cancels this wait once it has responded.
+        await asyncio.Future()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await asgi_application(scope, receive, send)
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent bookmark toggles through the project's WSGI and ASGI "
+        "applications in this process and report the requests per second and "
+        "latency each sustains. The WSGI worker serves --wsgi-threads requests "
+        "at a time; the ASGI worker is one event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Toggles to send to each server.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Clients sending toggles at once.")
+        parser.add_argument("--wsgi-threads", type=int, default=4, help="Threads of the WSGI worker.")
+        parser.add_argument("--username", help="User who toggles; defaults to the first user.")
+        parser.add_argument("--server", choices=["wsgi", "asgi"], action="append", help="Test only this server.")
+
+    def handle(self, *args, **options):
+        for option in ("requests", "concurrency", "wsgi_threads"):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be at least 1.")
+
+        users = User.objects.order_by("pk")
+        user = users.filter(username=options["username"]).first() if options["username"] else users.first()
+        restaurant_ids = list(Restaurant.objects.values_list("pk", flat=True)[:200])
+        if user is None or not restaurant_ids:
+            raise CommandError("The database needs a user and restaurants; run seed_dataset.")
+
+        client = Client()
+        client.force_login(user)
+        csrf_token = get_random_string(32, CSRF_ALLOWED_CHARS)
+        headers = {
+            "Host": "testserver",
+            "Cookie": (
+                f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; "
+                f"{settings.CSRF_COOKIE_NAME}={csrf_token}"
+            ),
+            "X-CSRFToken": csrf_token,
+            "X-Requested-With": "XMLHttpRequest",
+        }
+        rng = random.Random(0)
+        paths = [
+            reverse("interactions:toggle_bookmark", args=[rng.choice(restaurant_ids)])
+            for _ in range(options["requests"])
+        ]
+
+        servers = {
+            "wsgi": lambda: self.run_wsgi(paths, headers, options["concurrency"], options["wsgi_threads"]),
+            "asgi": lambda: asyncio.run(self.run_asgi(paths, headers, options["concurrency"])),
+        }
+        self.stdout.write(f"{'server':<6}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'errors':>6}")
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name in options["server"] or servers:
+                started = time.perf_counter()
+                results = servers[name]()
+                elapsed = time.perf_counter() - started
+                timings = [timing for status, timing in results if status == 200]
+                self.stdout.write(
+                    f"{name:<6}  {len(results) / elapsed:>8.1f}  "
+                    f"{percentile(timings, 50) if timings else 0.0:>8.2f}  "
+                    f"{percentile(timings, 95) if timings else 0.0:>8.2f}  "
+                    f"{len(results) - len(timings):>6}"
+                )
+
+    def run_wsgi(self, paths, headers, concurrency, threads):
+        # Clients beyond the worker's threads wait for one, as they would in its accept queue.
+        worker_threads = threading.BoundedSemaphore(threads)
+        pending = queue.SimpleQueue()
+        for path in paths:
+            pending.put(path)
+        results = []
+
+        def client():
+            while True:
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.perf_counter()
+                with worker_threads:
+                    status = wsgi_post(path, headers)
+                results.append((status, (time.perf_counter() - start) * 1000))
+
+        clients = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        return results
+
+    async def run_asgi(self, paths, headers, concurrency):
+        pending = iter(paths)
+        results = []
+
+        async def client():
+            for path in pending:
+                start = time.perf_counter()
+                status = await asgi_post(path, headers)
+                results.append((status, (time.perf_counter() - start) * 1000))
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return results
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter and sets Django up the way a worker does at
+# boot, timing the settings import and, per app, the import of its package
+# and models and its ready(). Prints the timings as JSON.
+SETUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from django.apps.config import AppConfig
+
+imports, ready = {}, {}
+
+def timed(seconds, label, func):
+    began = time.perf_counter()
+    result = func()
+    seconds[label] = seconds.get(label, 0.0) + time.perf_counter() - began
+    return result
+
+create = AppConfig.create.__func__
+
+def timed_create(cls, entry):
+    began = time.perf_counter()
+    config = create(cls, entry)
+    imports[config.label] = time.perf_counter() - began
+    import_models, config_ready = config.import_models, config.ready
+    config.import_models = lambda: timed(imports, config.label, import_models)
+    config.ready = lambda: timed(ready, config.label, config_ready)
+    return config
+
+AppConfig.create = classmethod(timed_create)
+
+import django
+from django.conf import settings
+settings.INSTALLED_APPS  # imports the settings module
+settings_seconds = time.perf_counter() - started
+django.setup()
+print(json.dumps({
+    "total": time.perf_counter() - started,
+    "settings": settings_seconds,
+    "imports": imports,
+    "ready": ready,
+}))
+"""
+
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| +(\S+)$")
+
+
+def slowest_modules(stderr, count):
+    """
+    The ``count`` modules whose own code took longest to import, as
+    ``(module, microseconds)``, from what ``-X importtime`` wrote.
+    """
+    modules = [(match[3], int(match[1])) for match in map(IMPORT_TIME.match, stderr.splitlines()) if match]
+    return sorted(modules, key=lambda module: module[1], reverse=True)[:count]
+
+
+class Command(BaseCommand):
+    help = (
+        "Start Django in a fresh interpreter, the way a worker boots, and report "
+        "per installed app what importing its package and models and running its "
+        "ready() cost, plus the slowest single modules. An app's import time "
+        "includes the libraries it was first to import, so it depends on the "
+        "order of INSTALLED_APPS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to time; the fastest is reported.")
+        parser.add_argument("--modules", type=int, default=10, help="List this many slowest single modules.")
+        parser.add_argument("--budget", type=float, help="Fail if setup takes longer than this many milliseconds.")
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be at least 1.")
+
+        timings, stderr = min((self.cold_start() for _ in range(options["runs"])), key=lambda run: run[0]["total"])
+
+        rows = [
+            (label, timings["imports"].get(label, 0.0) * 1000, timings["ready"].get(label, 0.0) * 1000)
+            for label in {**timings["imports"], **timings["ready"]}
+        ]
+        rows.sort(key=lambda row: row[1] + row[2], reverse=True)
+        total = timings["total"] * 1000
+
+        self.stdout.write(f"{'app':<20}  {'import ms':>9}  {'ready ms':>8}")
+        self.stdout.write(f"{'(settings)':<20}  {timings['settings'] * 1000:>9.1f}  {'':>8}")
+        for label, import_ms, ready_ms in rows:
+            self.stdout.write(f"{label:<20}  {import_ms:>9.1f}  {ready_ms:>8.1f}")
+        self.stdout.write(f"{'total setup':<20}  {total:>9.1f}")
+
+        modules = slowest_modules(stderr, options["modules"])
+        if modules:
+            self.stdout.write("")
+            self.stdout.write(f"{'module':<50}  {'own ms':>8}")
+            for name, microseconds in modules:
+                self.stdout.write(f"{name:<50}  {microseconds / 1000:>8.1f}")
+
+        if options["budget"] is not None and total > options["budget"]:
+            raise CommandError(f"Setup took {total:.1f} ms, over the {options['budget']:g} ms budget.")
+
+    def cold_start(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", SETUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Django failed to start:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
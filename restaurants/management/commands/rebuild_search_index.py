@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from restaurants.models import Restaurant
+from restaurants.search import refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the restaurant search documents and their full-text index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        batch = []
+        total = 0
+        for pk in Restaurant.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) == batch_size:
+                refresh_search_documents(batch)
+                total += len(batch)
+                batch = []
+        refresh_search_documents(batch)
+        total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} restaurants."))
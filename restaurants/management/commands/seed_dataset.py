@@ -0,0 +1,268 @@
+import random
+from io import BytesIO
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+from accounts.models import UserActivity
+from content.models import Photo, RatingSummary, Review
+from interactions.models import Bookmark, Visited
+from restaurants.geocoding import FixtureGeocoder
+from restaurants.models import Cuisine, MenuItem, Restaurant
+
+User = get_user_model()
+
+CUISINES = [
+    "American", "Bengali", "Chettinad", "Chinese", "Continental", "French", "Goan", "Greek",
+    "Gujarati", "Hyderabadi", "Italian", "Japanese", "Kerala", "Korean", "Lebanese", "Mexican",
+    "Mughlai", "North Indian", "Punjabi", "Rajasthani", "South Indian", "Spanish", "Thai", "Vietnamese",
+]
+CITIES = [
+    "Ahmedabad", "Bengaluru", "Bhopal", "Chandigarh", "Chennai", "Coimbatore", "Delhi", "Goa",
+    "Hyderabad", "Indore", "Jaipur", "Kochi", "Kolkata", "Lucknow", "Mumbai", "Mysuru",
+    "Nagpur", "Pune", "Surat", "Thiruvananthapuram",
+]
+NAME_WORDS = [
+    "Saffron", "Spice", "Garden", "Tandoor", "Coast", "Leaf", "Ember", "Masala", "Pepper", "Olive",
+    "Harbour", "Lotus", "Copper", "Clay", "Mango", "Curry", "Basil", "Bamboo", "Smoke", "Salt",
+]
+PLACE_WORDS = ["Kitchen", "House", "Table", "Bistro", "Cafe", "Diner", "Grill", "Canteen", "Eatery", "Dhaba"]
+DISHES = [
+    "Biryani", "Dosa", "Paneer Tikka", "Butter Chicken", "Ramen", "Pad Thai", "Falafel", "Tacos",
+    "Risotto", "Pizza", "Pasta", "Dim Sum", "Pho", "Kebab", "Thali", "Idli", "Appam", "Curry",
+    "Burger", "Salad", "Sushi", "Noodles", "Pulao", "Kulfi",
+]
+RATING_WEIGHTS = [5, 10, 20, 35, 30]
+# Restaurants are scattered up to this many degrees (about 11 km) around their city's centre.
+CITY_SPREAD = 0.1
+SEED_IMAGES = 6
+SEED_IMAGE_SIZE = (800, 600)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a deterministic synthetic dataset for benchmarking: users, cuisines, "
+        "restaurants, menu items, reviews, photos, bookmarks and visits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=10_000)
+        parser.add_argument("--menu-items", type=int, default=200_000)
+        parser.add_argument("--reviews", type=int, default=2_000_000)
+        parser.add_argument("--users", type=int, default=5_000)
+        parser.add_argument("--photos-per-restaurant", type=int, default=2)
+        parser.add_argument(
+            "--menu-item-photo-ratio", type=float, default=0.25,
+            help="Share of menu items that get a photo.",
+        )
+        parser.add_argument("--bookmarks-per-user", type=int, default=10)
+        parser.add_argument("--visits-per-user", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Seed even though the database already has restaurants.",
+        )
+
+    def handle(self, *args, **options):
+        if Restaurant.objects.exists() and not options["force"]:
+            raise CommandError("The database already has restaurants; use --force to seed anyway.")
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            images = self.seed_images()
+            users = self.seed_users(options["users"])
+            cuisines = self.seed_cuisines()
+            restaurants = self.seed_restaurants(options["restaurants"], cuisines)
+            menu_items = self.seed_menu_items(options["menu_items"], restaurants, cuisines)
+            self.seed_photos(
+                images, users, restaurants, menu_items,
+                options["photos_per_restaurant"], options["menu_item_photo_ratio"],
+            )
+            self.seed_reviews(options["reviews"], users, restaurants, menu_items)
+            self.seed_interactions(Bookmark, users, restaurants, options["bookmarks_per_user"])
+            self.seed_interactions(Visited, users, restaurants, options["visits_per_user"])
+
+            # bulk_create skips the signals that keep these tables current.
+            summaries = RatingSummary.objects.rebuild()
+            self.stdout.write(f"Rebuilt {summaries} rating summaries.")
+            activities = UserActivity.objects.rebuild()
+            self.stdout.write(f"Rebuilt activity counters for {activities} users.")
+            call_command("rebuild_search_index", batch_size=self.batch_size, stdout=self.stdout)
+
+        # Cached pages and fragments predate the new rows.
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS("Seeded dataset and cleared the cache."))
+
+    def create(self, model, objects, keep=True):
+        """Insert ``objects`` in batches, returning them only with ``keep`` to bound memory."""
+        created = []
+        total = 0
+        for batch in batched(objects, self.batch_size):
+            batch = model.objects.bulk_create(batch)
+            total += len(batch)
+            if keep:
+                created.extend(batch)
+        self.stdout.write(f"Created {total} {model._meta.verbose_name_plural}.")
+        return created
+
+    def seed_images(self):
+        """A few shared image files, so photos and covers point at real files."""
+        names = []
+        for i in range(SEED_IMAGES):
+            name = f"photos/seed/{i}.jpg"
+            if not default_storage.exists(name):
+                colour = tuple(self.rng.randrange(256) for _ in range(3))
+                buffer = BytesIO()
+                Image.new("RGB", SEED_IMAGE_SIZE, colour).save(buffer, "JPEG")
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(name)
+        return names
+
+    def seed_users(self, count):
+        password = make_password("seed-password")
+        return self.create(User, (
+            User(username=f"seed_user_{i}", email=f"seed_user_{i}@example.com", password=password)
+            for i in range(count)
+        ))
+
+    def seed_cuisines(self):
+        existing = {cuisine.name: cuisine for cuisine in Cuisine.objects.filter(name__in=CUISINES)}
+        self.create(Cuisine, (Cuisine(name=name) for name in CUISINES if name not in existing))
+        return list(Cuisine.objects.filter(name__in=CUISINES).order_by("name"))
+
+    def seed_restaurants(self, count, cuisines):
+        rng = self.rng
+        geocoder = FixtureGeocoder()
+        centres = {city: geocoder.geocode("", city) for city in CITIES}
+        restaurants = self.create(Restaurant, (
+            self.located_restaurant(i, centres) for i in range(count)
+        ))
+
+        Through = Restaurant.cuisines.through
+        self.create(Through, (
+            Through(restaurant_id=restaurant.pk, cuisine_id=cuisine.pk)
+            for restaurant in restaurants
+            for cuisine in rng.sample(cuisines, rng.randint(1, 3))
+        ), keep=False)
+        return restaurants
+
+    def located_restaurant(self, i, centres):
+        rng = self.rng
+        city = rng.choice(CITIES)
+        latitude, longitude = centres[city]
+        restaurant = Restaurant(
+            name=f"{rng.choice(NAME_WORDS)} {rng.choice(PLACE_WORDS)} {i}",
+            description=f"Synthetic restaurant {i}.",
+            city=city,
+            address=f"{rng.randint(1, 999)} Seed Street",
+            cost_for_two=rng.randrange(200, 5000, 50),
+            veg_type=rng.choice(["veg", "non_veg", "vegan"]),
+            is_open=rng.random() < 0.9,
+            spotlight=i % 500 == 0,
+            latitude=round(latitude + rng.uniform(-CITY_SPREAD, CITY_SPREAD), 6),
+            longitude=round(longitude + rng.uniform(-CITY_SPREAD, CITY_SPREAD), 6),
+        )
+        # bulk_create skips save(), which keeps the geohash current.
+        restaurant.update_geohash()
+        return restaurant
+
+    def seed_menu_items(self, count, restaurants, cuisines):
+        if not restaurants:
+            return []
+        rng = self.rng
+        return self.create(MenuItem, (
+            MenuItem(
+                restaurant_id=restaurants[i % len(restaurants)].pk,
+                cuisine_id=rng.choice(cuisines).pk,
+                name=f"{rng.choice(DISHES)} {i}",
+                price=rng.randrange(50, 1500, 10),
+                is_available=rng.random() < 0.95,
+            )
+            for i in range(count)
+        ))
+
+    def seed_photos(self, images, users, restaurants, menu_items, per_restaurant, menu_item_ratio):
+        rng = self.rng
+        targets = [(restaurant, per_restaurant) for restaurant in restaurants]
+        targets += [(item, 1) for item in menu_items if rng.random() < menu_item_ratio]
+
+        content_types = ContentType.objects.get_for_models(Restaurant, MenuItem)
+        photos = self.create(Photo, (
+            Photo(
+                content_type=content_types[type(obj)],
+                object_id=obj.pk,
+                uploaded_by=rng.choice(users),
+                image=rng.choice(images),
+            )
+            for obj, count in targets
+            for _ in range(count)
+        ))
+
+        # The first photo of each object becomes its cover, as the signal would make it.
+        covers = {}
+        for photo in photos:
+            covers.setdefault((photo.content_type_id, photo.object_id), photo)
+        for model in (Restaurant, MenuItem):
+            objects = []
+            for obj, _ in targets:
+                photo = covers.get((content_types[model].pk, obj.pk))
+                if type(obj) is model and photo is not None:
+                    obj.cover_photo = photo
+                    obj.cover_image = photo.image.name
+                    obj.cover_width, obj.cover_height = SEED_IMAGE_SIZE
+                    objects.append(obj)
+            model.objects.bulk_update(
+                objects, list(model.COVER_FIELDS), batch_size=self.batch_size
+            )
+
+    def seed_reviews(self, count, users, restaurants, menu_items):
+        rng = self.rng
+        content_types = ContentType.objects.get_for_models(Restaurant, MenuItem)
+        targets = [(content_types[Restaurant].pk, r.pk) for r in restaurants]
+        targets += [(content_types[MenuItem].pk, m.pk) for m in menu_items]
+        if not targets:
+            return
+
+        per_user, extra = divmod(count, len(users))
+
+        def reviews():
+            # One review per user and object, as the unique constraint requires.
+            for i, user in enumerate(users):
+                wanted = min(per_user + (i < extra), len(targets))
+                for content_type_id, object_id in rng.sample(targets, wanted):
+                    yield Review(
+                        user_id=user.pk,
+                        content_type_id=content_type_id,
+                        object_id=object_id,
+                        rating=rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                    )
+
+        self.create(Review, reviews(), keep=False)
+
+    def seed_interactions(self, model, users, restaurants, per_user):
+        rng = self.rng
+        wanted = min(per_user, len(restaurants))
+        self.create(model, (
+            model(user_id=user.pk, restaurant_id=restaurant.pk)
+            for user in users
+            for restaurant in rng.sample(restaurants, wanted)
+        ), keep=False)
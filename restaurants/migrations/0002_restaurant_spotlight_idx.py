@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(condition=models.Q(('spotlight', True)), fields=['name'], name='restaurant_spotlight_idx'),
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:49
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+DOCUMENT_TABLE = 'restaurants_restaurantsearchdocument'
+FTS_TABLE = 'restaurants_search_fts'
+COLUMNS = ('name', 'city', 'cuisines', 'menu_items')
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {', '.join(COLUMNS)},
+        content='{DOCUMENT_TABLE}', content_rowid='restaurant_id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+        VALUES (new.restaurant_id, {', '.join('new.' + c for c in COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.restaurant_id, {', '.join('old.' + c for c in COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.restaurant_id, {', '.join('old.' + c for c in COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {', '.join(COLUMNS)})
+        VALUES (new.restaurant_id, {', '.join('new.' + c for c in COLUMNS)});
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}" for suffix in ('ai', 'ad', 'au')
+] + [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(cuisines, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(city, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(menu_items, '')), 'D')
+    ) STORED
+    """,
+    f"CREATE INDEX restaurant_search_vector_idx ON {DOCUMENT_TABLE} USING GIN (search_vector)",
+] + [
+    f"CREATE INDEX restaurant_search_{column}_trgm_idx ON {DOCUMENT_TABLE} USING GIN ({column} gin_trgm_ops)"
+    for column in COLUMNS
+]
+
+POSTGRESQL_REVERSE = [
+    f"DROP INDEX IF EXISTS restaurant_search_{column}_trgm_idx" for column in COLUMNS
+] + [
+    "DROP INDEX IF EXISTS restaurant_search_vector_idx",
+    f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_vendor_sql(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return run
+
+
+def backfill_search_documents(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    MenuItem = apps.get_model('restaurants', 'MenuItem')
+    RestaurantSearchDocument = apps.get_model('restaurants', 'RestaurantSearchDocument')
+
+    cuisines = defaultdict(list)
+    for restaurant_id, cuisine in Restaurant.cuisines.through.objects.values_list('restaurant_id', 'cuisine__name'):
+        cuisines[restaurant_id].append(cuisine)
+
+    menu_items = defaultdict(list)
+    for restaurant_id, item in MenuItem.objects.order_by().values_list('restaurant_id', 'name'):
+        menu_items[restaurant_id].append(item)
+
+    RestaurantSearchDocument.objects.bulk_create(
+        (
+            RestaurantSearchDocument(
+                restaurant_id=pk,
+                name=name,
+                city=city,
+                cuisines=' '.join(sorted(cuisines[pk])),
+                menu_items=' '.join(sorted(menu_items[pk])),
+            )
+            for pk, name, city in Restaurant.objects.order_by().values_list('pk', 'name', 'city').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0002_restaurant_spotlight_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantSearchDocument',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='restaurants.restaurant')),
+                ('name', models.TextField(blank=True)),
+                ('city', models.TextField(blank=True)),
+                ('cuisines', models.TextField(blank=True)),
+                ('menu_items', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_cover_photos(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Photo = apps.get_model('content', 'Photo')
+
+    for model_name in ('restaurant', 'menuitem'):
+        content_type = ContentType.objects.filter(app_label='restaurants', model=model_name).first()
+        if content_type is None:
+            continue
+        model = apps.get_model('restaurants', model_name)
+        covers = {}
+        for photo in Photo.objects.filter(content_type=content_type).order_by('-id').only('id', 'object_id', 'image').iterator():
+            covers[photo.object_id] = photo
+        for object_id, photo in covers.items():
+            model.objects.filter(pk=object_id).update(cover_photo=photo, cover_image=photo.image.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_rating_summary'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('restaurants', '0003_restaurant_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='cover_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, upload_to='photos/'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='cover_photo',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='content.photo'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='cover_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='cover_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, upload_to='photos/'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='cover_photo',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='content.photo'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='cover_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_cover_photos, migrations.RunPython.noop),
+    ]
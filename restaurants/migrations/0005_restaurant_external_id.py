@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0004_cover_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Stable key from the source catalog; imports upsert on it.', max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_review_photo_indexes'),
+        ('restaurants', '0005_restaurant_external_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['restaurant', 'name'], name='menuitem_restaurant_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['name', 'id'], name='restaurant_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['cost_for_two'], name='restaurant_cost_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['veg_type', 'cost_for_two'], name='restaurant_veg_cost_idx'),
+        ),
+    ]
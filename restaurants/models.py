@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericRelation
-from content.models import Review, Photo
+from django.core.validators import MaxValueValidator, MinValueValidator
+from content.models import Review, Photo, RatingSummary, RatedQuerySet, CoverPhotoModel
 from django.urls import reverse
+from restaurants.geo import encode_geohash
 
 class Cuisine(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -13,13 +15,17 @@ class Cuisine(models.Model):
         return self.name
 
 
-class Restaurant(models.Model):
+class Restaurant(CoverPhotoModel):
     VEG_CHOICES = [
         ('veg', 'Vegetarian'),
         ('non_veg', 'Non-Vegetarian'),
         ('vegan', 'Vegan'),
     ]
 
+    external_id = models.CharField(
+        max_length=64, unique=True, null=True, blank=True,
+        help_text="Stable key from the source catalog; imports upsert on it.",
+    )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     cuisines = models.ManyToManyField(Cuisine, related_name='restaurants')
@@ -31,31 +37,69 @@ class Restaurant(models.Model):
     opening_time = models.TimeField(null=True, blank=True)
     closing_time = models.TimeField(null=True, blank=True)
     spotlight = models.BooleanField(default=False)
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    geohash = models.CharField(
+        max_length=12, blank=True, default='', db_index=True, editable=False,
+        help_text="Geohash of the coordinates; near-me searches prune on its prefixes.",
+    )
 
     # Reverse relations
     reviews = GenericRelation(Review, related_query_name='restaurant')
     photos = GenericRelation(Photo, related_query_name='restaurant')
+    rating_summary = GenericRelation(RatingSummary, related_query_name='restaurant')
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RatedQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['name'],
+                condition=models.Q(spotlight=True),
+                name='restaurant_spotlight_idx',
+            ),
+            models.Index(fields=['name', 'id'], name='restaurant_name_idx'),
+            models.Index(fields=['cost_for_two'], name='restaurant_cost_idx'),
+            models.Index(fields=['veg_type', 'cost_for_two'], name='restaurant_veg_cost_idx'),
+        ]
 
     @property
     def ratings(self):
         if not hasattr(self, '_ratings_cache'):
-            self._ratings_cache = self.reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0
+            summary = RatingSummary.objects.for_instance(self).only('average').first()
+            self._ratings_cache = summary.average if summary else 0
         return self._ratings_cache
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+    def update_geohash(self):
+        """Recompute ``geohash`` from the coordinates; blank while either is unknown."""
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+
     def get_absolute_url(self):
         return reverse("restaurants:restaurant_detail", args=[self.pk])
 
 
-class MenuItem(models.Model):
+class MenuItem(CoverPhotoModel):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='menu_items')
     cuisine = models.ForeignKey(Cuisine, on_delete=models.SET_NULL, null=True, blank=True, related_name='menu_items')
     name = models.CharField(max_length=255)
@@ -66,14 +110,21 @@ class MenuItem(models.Model):
     # Reverse relations
     reviews = GenericRelation(Review, related_query_name='menu_item')
     photos = GenericRelation(Photo, related_query_name='menu_item')
+    rating_summary = GenericRelation(RatingSummary, related_query_name='menu_item')
+
+    objects = RatedQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['restaurant', 'name'], name='menuitem_restaurant_name_idx'),
+        ]
 
     @property
     def ratings(self):
         if not hasattr(self, '_ratings_cache'):
-            self._ratings_cache = self.reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0
+            summary = RatingSummary.objects.for_instance(self).only('average').first()
+            self._ratings_cache = summary.average if summary else 0
         return self._ratings_cache
 
     def __str__(self):
@@ -81,3 +132,23 @@ class MenuItem(models.Model):
 
     def get_absolute_url(self):
         return reverse("restaurants:menu_item_detail", kwargs={'menu_id': self.pk})
+
+
+class RestaurantSearchDocument(models.Model):
+    """
+    Flattened search text for one restaurant.
+
+    Rows are kept current by ``restaurants.search.refresh_search_documents``;
+    the database-specific full-text index is maintained from this table.
+    """
+    restaurant = models.OneToOneField(
+        Restaurant, on_delete=models.CASCADE, primary_key=True, related_name='search_document'
+    )
+    name = models.TextField(blank=True)
+    city = models.TextField(blank=True)
+    cuisines = models.TextField(blank=True)
+    menu_items = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Search document for restaurant {self.restaurant_id}"
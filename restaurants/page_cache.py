@@ -0,0 +1,222 @@
+import hashlib
+from datetime import datetime
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages import get_messages
+from django.db.models import OuterRef, Subquery
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from content.models import Photo, RatingSummary, Review
+from restaurants.caching import get_or_compute
+from restaurants.models import MenuItem
+from restaurants.versions import bump_versions, get_versions
+
+LIST_TAG = "list"
+CUISINES_TAG = "cuisines"
+# Ratings and photos of any menu item, which the list pages themselves don't show.
+MENU_ITEMS_TAG = "menu-items"
+
+
+def restaurant_tag(pk):
+    return f"restaurant:{pk}"
+
+
+def menu_item_tag(pk):
+    return f"menu:{pk}"
+
+
+def _version_key(tag):
+    return f"restaurants:page-version:{tag}"
+
+
+def invalidate_pages(tags):
+    bump_versions(_version_key(tag) for tag in tags)
+
+
+def invalidate_restaurant_pages(restaurant_ids, include_list=True):
+    """
+    Evict the detail pages of the given restaurants and the pages of their
+    menu items, which show the restaurant and its other dishes.
+    """
+    restaurant_ids = set(restaurant_ids)
+    if not restaurant_ids:
+        return
+    tags = [restaurant_tag(pk) for pk in restaurant_ids]
+    tags += [
+        menu_item_tag(pk)
+        for pk in MenuItem.objects.filter(restaurant_id__in=restaurant_ids).values_list("pk", flat=True)
+    ]
+    if include_list:
+        tags.append(LIST_TAG)
+    invalidate_pages(tags)
+
+
+def canonical_query(query_dict):
+    """The query string with empty values dropped and parameters sorted."""
+    return urlencode(sorted(
+        (key, value) for key, values in query_dict.lists() for value in values if value != ""
+    ))
+
+
+def page_version(request, tags):
+    """
+    A token that changes whenever the request's path, canonical query or any
+    of the ``tags`` versions does, e.g. for cache keys and ETags.
+    """
+    versions = get_versions(_version_key(tag) for tag in tags)
+    page = hashlib.md5(
+        f"{request.path}?{canonical_query(request.GET)}".encode(), usedforsecurity=False
+    ).hexdigest()
+    generation = ".".join(str(versions[_version_key(tag)]) for tag in tags)
+    return f"{page}:{generation}"
+
+
+def page_cache_key(request, tags):
+    return f"restaurants:page:{page_version(request, tags)}"
+
+
+def is_cacheable_request(request):
+    return (
+        settings.PAGE_CACHE_ENABLED
+        and request.method == "GET"
+        and not request.user.is_authenticated
+        and request.headers.get("X-Requested-With") != "XMLHttpRequest"
+        # Flash messages are rendered into the page for this visitor only.
+        and not len(get_messages(request))
+    )
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # A CSRF token in the markup belongs to a single visitor.
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    )
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve anonymous GETs from a whole-page cache.
+
+    Each page is stored under the current versions of its ``page_cache_tags``;
+    the signal handlers bump those versions when the underlying rows change,
+    so a cached page never outlives the data it was rendered from.
+    """
+
+    def get_page_cache_tags(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        return self.serve_from_cache(
+            request, lambda: super(AnonymousPageCacheMixin, self).dispatch(request, *args, **kwargs)
+        )
+
+    async def adispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not await sync_to_async(is_cacheable_request)(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        # The cache and its stampede lock are synchronous; a miss comes back
+        # to the event loop to run the view.
+        async def view():
+            return await super(AnonymousPageCacheMixin, self).dispatch(request, *args, **kwargs)
+
+        return await sync_to_async(self.serve_from_cache)(request, async_to_sync(view))
+
+    def serve_from_cache(self, request, view):
+        key = page_cache_key(request, [*self.get_page_cache_tags(), CUISINES_TAG])
+        response = None
+
+        def render():
+            nonlocal response
+            response = view()
+            if hasattr(response, "render"):
+                response.render()
+            if is_cacheable_response(request, response):
+                return response.content, response["Content-Type"]
+            return None
+
+        # Only one worker re-renders an expired page; the others keep serving it.
+        cached = get_or_compute(
+            key, render, settings.PAGE_CACHE_TIMEOUT, settings.PAGE_CACHE_STALE_TIMEOUT
+        )
+        if response is not None:
+            if cached is not None:
+                response["X-Page-Cache"] = "miss"
+            return response
+
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response["X-Page-Cache"] = "hit"
+        return response
+
+
+class ConditionalPageMixin:
+    """
+    Answer GETs of an unchanged detail page with 304 before the object is loaded.
+
+    The validators are read from the database in one query, so they hold on
+    every worker whatever the cache backend: the object's ``validator_fields``,
+    its rating summary, its newest photo and, for signed-in visitors, their
+    own review and the state ``get_viewer_state_queryset`` adds. All of it is
+    folded into the ETag; the newest timestamp among it is Last-Modified.
+    Responses ask the browser to revalidate every time.
+    """
+
+    # Columns of the object, or of rows it joins, that the page shows.
+    validator_fields = ("updated_at",)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or len(get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)
+
+        viewer_state = self.get_viewer_state()
+        if viewer_state is None:
+            # A missing object; let the view answer with its 404.
+            return super().dispatch(request, *args, **kwargs)
+
+        def etag(request, *args, **kwargs):
+            state = ":".join(str(value) for value in viewer_state.values())
+            page = f"{request.path}?{canonical_query(request.GET)}:{request.user.pk}:{state}"
+            return hashlib.md5(page.encode(), usedforsecurity=False).hexdigest()
+
+        def last_modified(request, *args, **kwargs):
+            times = [value for value in viewer_state.values() if isinstance(value, datetime)]
+            return max(times, default=None)
+
+        response = condition(etag, last_modified)(super().dispatch)(request, *args, **kwargs)
+        if response.status_code == 200:
+            patch_cache_control(response, private=True, no_cache=True)
+        elif response.status_code != 304:
+            del response["ETag"]
+            del response["Last-Modified"]
+        return response
+
+    def get_viewer_state_queryset(self):
+        content_type = ContentType.objects.get_for_model(self.model)
+        related = {"content_type": content_type, "object_id": OuterRef("pk")}
+        summary = RatingSummary.objects.filter(**related)
+        queryset = self.model.objects.filter(pk=self.kwargs[self.pk_url_kwarg]).annotate(
+            rating_updated_at=Subquery(summary.values("updated_at")[:1]),
+            rating_review_count=Subquery(summary.values("review_count")[:1]),
+            newest_photo_id=Subquery(Photo.objects.filter(**related).order_by("-pk").values("pk")[:1]),
+        )
+        if not self.request.user.is_authenticated:
+            return queryset
+        own_review = Review.objects.filter(user=self.request.user, **related)
+        return queryset.annotate(own_review_updated_at=Subquery(own_review.values("updated_at")[:1]))
+
+    def get_viewer_state(self):
+        """The validator values of the object as a dict, ``None`` for a missing object."""
+        queryset = self.get_viewer_state_queryset()
+        return queryset.values(*self.validator_fields, *queryset.query.annotations).first()
@@ -0,0 +1,218 @@
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from restaurants.models import Restaurant, MenuItem, RestaurantSearchDocument
+
+SEARCH_FIELDS = ("name", "city", "cuisines", "menu_items")
+FTS_TABLE = "restaurants_search_fts"
+FUZZY_THRESHOLD = 0.5
+FUZZY_CANDIDATES = 200
+
+
+def trigrams(text):
+    text = " ".join(text.lower().split())
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(query, text):
+    """Share of the query's trigrams that also occur in ``text``."""
+    wanted = trigrams(query)
+    if not wanted:
+        return 0.0
+    return len(wanted & trigrams(text)) / len(wanted)
+
+
+def refresh_search_documents(restaurant_ids):
+    """Rebuild the search documents of the given restaurants in a few batched queries."""
+    restaurant_ids = set(restaurant_ids)
+    if not restaurant_ids:
+        return
+
+    cuisines = defaultdict(list)
+    for restaurant_id, cuisine in (
+        Restaurant.cuisines.through.objects
+        .filter(restaurant_id__in=restaurant_ids)
+        .values_list("restaurant_id", "cuisine__name")
+    ):
+        cuisines[restaurant_id].append(cuisine)
+
+    menu_items = defaultdict(list)
+    for restaurant_id, item in (
+        MenuItem.objects.order_by()
+        .filter(restaurant_id__in=restaurant_ids)
+        .values_list("restaurant_id", "name")
+    ):
+        menu_items[restaurant_id].append(item)
+
+    documents = [
+        RestaurantSearchDocument(
+            restaurant_id=pk,
+            name=name,
+            city=city,
+            cuisines=" ".join(sorted(cuisines[pk])),
+            menu_items=" ".join(sorted(menu_items[pk])),
+        )
+        for pk, name, city in (
+            Restaurant.objects.order_by()
+            .filter(pk__in=restaurant_ids)
+            .values_list("pk", "name", "city")
+        )
+    ]
+    RestaurantSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["restaurant"],
+        update_fields=["name", "city", "cuisines", "menu_items", "updated_at"],
+    )
+
+
+def search(queryset, query, field=None, rank=False):
+    """
+    Restrict a Restaurant queryset to rows whose search document matches ``query``.
+
+    ``field`` limits the match to one of ``SEARCH_FIELDS``; ``None`` searches
+    the whole document. Substring matches win; when there are none the query
+    is retried with trigram similarity so small typos still find results.
+    With ``rank`` the rows are annotated with ``search_rank`` (higher is better).
+    """
+    query = " ".join(query.split())
+    if not query:
+        return queryset
+    # The lookups run where the queryset will, which the read router may have sent to a replica.
+    return get_backend(queryset.db).search(queryset, query, field, rank)
+
+
+class BaseSearchBackend:
+    def __init__(self, using):
+        self.using = using
+
+    def search(self, queryset, query, field, rank):
+        queryset = queryset.filter(self._contains(query, field))
+        if rank:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+    def _contains(self, query, field):
+        condition = Q()
+        for name in self._fields(field):
+            condition |= Q(**{f"search_document__{name}__icontains": query})
+        return condition
+
+    def _fields(self, field):
+        return (field,) if field else SEARCH_FIELDS
+
+    def _fuzzy(self, queryset, scores, rank):
+        if not scores:
+            if rank:
+                queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+            return queryset.none()
+        queryset = queryset.filter(pk__in=scores)
+        if rank:
+            queryset = queryset.annotate(search_rank=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in scores.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            ))
+        return queryset
+
+    def _score(self, query, field, candidate_ids):
+        scores = {}
+        documents = RestaurantSearchDocument.objects.using(self.using).filter(pk__in=candidate_ids)
+        for document in documents:
+            best = max(similarity(query, getattr(document, name)) for name in self._fields(field))
+            if best >= FUZZY_THRESHOLD:
+                scores[document.pk] = best
+        return scores
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 with the trigram tokenizer, which gives indexed substring matching."""
+
+    def search(self, queryset, query, field, rank):
+        # The trigram tokenizer cannot match anything shorter than three characters.
+        if len(query) < 3:
+            return super().search(queryset, query, field, rank)
+
+        match = self._expression([query], field)
+        if not self._exists(match):
+            candidates = self._candidates(self._expression(trigrams(query), field))
+            return self._fuzzy(queryset, self._score(query, field, candidates), rank)
+
+        queryset = queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {Restaurant._meta.db_table}.id",
+                [match],
+                output_field=FloatField(),
+            ))
+        return queryset
+
+    def _expression(self, phrases, field):
+        terms = " OR ".join('"{}"'.format(phrase.replace('"', '""')) for phrase in phrases)
+        columns = " ".join(self._fields(field))
+        return f"{{{columns}}} : ({terms})"
+
+    def _exists(self, match):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT 1", [match])
+            return cursor.fetchone() is not None
+
+    def _candidates(self, match):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s",
+                [match, FUZZY_CANDIDATES],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """ILIKE and word similarity served by pg_trgm GIN indexes, ranked on a tsvector."""
+
+    def search(self, queryset, query, field, rank):
+        if not RestaurantSearchDocument.objects.using(self.using).filter(self._document_contains(query, field)).exists():
+            candidates = self._candidates(query, field)
+            return self._fuzzy(queryset, self._score(query, field, candidates), rank)
+
+        queryset = queryset.filter(self._contains(query, field))
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT ts_rank(search_vector, plainto_tsquery('simple', %s)) "
+                f"FROM {RestaurantSearchDocument._meta.db_table} "
+                f"WHERE restaurant_id = {Restaurant._meta.db_table}.id",
+                [query],
+                output_field=FloatField(),
+            ))
+        return queryset
+
+    def _document_contains(self, query, field):
+        condition = Q()
+        for name in self._fields(field):
+            condition |= Q(**{f"{name}__icontains": query})
+        return condition
+
+    def _candidates(self, query, field):
+        fields = self._fields(field)
+        match_sql = " OR ".join(f"%s <%% {name}" for name in fields)
+        similarity_sql = "GREATEST({})".format(", ".join(f"word_similarity(%s, {name})" for name in fields))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT restaurant_id FROM {RestaurantSearchDocument._meta.db_table} "
+                f"WHERE {match_sql} ORDER BY {similarity_sql} DESC LIMIT %s",
+                [query] * len(fields) * 2 + [FUZZY_CANDIDATES],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_backend(using):
+    vendor = connections[using].vendor
+    if vendor == "sqlite":
+        return SQLiteSearchBackend(using)
+    if vendor == "postgresql":
+        return PostgreSQLSearchBackend(using)
+    return BaseSearchBackend(using)
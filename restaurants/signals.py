@@ -0,0 +1,122 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from content.models import Review, Photo, PhotoRendition
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from restaurants.page_cache import CUISINES_TAG, MENU_ITEMS_TAG, invalidate_pages, invalidate_restaurant_pages
+from restaurants.search import refresh_search_documents
+from restaurants.spotlight import get_cached_spotlight_ids, invalidate_spotlight
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def refresh_spotlight_on_restaurant_change(sender, instance, **kwargs):
+    # A restaurant leaving the spotlight is only known by its presence in the cache.
+    if instance.spotlight or instance.pk in get_cached_spotlight_ids():
+        invalidate_spotlight()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def refresh_spotlight_on_content_change(sender, instance, **kwargs):
+    if instance.content_type_id != ContentType.objects.get_for_model(Restaurant).pk:
+        return
+    if instance.object_id in get_cached_spotlight_ids():
+        invalidate_spotlight()
+
+
+@receiver(post_save, sender=Restaurant)
+def refresh_search_on_restaurant_save(sender, instance, raw, **kwargs):
+    if not raw:
+        refresh_search_documents([instance.pk])
+
+
+def _is_restaurant_deletion(origin):
+    return isinstance(origin, Restaurant) or (isinstance(origin, QuerySet) and origin.model is Restaurant)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def refresh_search_on_menu_item_change(sender, instance, raw=False, origin=None, **kwargs):
+    # Refreshing during a restaurant's cascade would recreate its deleted document.
+    if not raw and not _is_restaurant_deletion(origin):
+        refresh_search_documents([instance.restaurant_id])
+
+
+@receiver(m2m_changed, sender=Restaurant.cuisines.through)
+def refresh_search_on_cuisines_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        if action != "pre_clear":
+            refresh_search_documents([instance.pk])
+    elif action == "pre_clear":
+        # The affected restaurants are gone from the through table after the clear.
+        instance._search_clear_ids = list(instance.restaurants.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_search_documents(getattr(instance, "_search_clear_ids", ()))
+    else:
+        refresh_search_documents(pk_set or ())
+
+
+@receiver(post_save, sender=Cuisine)
+def refresh_search_on_cuisine_rename(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        refresh_search_documents(instance.restaurants.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def refresh_pages_on_restaurant_change(sender, instance, **kwargs):
+    invalidate_restaurant_pages([instance.pk])
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def refresh_pages_on_menu_item_change(sender, instance, **kwargs):
+    # The list is searchable by dish name.
+    invalidate_restaurant_pages([instance.restaurant_id])
+
+
+def _refresh_pages_for_content(content_type_id, object_id):
+    if content_type_id == ContentType.objects.get_for_model(Restaurant).pk:
+        invalidate_restaurant_pages([object_id])
+    elif content_type_id == ContentType.objects.get_for_model(MenuItem).pk:
+        restaurant_ids = MenuItem.objects.filter(pk=object_id).values_list("restaurant_id", flat=True)
+        invalidate_restaurant_pages(restaurant_ids, include_list=False)
+        invalidate_pages([MENU_ITEMS_TAG])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def refresh_pages_on_content_change(sender, instance, **kwargs):
+    _refresh_pages_for_content(instance.content_type_id, instance.object_id)
+
+
+@receiver(post_save, sender=PhotoRendition)
+def refresh_pages_on_new_rendition(sender, instance, created, **kwargs):
+    if created:
+        photo = instance.photo
+        _refresh_pages_for_content(photo.content_type_id, photo.object_id)
+
+
+@receiver(m2m_changed, sender=Restaurant.cuisines.through)
+def refresh_pages_on_cuisines_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_restaurant_pages([instance.pk])
+    else:
+        invalidate_restaurant_pages(pk_set or getattr(instance, "_search_clear_ids", ()))
+
+
+@receiver(post_save, sender=Cuisine)
+@receiver(post_delete, sender=Cuisine)
+def refresh_pages_on_cuisine_change(sender, instance, **kwargs):
+    # Cuisine names appear in the filter form and on every page that lists dishes.
+    invalidate_pages([CUISINES_TAG])
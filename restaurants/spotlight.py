@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.db import transaction
+from content.renditions import attach_cover_renditions
+from restaurants.caching import get_or_compute
+from restaurants.models import Restaurant
+
+SPOTLIGHT_CACHE_KEY = "restaurants:spotlight"
+SPOTLIGHT_LIMIT = 8
+SPOTLIGHT_TIMEOUT = 60 * 15
+
+
+def get_spotlight_restaurants():
+    """
+    Return the spotlight strip, independent of any list filters.
+
+    The rows are shared by every visitor, so per-user state such as
+    ``is_bookmarked`` must be layered on by the caller.
+    """
+    return get_or_compute(SPOTLIGHT_CACHE_KEY, _load_spotlight, SPOTLIGHT_TIMEOUT)
+
+
+def _load_spotlight():
+    return attach_cover_renditions(
+        Restaurant.objects
+        .filter(spotlight=True)
+        .with_rating()
+        .order_by('name')[:SPOTLIGHT_LIMIT]
+    )
+
+
+def get_cached_spotlight_ids():
+    entry = cache.get(SPOTLIGHT_CACHE_KEY)
+    return {restaurant.pk for restaurant in entry[0]} if entry else set()
+
+
+def invalidate_spotlight():
+    # Again after the commit, in case a concurrent reload cached the rows as they were.
+    if transaction.get_connection().in_atomic_block:
+        cache.delete(SPOTLIGHT_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(SPOTLIGHT_CACHE_KEY))
@@ -0,0 +1,37 @@
+import { showToast } from './toast.js';
+
+document.addEventListener('DOMContentLoaded', function() {
+    const loadMore = document.getElementById('load-more');
+    const cards = document.getElementById('restaurant-cards');
+    if (!loadMore || !cards) return;
+
+    loadMore.addEventListener('click', async (event) => {
+        event.preventDefault();
+        loadMore.classList.add('disabled');
+
+        try {
+            const response = await fetch(loadMore.href, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            if (!response.ok) {
+                throw new Error('Network response was not ok');
+            }
+
+            const data = await response.json();
+            cards.insertAdjacentHTML('beforeend', data.html);
+
+            if (data.next_cursor) {
+                const query = new URLSearchParams(loadMore.dataset.baseQuery);
+                query.set('cursor', data.next_cursor);
+                loadMore.href = `?${query.toString()}`;
+                loadMore.classList.remove('disabled');
+            } else {
+                loadMore.remove();
+            }
+        } catch (error) {
+            console.error('Load more error:', error);
+            loadMore.classList.remove('disabled');
+            showToast("Could not load more restaurants. Please try again.", "danger");
+        }
+    });
+});
@@ -0,0 +1,28 @@
+import { showToast } from './toast.js';
+
+document.addEventListener('DOMContentLoaded', function() {
+    const button = document.querySelector('[data-near-me]');
+    if (!button) return;
+    const input = document.getElementById(button.dataset.nearMe);
+
+    if (!('geolocation' in navigator)) {
+        button.remove();
+        return;
+    }
+
+    button.addEventListener('click', () => {
+        button.disabled = true;
+        navigator.geolocation.getCurrentPosition(
+            (position) => {
+                const { latitude, longitude } = position.coords;
+                input.value = `${latitude.toFixed(5)},${longitude.toFixed(5)}`;
+                input.form.requestSubmit();
+            },
+            () => {
+                button.disabled = false;
+                showToast('Could not get your location.', 'danger');
+            },
+            { maximumAge: 300000, timeout: 10000 }
+        );
+    });
+});
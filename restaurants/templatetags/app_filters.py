@@ -1,6 +1,9 @@
 from django import template
 from django.urls import reverse
+from django.utils.http import urlencode
 from restaurants.models import Restaurant, MenuItem
+from restaurants.cards import render_cards
+from restaurants.pagination import encode_cursor
 
 register = template.Library()
 
@@ -11,3 +14,18 @@ def form_action_url(obj):
     elif isinstance(obj, MenuItem):
         return reverse('restaurants:menu_item_detail', kwargs={'menu_id': obj.pk})
     return "#" # Fallback URL
+
+@register.simple_tag(takes_context=True)
+def restaurant_cards(context, restaurants):
+    return render_cards(restaurants, context.get('request'))
+
+@register.simple_tag
+def review_feed_url(obj, after=None):
+    """The review feed of ``obj``, continuing after the review ``after`` if given."""
+    if isinstance(obj, Restaurant):
+        url = reverse('restaurants:restaurant_reviews', kwargs={'pk': obj.pk})
+    else:
+        url = reverse('restaurants:menu_item_reviews', kwargs={'menu_id': obj.pk})
+    if after is not None:
+        url += "?" + urlencode({"cursor": encode_cursor("-created_at", after.created_at, after.pk)})
+    return url
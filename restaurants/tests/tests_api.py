@@ -0,0 +1,207 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from content.models import Review, Photo
+from myrestaurant.testing import QueryBudgetTestMixin
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class CatalogApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="critic", email="critic@example.com", password="pass1234")
+        self.italian = Cuisine.objects.create(name="Italian")
+        self.alpha = Restaurant.objects.create(
+            name="Alpha", city="Pune", address="1 Street", cost_for_two=300, veg_type="veg",
+        )
+        self.alpha.cuisines.add(self.italian)
+        self.beta = Restaurant.objects.create(
+            name="Beta", city="Goa", address="2 Street", cost_for_two=900, veg_type="non_veg",
+        )
+        self.pizza = MenuItem.objects.create(name="Pizza", price=250, restaurant=self.alpha, cuisine=self.italian)
+        Review.objects.create(user=self.user, content_object=self.alpha, rating=4, comment="Good")
+
+    def test_list_returns_default_fields_and_follows_filters(self):
+        response = self.client.get(reverse("api:restaurant_list"), {"city": "Pune"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual([row["name"] for row in data], ["Alpha"])
+        self.assertEqual(data[0]["cuisines"], ["Italian"])
+        self.assertEqual(data[0]["avg_rating"], 4.0)
+        self.assertEqual(data[0]["url"], self.alpha.get_absolute_url())
+        self.assertNotIn("address", data[0])
+
+    def test_sparse_fields_load_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("api:restaurant_list"), {"fields": "id,name"})
+
+        self.assertEqual(response.json()["data"], [
+            {"id": self.alpha.pk, "name": "Alpha"},
+            {"id": self.beta.pk, "name": "Beta"},
+        ])
+        restaurant_sql = [q["sql"] for q in queries if 'FROM "restaurants_restaurant"' in q["sql"]]
+        self.assertTrue(restaurant_sql)
+        self.assertNotIn('"address"', restaurant_sql[0])
+        self.assertFalse(any("restaurants_cuisine" in q["sql"] for q in queries))
+
+    def test_includes_nest_menu_items_and_photos(self):
+        Photo.objects.create(
+            content_object=self.alpha, uploaded_by=self.user,
+            image=SimpleUploadedFile("a.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+        )
+
+        response = self.client.get(reverse("api:restaurant_detail", args=[self.alpha.pk]), {
+            "fields": "name",
+            "include": "menu_items,photos",
+            "fields[menu_items]": "name,price",
+        })
+
+        data = response.json()["data"]
+        self.assertEqual(data["name"], "Alpha")
+        self.assertEqual(data["menu_items"], [{"name": "Pizza", "price": 250}])
+        self.assertEqual(len(data["photos"]), 1)
+        self.assertEqual(set(data["photos"][0]), {"id", "image"})
+
+    def test_unknown_fields_and_includes_are_rejected(self):
+        for params in ({"fields": "name,secret"}, {"include": "owners"}, {"include": "photos", "fields[photos]": "exif"}):
+            response = self.client.get(reverse("api:restaurant_list"), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json())
+
+    def test_missing_object_is_a_json_404(self):
+        response = self.client.get(reverse("api:menu_item_detail", args=[999]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Not found."})
+
+    def test_list_pages_with_a_cursor(self):
+        first = self.client.get(reverse("api:restaurant_list"), {"limit": 1, "fields": "name"}).json()
+        second = self.client.get(
+            reverse("api:restaurant_list"), {"limit": 1, "fields": "name", "cursor": first["next_cursor"]}
+        ).json()
+
+        self.assertEqual(first["data"], [{"name": "Alpha"}])
+        self.assertEqual(second["data"], [{"name": "Beta"}])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_reviews_of_a_restaurant(self):
+        response = self.client.get(reverse("api:review_list"), {"restaurant": self.alpha.pk})
+
+        data = response.json()["data"]
+        self.assertEqual([(r["user"], r["rating"], r["comment"]) for r in data], [("critic", 4, "Good")])
+        self.assertEqual(self.client.get(reverse("api:review_list")).status_code, 400)
+
+    def test_reviews_without_the_user_field(self):
+        response = self.client.get(reverse("api:review_list"), {"restaurant": self.alpha.pk, "fields": "rating"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], [{"rating": 4}])
+
+    def test_cuisines(self):
+        response = self.client.get(reverse("api:cuisine_list"))
+
+        self.assertEqual(response.json()["data"], [{"id": self.italian.pk, "name": "Italian"}])
+
+    def test_repeat_poll_gets_304_without_queries(self):
+        url = reverse("api:restaurant_detail", args=[self.alpha.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_the_data_does(self):
+        url = reverse("api:restaurant_detail", args=[self.alpha.pk])
+        etag = self.client.get(url)["ETag"]
+
+        second = User.objects.create_user(username="second", email="second@example.com")
+        Review.objects.create(user=second, content_object=self.alpha, rating=2)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["avg_rating"], 3.0)
+
+    def test_list_etag_with_menu_items_follows_menu_item_ratings(self):
+        url = reverse("api:restaurant_list")
+        params = {"include": "menu_items"}
+        etag = self.client.get(url, params)["ETag"]
+        plain_etag = self.client.get(url)["ETag"]
+
+        Review.objects.create(user=self.user, content_object=self.pizza, rating=5)
+
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=plain_etag).status_code, 304)
+
+    def test_errors_carry_no_etag(self):
+        response = self.client.get(reverse("api:restaurant_detail", args=[999]))
+
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ApiQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    urlconf = 'restaurants.api_urls'
+    query_budgets = {
+        'restaurant_list': 4,
+        'restaurant_detail': 4,
+        'menu_item_detail': 2,
+        'cuisine_list': 1,
+        'review_list': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username="budget", email="budget@example.com", password="pass1234")
+        cuisine = Cuisine.objects.create(name="Italian")
+        for i in range(4):
+            restaurant = Restaurant.objects.create(
+                name=f"Place {i}", city="Test City", address=f"{i} Street", cost_for_two=500, veg_type="veg",
+            )
+            restaurant.cuisines.add(cuisine)
+            Review.objects.create(user=user, content_object=restaurant, rating=4)
+            Photo.objects.create(
+                content_object=restaurant, uploaded_by=user,
+                image=SimpleUploadedFile(f"r{i}.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+            )
+            for j in range(3):
+                item = MenuItem.objects.create(name=f"Dish {i}{j}", price=100, restaurant=restaurant)
+                Review.objects.create(user=user, content_object=item, rating=3)
+                Photo.objects.create(
+                    content_object=item, uploaded_by=user,
+                    image=SimpleUploadedFile(f"m{i}{j}.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+                )
+        self.restaurant = restaurant
+        self.menu_item = item
+
+    def test_restaurant_list(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('api:restaurant_list'), {"include": "menu_items,photos"})
+        )
+
+    def test_restaurant_detail(self):
+        self.assertWithinQueryBudget(self.client.get(
+            reverse('api:restaurant_detail', args=[self.restaurant.pk]), {"include": "menu_items,photos"}
+        ))
+
+    def test_menu_item_detail(self):
+        self.assertWithinQueryBudget(self.client.get(
+            reverse('api:menu_item_detail', args=[self.menu_item.pk]), {"include": "photos"}
+        ))
+
+    def test_cuisine_list(self):
+        self.assertWithinQueryBudget(self.client.get(reverse('api:cuisine_list')))
+
+    def test_review_list(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('api:review_list'), {"menu_item": self.menu_item.pk})
+        )
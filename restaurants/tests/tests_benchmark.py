@@ -0,0 +1,184 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.contrib.auth import get_user_model
+from restaurants.models import Restaurant, MenuItem, RestaurantSearchDocument
+from content.models import Review, Photo, RatingSummary
+from interactions.models import Bookmark, Visited
+from restaurants.management.commands.explain_views import sqlite_issues
+
+User = get_user_model()
+
+SMALL = dict(
+    restaurants=12, menu_items=36, reviews=90, users=6,
+    bookmarks_per_user=2, visits_per_user=3, batch_size=10,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SeedDatasetTests(TestCase):
+    def seed(self, **options):
+        call_command("seed_dataset", stdout=StringIO(), **{**SMALL, **options})
+
+    def snapshot(self):
+        return (
+            list(Restaurant.objects.order_by("pk").values_list("name", "city", "cost_for_two", "cover_image")),
+            sorted(Review.objects.values_list("user__username", "rating")),
+        )
+
+    def test_seeds_requested_volumes(self):
+        self.seed()
+        self.assertEqual(Restaurant.objects.count(), 12)
+        self.assertEqual(MenuItem.objects.count(), 36)
+        self.assertEqual(Review.objects.count(), 90)
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(Bookmark.objects.count(), 12)
+        self.assertEqual(Visited.objects.count(), 18)
+        self.assertEqual(Photo.objects.filter(restaurant__isnull=False).count(), 24)
+        self.assertEqual(RestaurantSearchDocument.objects.count(), 12)
+        self.assertFalse(Restaurant.objects.filter(cover_photo__isnull=True).exists())
+        self.assertFalse(Restaurant.objects.filter(geohash="").exists())
+        self.assertEqual(
+            sum(RatingSummary.objects.values_list("review_count", flat=True)), 90
+        )
+
+    def test_same_seed_gives_same_rows(self):
+        self.seed()
+        first = self.snapshot()
+        Restaurant.objects.all().delete()
+        User.objects.all().delete()
+        self.seed()
+        self.assertEqual(self.snapshot(), first)
+
+    def test_refuses_to_seed_a_populated_database(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BenchmarkViewsTests(TestCase):
+    def setUp(self):
+        call_command("seed_dataset", stdout=StringIO(), **SMALL)
+        self.baseline = os.path.join(tempfile.mkdtemp(), "baseline.json")
+
+    def benchmark(self, **options):
+        out = StringIO()
+        call_command("benchmark_views", iterations=2, warmup=0, stdout=out, **options)
+        return out.getvalue()
+
+    def test_reports_percentiles_and_saves_baseline(self):
+        output = self.benchmark(only="restaurant_list:all", save_baseline=self.baseline)
+        self.assertIn("p95 ms", output)
+
+        with open(self.baseline) as f:
+            results = json.load(f)["scenarios"]
+        self.assertEqual(set(results), {"restaurant_list:all", "restaurant_list:all:user"})
+        self.assertEqual(set(results["restaurant_list:all"]), {"p50", "p95", "p99", "queries"})
+
+    def test_every_view_runs(self):
+        self.benchmark(save_baseline=self.baseline)
+        with open(self.baseline) as f:
+            results = json.load(f)["scenarios"]
+        self.assertIn("toggle_visited", results)
+        self.assertIn("profile", results)
+        self.assertIn("restaurant_list:near", results)
+        for name in ("restaurant_reviews:json", "catalog_export", "bookmark:put", "visited:delete", "sync"):
+            self.assertIn(name, results)
+        # The export's queries run while its body streams.
+        self.assertGreater(results["catalog_export"]["queries"], 1)
+
+    def test_leaves_the_configured_cache_alone(self):
+        cache.set("unrelated", "kept")
+        self.benchmark(only="restaurant_list:all")
+        self.assertEqual(cache.get("unrelated"), "kept")
+
+        self.benchmark(only="restaurant_list:all", shared_cache=True)
+        self.assertIsNone(cache.get("unrelated"))
+
+    def test_query_regressions_fail_against_baseline(self):
+        self.benchmark(only="login", save_baseline=self.baseline)
+        self.assertIn("No regressions", self.benchmark(only="login", baseline=self.baseline, tolerance=100))
+
+        with open(self.baseline, "w") as f:
+            json.dump({"scenarios": {"profile": {"p50": 1000, "p95": 1000, "p99": 1000, "queries": 0}}}, f)
+        with self.assertRaisesMessage(CommandError, "profile queries 0 ->"):
+            self.benchmark(only="profile", baseline=self.baseline)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExplainViewsTests(TestCase):
+    def setUp(self):
+        call_command("seed_dataset", stdout=StringIO(), **SMALL)
+
+    def explain(self, **options):
+        out = StringIO()
+        call_command("explain_views", stdout=out, **options)
+        return out.getvalue()
+
+    def test_reports_every_read_only_view(self):
+        output = self.explain()
+
+        self.assertIn("restaurant_detail (", output)
+        self.assertIn("profile (", output)
+        self.assertIn("catalog_export (", output)
+        self.assertNotIn("toggle_bookmark", output)
+        self.assertNotIn("sync (", output)
+        self.assertIn("flagged queries across", output)
+
+    def test_flags_full_scans_and_temp_sorts(self):
+        with connection.cursor() as cursor:
+            scan = sqlite_issues(cursor, 'SELECT id FROM restaurants_restaurant WHERE address = %s', ["1 Street"])
+            sort = sqlite_issues(
+                cursor, 'SELECT id FROM restaurants_restaurant WHERE cost_for_two > %s ORDER BY city', [0]
+            )
+            indexed = sqlite_issues(cursor, 'SELECT id FROM restaurants_restaurant ORDER BY name, id', [])
+
+        self.assertEqual([kind for kind, detail in scan], ["full scan"])
+        self.assertIn("temp sort", [kind for kind, detail in sort])
+        self.assertEqual(indexed, [])
+
+    def test_leaves_the_configured_cache_alone(self):
+        cache.set("unrelated", "kept")
+        self.explain(only="restaurant_detail")
+        self.assertEqual(cache.get("unrelated"), "kept")
+
+    def test_fail_option_raises_when_anything_is_flagged(self):
+        with self.assertRaisesMessage(CommandError, "need an index"):
+            self.explain(only="bookmark_list", fail=True)
+
+
+class LoadtestTogglesTests(TransactionTestCase):
+    def test_reports_both_servers_without_errors(self):
+        User.objects.create_user(username="loader", email="loader@example.com", password="pass1234")
+        Restaurant.objects.create(name="Busy", city="Pune", address="1 Street", cost_for_two=1, veg_type="veg")
+
+        out = StringIO()
+        call_command("loadtest_toggles", requests=12, concurrency=4, wsgi_threads=2, stdout=out)
+
+        rows = [line.split() for line in out.getvalue().splitlines()[1:]]
+        self.assertEqual([row[0] for row in rows], ["wsgi", "asgi"])
+        self.assertEqual([row[-1] for row in rows], ["0", "0"])
+
+
+class ProfileStartupTests(SimpleTestCase):
+    def test_reports_each_app_and_the_slowest_modules(self):
+        out = StringIO()
+        call_command("profile_startup", runs=1, modules=3, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        apps = [line.split()[0] for line in lines[:lines.index("")]]
+        self.assertEqual(apps[:2], ["app", "(settings)"])
+        self.assertIn("accounts", apps)
+        self.assertEqual(apps[-1], "total")
+        self.assertEqual(len(lines[lines.index("") + 2:]), 3)
+
+    def test_fails_over_budget(self):
+        with self.assertRaisesMessage(CommandError, "over the 1 ms budget"):
+            call_command("profile_startup", runs=1, modules=0, budget=1, stdout=StringIO())
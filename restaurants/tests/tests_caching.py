@@ -0,0 +1,171 @@
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.redis import RedisCache
+from restaurants.caching import LOCK_TIMEOUT, get_or_compute, get_stats, reset_stats
+
+
+class FakeRedis:
+    """
+    An in-process stand-in for ``redis.Redis``, covering the commands the
+    cache backend sends, with expiry and atomic ``SET NX``.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self.lock:
+            return self._live(key)
+
+    def mget(self, keys):
+        with self.lock:
+            return [self._live(key) for key in keys]
+
+    def exists(self, key):
+        with self.lock:
+            return int(self._live(key) is not None)
+
+    def set(self, key, value, ex=None, nx=False):
+        with self.lock:
+            if nx and self._live(key) is not None:
+                return None
+            self.data[key] = (value, time.monotonic() + ex if ex is not None else None)
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            live = [key for key in keys if self._live(key) is not None]
+            for key in live:
+                del self.data[key]
+            return len(live)
+
+    def flushdb(self):
+        with self.lock:
+            self.data.clear()
+            return True
+
+
+def fake_redis_cache(server):
+    """A ``RedisCache`` whose connections all go to ``server``."""
+    redis_cache = RedisCache("redis://127.0.0.1:6379/1", {})
+    redis_cache._cache._client = lambda connection_pool: server
+    return redis_cache
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = cache
+        self.cache.clear()
+        reset_stats()
+        self.calls = 0
+
+    def compute(self, value="fresh"):
+        self.calls += 1
+        return value
+
+    def test_fresh_value_is_computed_once(self):
+        self.assertEqual(get_or_compute("tests:key", self.compute, 60), "fresh")
+        self.assertEqual(get_or_compute("tests:key", self.compute, 60), "fresh")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(get_stats()["tests:key"], {"hit": 1, "stale": 0, "miss": 1})
+
+    def test_none_is_not_stored(self):
+        self.assertIsNone(get_or_compute("tests:none", lambda: self.compute(None), 60))
+        self.assertIsNone(get_or_compute("tests:none", lambda: self.compute(None), 60))
+        self.assertEqual(self.calls, 2)
+
+    def test_expired_value_is_recomputed_by_lock_holder(self):
+        get_or_compute("tests:soft", lambda: self.compute("old"), 60, stale_timeout=60)
+        with patch("restaurants.caching.time.time", return_value=time.time() + 90):
+            self.assertEqual(get_or_compute("tests:soft", self.compute, 60, stale_timeout=60), "fresh")
+        self.assertEqual(self.calls, 2)
+
+    def test_stale_value_served_while_another_worker_recomputes(self):
+        get_or_compute("tests:soft", lambda: self.compute("old"), 60, stale_timeout=60)
+        self.cache.add("tests:soft:lock", True)
+        with patch("restaurants.caching.time.time", return_value=time.time() + 90):
+            self.assertEqual(get_or_compute("tests:soft", self.compute, 60, stale_timeout=60), "old")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(get_stats()["tests:soft"]["stale"], 1)
+
+    def test_waiters_get_the_lock_holders_value(self):
+        self.cache.add("tests:wait:lock", True)
+
+        def finish():
+            time.sleep(0.1)
+            self.cache.set("tests:wait", ("computed", time.time() + 60))
+
+        worker = threading.Thread(target=finish)
+        worker.start()
+        self.assertEqual(get_or_compute("tests:wait", self.compute, 60), "computed")
+        worker.join()
+        self.assertEqual(self.calls, 0)
+
+    def test_waiter_computes_when_lock_is_released_empty(self):
+        self.cache.add("tests:released:lock", True)
+        threading.Timer(0.1, self.cache.delete, ["tests:released:lock"]).start()
+        self.assertEqual(get_or_compute("tests:released", self.compute, 60), "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        def slow():
+            time.sleep(0.2)
+            return self.compute()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute("tests:herd", slow, 60)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["fresh"] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_works_with_file_backend(self):
+        file_cache = FileBasedCache(tempfile.mkdtemp(), {})
+        get_or_compute("tests:file", self.compute, 60, cache=file_cache)
+        self.assertEqual(get_or_compute("tests:file", self.compute, 60, cache=file_cache), "fresh")
+        self.assertEqual(self.calls, 1)
+
+
+class RedisGetOrComputeTests(GetOrComputeTests):
+    """The same behaviour against the redis backend, whose ``add`` is ``SET NX``."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = FakeRedis()
+        self.cache = fake_redis_cache(self.server)
+        patcher = patch("restaurants.caching.default_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lock_is_released_after_computing(self):
+        get_or_compute("tests:released", self.compute, 60)
+        self.assertIsNone(self.cache.get("tests:released:lock"))
+        self.assertEqual(self.cache.get("tests:released")[0], "fresh")
+
+    def test_lock_expires_if_its_holder_dies(self):
+        def compute():
+            _, expires = self.server.data[self.cache.make_and_validate_key("tests:expiring:lock")]
+            self.assertAlmostEqual(expires - time.monotonic(), LOCK_TIMEOUT, delta=1)
+            return self.compute()
+
+        get_or_compute("tests:expiring", compute, 60)
+        self.assertEqual(self.calls, 1)
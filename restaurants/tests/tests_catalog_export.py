@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from restaurants.exports import export_catalog
+from restaurants.imports import CatalogImporter, read_records
+from content.models import Review
+
+User = get_user_model()
+
+
+class CatalogExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="exporter", email="exporter@example.com", password="pass1234")
+        self.italian = Cuisine.objects.create(name="Italian")
+        self.thai = Cuisine.objects.create(name="Thai")
+        self.restaurants = []
+        for i in range(5):
+            restaurant = Restaurant.objects.create(
+                external_id=f"r-{i}", name=f"Place {i}", city="Pune", address=f"{i} Street",
+                cost_for_two=500 + i, veg_type="veg",
+            )
+            restaurant.cuisines.add(self.italian, self.thai)
+            for j in range(i):
+                MenuItem.objects.create(restaurant=restaurant, name=f"Dish {j}", price=100 + j, cuisine=self.thai)
+            self.restaurants.append(restaurant)
+        Review.objects.create(user=self.user, content_object=self.restaurants[0], rating=4)
+        Review.objects.create(user=self.user, content_object=self.restaurants[4].menu_items.first(), rating=2)
+
+    def export(self, **kwargs):
+        return "".join(export_catalog(**kwargs))
+
+    def test_jsonl_nests_menu_items_with_cuisines_and_ratings(self):
+        records = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual([record["external_id"] for record in records], [f"r-{i}" for i in range(5)])
+        first, last = records[0], records[4]
+        self.assertEqual(first["cuisines"], ["Italian", "Thai"])
+        self.assertEqual((first["avg_rating"], first["review_count"]), (4.0, 1))
+        self.assertEqual(len(last["menu_items"]), 4)
+        self.assertEqual(last["menu_items"][0]["restaurant"], "r-4")
+        self.assertEqual(last["menu_items"][0]["cuisine"], "Thai")
+        self.assertEqual(last["menu_items"][0]["avg_rating"], 2.0)
+
+    def test_csv_has_a_file_per_kind(self):
+        restaurants = self.export(format="csv").splitlines()
+        self.assertTrue(restaurants[0].startswith("id,external_id,name,"))
+        self.assertIn("Italian|Thai", restaurants[1])
+        self.assertEqual(len(restaurants), 6)
+
+        menu_items = self.export(format="csv", kind="menu_items").splitlines()
+        self.assertTrue(menu_items[0].startswith("id,restaurant,name,"))
+        self.assertEqual(len(menu_items), 11)
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        with self.assertNumQueries(1 + 3 * 4):
+            chunks = list(export_catalog(chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+
+    def test_restaurant_csv_skips_menu_items(self):
+        # Cuisines and ratings per chunk; the menu items and their ratings aren't loaded.
+        with self.assertNumQueries(1 + 3 * 2):
+            list(export_catalog(format="csv", chunk_size=2))
+
+    def test_export_round_trips_through_import(self):
+        importer = CatalogImporter()
+        importer.import_restaurants(read_records(StringIO(self.export()), "jsonl"))
+
+        self.assertEqual(importer.errors, [])
+        self.assertEqual(importer.stats["restaurants updated"], 5)
+        self.assertEqual(importer.stats["menu items updated"], 10)
+        self.assertEqual(Restaurant.objects.count(), 5)
+        self.assertEqual(MenuItem.objects.count(), 10)
+
+    def test_command_writes_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "menu.csv")
+        call_command("export_catalog", format="csv", kind="menu_items", output=path, stdout=StringIO())
+        with open(path) as f:
+            self.assertEqual(len(f.read().splitlines()), 11)
+
+    def test_endpoint_streams_for_staff_only(self):
+        url = reverse("restaurants:catalog_export")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username="exporter", password="pass1234")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url, {"format": "csv", "kind": "menu_items"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="menu_items.csv"')
+        self.assertEqual(len(response.getvalue().decode().splitlines()), 11)
+
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
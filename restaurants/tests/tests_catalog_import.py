@@ -0,0 +1,197 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from restaurants import geo
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from restaurants.filters import RestaurantFilter
+from restaurants.imports import CatalogImporter, read_records
+
+User = get_user_model()
+
+RESTAURANTS_CSV = """external_id,name,city,address,cost_for_two,veg_type,is_open,spotlight,cuisines
+r-1,Pasta Place,Pune,1 Street,800,veg,true,false,Italian|thai
+r-2,Curry House,Delhi,2 Street,600,non_veg,true,true,North Indian
+r-3,,Delhi,3 Street,600,non_veg,true,false,
+r-4,Bad Cost,Delhi,4 Street,cheap,veg,true,false,
+"""
+
+
+class CatalogImportTests(TestCase):
+    def setUp(self):
+        self.italian = Cuisine.objects.create(name="Italian")
+        self.dir = tempfile.mkdtemp()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def run_import(self, *args, **options):
+        out, err = StringIO(), StringIO()
+        call_command("import_catalog", *args, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_creates_restaurants_and_reports_bad_rows(self):
+        out, err = self.run_import(self.write("restaurants.csv", RESTAURANTS_CSV))
+
+        pasta = Restaurant.objects.get(external_id="r-1")
+        self.assertEqual(pasta.cost_for_two, 800)
+        self.assertEqual(sorted(pasta.cuisines.values_list("name", flat=True)), ["Italian", "thai"])
+        self.assertEqual(Restaurant.objects.count(), 2)
+        self.assertEqual(Cuisine.objects.filter(name__iexact="italian").count(), 1)
+        self.assertIn("line 4: name:", err)
+        self.assertIn("line 5: cost_for_two:", err)
+        self.assertIn("2 restaurants created", out)
+        self.assertIn(pasta, RestaurantFilter({"q": "pasta"}).qs)
+
+    def test_reimport_updates_in_place(self):
+        path = self.write("restaurants.csv", RESTAURANTS_CSV)
+        self.run_import(path)
+        self.run_import(self.write("update.csv", (
+            "external_id,name,city,address,cost_for_two,veg_type,cuisines\n"
+            "r-1,Pasta Palace,Pune,1 Street,900,veg,North Indian\n"
+        )))
+
+        pasta = Restaurant.objects.get(external_id="r-1")
+        self.assertEqual((pasta.name, pasta.cost_for_two), ("Pasta Palace", 900))
+        self.assertEqual(list(pasta.cuisines.values_list("name", flat=True)), ["North Indian"])
+        self.assertEqual(Restaurant.objects.count(), 2)
+        self.assertIn(pasta, RestaurantFilter({"name": "palace"}).qs)
+
+    def test_reimport_without_coordinates_keeps_the_stored_ones(self):
+        self.run_import(self.write("located.csv", (
+            "external_id,name,city,address,cost_for_two,veg_type,latitude,longitude\n"
+            "r-1,Pasta Place,Pune,1 Street,800,veg,18.5204,73.8567\n"
+            "r-2,Half Placed,Pune,2 Street,800,veg,18.5204,\n"
+        )))
+        pasta = Restaurant.objects.get(external_id="r-1")
+        self.assertEqual(pasta.geohash, geo.encode_geohash(18.5204, 73.8567))
+        self.assertFalse(Restaurant.objects.filter(external_id="r-2").exists())
+
+        self.run_import(self.write("update.csv", (
+            "external_id,name,city,address,cost_for_two,veg_type\n"
+            "r-1,Pasta Palace,Pune,1 Street,900,veg\n"
+        )))
+        pasta.refresh_from_db()
+        self.assertEqual(pasta.name, "Pasta Palace")
+        self.assertEqual((pasta.latitude, pasta.longitude), (18.5204, 73.8567))
+        self.assertEqual(pasta.geohash, geo.encode_geohash(18.5204, 73.8567))
+
+    def test_jsonl_nested_menu_items_are_upserted_by_name(self):
+        record = {
+            "external_id": "r-9", "name": "Noodle Bar", "city": "Goa", "address": "9 Street",
+            "cost_for_two": 500, "veg_type": "vegan", "cuisines": ["Thai"],
+            "menu_items": [
+                {"name": "Pad Thai", "price": 250, "cuisine": "Thai"},
+                {"name": "Tom Yum", "price": 200},
+            ],
+        }
+        path = self.write("catalog.jsonl", json.dumps(record) + "\n\nnot json\n")
+        out, err = self.run_import(path)
+        self.assertIn("line 3:", err)
+
+        record["menu_items"] = [{"name": "Pad Thai", "price": 300, "cuisine": "Thai"}]
+        self.run_import(self.write("catalog2.jsonl", json.dumps(record)))
+
+        restaurant = Restaurant.objects.get(external_id="r-9")
+        self.assertEqual(
+            dict(restaurant.menu_items.values_list("name", "price")), {"Pad Thai": 300, "Tom Yum": 200}
+        )
+        self.assertEqual(restaurant.menu_items.get(name="Pad Thai").cuisine.name, "Thai")
+
+    def test_separate_menu_item_file(self):
+        self.run_import(self.write("restaurants.csv", RESTAURANTS_CSV))
+        out, err = self.run_import(menu_items=self.write("menu.csv", (
+            "restaurant,name,price,cuisine\n"
+            "r-1,Lasagne,450,Italian\n"
+            "r-404,Ghost Dish,100,\n"
+        )))
+        self.assertEqual(MenuItem.objects.get(name="Lasagne").restaurant.external_id, "r-1")
+        self.assertIn("line 3: restaurant: Unknown restaurant external_id.", err)
+        self.assertIn(Restaurant.objects.get(external_id="r-1"), RestaurantFilter({"menu_item": "lasagne"}).qs)
+
+    def test_non_list_cuisines_and_menu_items_are_rejected_per_line(self):
+        path = self.write("restaurants.jsonl", "\n".join(json.dumps(record) for record in [
+            {"external_id": "r-1", "name": "Thai Spot", "city": "Pune", "address": "1 Street",
+             "cost_for_two": 500, "veg_type": "veg", "cuisines": "Thai"},
+            {"external_id": "r-2", "name": "Menu Spot", "city": "Pune", "address": "2 Street",
+             "cost_for_two": 500, "veg_type": "veg", "menu_items": {"name": "Pad Thai"}},
+            {"external_id": "r-3", "name": "Fine Spot", "city": "Pune", "address": "3 Street",
+             "cost_for_two": 500, "veg_type": "veg", "cuisines": ["Thai"]},
+        ]))
+        _, err = self.run_import(path)
+
+        self.assertIn("line 1: cuisines: Expected a list of names.", err)
+        self.assertIn("line 2: menu_items: Expected a list of objects.", err)
+        self.assertEqual(list(Restaurant.objects.values_list("external_id", flat=True)), ["r-3"])
+        self.assertFalse(Cuisine.objects.filter(name="T").exists())
+
+    def test_undecodable_file_is_a_command_error(self):
+        header = RESTAURANTS_CSV.splitlines()[0] + "\n"
+        rows = "".join(f"r-{i},Place {i},Pune,{i} Street,500,veg,true,false,Italian\n" for i in range(20))
+        path = os.path.join(self.dir, "broken.csv")
+        with open(path, "wb") as f:
+            f.write((header + rows).encode() + b"r-99,Caf\xe9,Pune,1 Street,500,veg,true,false,\n")
+
+        with self.assertRaisesMessage(CommandError, "The file is not valid UTF-8"):
+            self.run_import(path, batch_size=10)
+        self.assertFalse(Restaurant.objects.filter(external_id="r-99").exists())
+
+    def test_batches_report_throughput(self):
+        rows = "".join(
+            f"r-{i},Place {i},Pune,{i} Street,500,veg,true,false,Italian\n" for i in range(25)
+        )
+        header = RESTAURANTS_CSV.splitlines()[0] + "\n"
+        batches = []
+        importer = CatalogImporter(batch_size=10, progress=lambda *args: batches.append(args[:3]))
+        importer.import_restaurants(read_records(StringIO(header + rows), "csv"))
+
+        self.assertEqual(batches, [("restaurants", 1, 10), ("restaurants", 2, 10), ("restaurants", 3, 5)])
+        self.assertEqual(Restaurant.objects.count(), 25)
+
+        out, _ = self.run_import(self.write("r.csv", header + rows), batch_size=10)
+        self.assertRegex(out, r"restaurants batch 3: 5 rows in [\d.]+s \(\d+ rows/s\)")
+        self.assertIn("25 restaurants updated", out)
+
+
+class CatalogImportAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass1234")
+        self.url = reverse("admin:restaurants_restaurant_import")
+
+    def test_upload_imports_catalog(self):
+        self.client.login(username="admin", password="pass1234")
+        self.assertContains(self.client.get(reverse("admin:restaurants_restaurant_changelist")), self.url)
+
+        upload = SimpleUploadedFile("restaurants.csv", RESTAURANTS_CSV.encode(), content_type="text/csv")
+        response = self.client.post(self.url, {"restaurants": upload}, follow=True)
+
+        self.assertEqual(Restaurant.objects.count(), 2)
+        self.assertContains(response, "2 restaurants created")
+
+    def test_undecodable_upload_is_a_form_error(self):
+        self.client.login(username="admin", password="pass1234")
+        upload = SimpleUploadedFile("restaurants.csv", RESTAURANTS_CSV.encode() + b"\xff\xfe\n", content_type="text/csv")
+        response = self.client.post(self.url, {"restaurants": upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "The file is not valid UTF-8")
+
+    def test_rejects_unknown_format(self):
+        self.client.login(username="admin", password="pass1234")
+        upload = SimpleUploadedFile("restaurants.xlsx", b"PK", content_type="application/octet-stream")
+        response = self.client.post(self.url, {"restaurants": upload})
+        self.assertContains(response, "expected .csv or .jsonl")
+
+    def test_requires_staff(self):
+        User.objects.create_user(username="plain", email="plain@example.com", password="pass1234")
+        self.client.login(username="plain", password="pass1234")
+        self.assertEqual(self.client.get(self.url).status_code, 302)
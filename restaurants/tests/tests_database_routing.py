@@ -0,0 +1,95 @@
+from unittest import mock, skipUnless
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.views import View
+from myrestaurant.middleware import ReplicaRoutingMiddleware
+from myrestaurant.routers import REPLICA_ALIAS, replica_configured
+from restaurants.search import search
+from restaurants.models import Restaurant
+
+User = get_user_model()
+
+
+class ReadOnlyView(View):
+    read_from_replica = True
+
+    def get(self, request):
+        return HttpResponse(router.db_for_read(Restaurant))
+
+    def post(self, request):
+        return HttpResponse(router.db_for_read(Restaurant))
+
+
+class PrimaryView(ReadOnlyView):
+    read_from_replica = False
+
+
+@mock.patch("myrestaurant.middleware.replica_configured", return_value=True)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def route(self, request, view_class=ReadOnlyView):
+        view = view_class.as_view()
+        middleware = ReplicaRoutingMiddleware(lambda request: middleware.process_view(request, view, (), {}) or view(request))
+        return middleware(request)
+
+    def test_read_only_view_reads_from_the_replica(self, configured):
+        response = self.route(RequestFactory().get("/"))
+
+        self.assertEqual(response.content.decode(), REPLICA_ALIAS)
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+        self.assertEqual(router.db_for_read(Restaurant), "default")
+
+    def test_other_views_read_from_the_primary(self, configured):
+        self.assertEqual(self.route(RequestFactory().get("/"), PrimaryView).content.decode(), "default")
+
+    def test_writes_read_from_the_primary_and_pin_the_browser_to_it(self, configured):
+        response = self.route(RequestFactory().post("/"))
+
+        self.assertEqual(response.content.decode(), "default")
+        self.assertIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+
+        request = RequestFactory().get("/")
+        request.COOKIES[ReplicaRoutingMiddleware.cookie_name] = "1"
+        self.assertEqual(self.route(request).content.decode(), "default")
+
+    def test_without_a_replica_everything_uses_the_primary(self, configured):
+        configured.return_value = False
+
+        response = self.route(RequestFactory().post("/"))
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+        self.assertEqual(self.route(RequestFactory().get("/")).content.decode(), "default")
+
+
+@skipUnless(replica_configured(), "set DATABASE_REPLICA_URL to run against a second alias")
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", email="reader@example.com", password="pass1234")
+        self.restaurant = Restaurant.objects.create(
+            name="Replica Place", city="Pune", address="1 Street", cost_for_two=500, veg_type="veg",
+        )
+        self.client.login(username="reader", password="pass1234")
+        self.client.cookies.pop(ReplicaRoutingMiddleware.cookie_name, None)
+
+    def test_list_reads_from_the_replica_until_the_session_writes(self):
+        url = reverse("restaurants:restaurant_list")
+        with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            self.client.get(url)
+        self.assertTrue(replica.captured_queries)
+
+        self.client.post(reverse("interactions:toggle_bookmark", args=[self.restaurant.pk]))
+        with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            self.client.get(url)
+        self.assertFalse(replica.captured_queries)
+
+    def test_search_lookups_run_on_the_querysets_database(self):
+        queryset = Restaurant.objects.using(REPLICA_ALIAS)
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            list(search(queryset, "Replca Plce"))
+        self.assertFalse(primary.captured_queries)
+        self.assertTrue(any("restaurants_search_fts" in query["sql"] for query in replica.captured_queries))
@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import random
+import tempfile
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from restaurants import geo
+from restaurants.filters import RestaurantFilter
+from restaurants.models import Restaurant
+
+PUNE = (18.5204, 73.8567)
+
+
+def haversine(latitude, longitude, other_latitude, other_longitude):
+    lat, other_lat = math.radians(latitude), math.radians(other_latitude)
+    half_chord = (
+        math.sin((other_lat - lat) / 2) ** 2
+        + math.cos(lat) * math.cos(other_lat) * math.sin(math.radians(other_longitude - longitude) / 2) ** 2
+    )
+    return 2 * geo.EARTH_RADIUS_KM * math.asin(math.sqrt(half_chord))
+
+
+class GeohashTests(SimpleTestCase):
+    def test_known_geohash(self):
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geo.encode_geohash(-25.382708, -49.265506, 8), "6gkzwgjz")
+
+    def test_covering_cells_hold_every_point_within_the_covered_radius(self):
+        rng = random.Random(7)
+        for precision in (4, 5, 6):
+            radius = geo.covered_radius(PUNE[0], precision)
+            cells = geo.covering_cells(*PUNE, precision)
+            for _ in range(200):
+                bearing = rng.uniform(0, 2 * math.pi)
+                distance = rng.uniform(0, radius) / geo.KM_PER_DEGREE
+                latitude = PUNE[0] + distance * math.cos(bearing)
+                longitude = PUNE[1] + distance * math.sin(bearing) / math.cos(math.radians(latitude))
+                if haversine(*PUNE, latitude, longitude) <= radius:
+                    self.assertIn(geo.encode_geohash(latitude, longitude, precision), cells)
+
+
+class NearbyQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        restaurants = []
+        for i in range(300):
+            restaurant = Restaurant(
+                name=f"Place {i:03}", city="Pune", address=f"{i} Street", cost_for_two=500, veg_type="veg",
+                latitude=PUNE[0] + rng.uniform(-0.3, 0.3), longitude=PUNE[1] + rng.uniform(-0.3, 0.3),
+            )
+            restaurant.update_geohash()
+            restaurants.append(restaurant)
+        Restaurant.objects.bulk_create(restaurants)
+        Restaurant.objects.create(name="Nowhere", city="Pune", address="Unknown", cost_for_two=500, veg_type="veg")
+
+    def by_distance(self, latitude, longitude):
+        located = Restaurant.objects.exclude(latitude=None)
+        return sorted(located, key=lambda r: (haversine(latitude, longitude, r.latitude, r.longitude), r.pk))
+
+    def test_within_matches_brute_force(self):
+        for radius in (0.5, 3, 12, 40):
+            expected = {
+                r.pk for r in self.by_distance(*PUNE) if haversine(*PUNE, r.latitude, r.longitude) <= radius
+            }
+            found = geo.within(Restaurant.objects.all(), *PUNE, radius)
+            self.assertEqual({r.pk for r in found}, expected, radius)
+            for restaurant in found:
+                self.assertAlmostEqual(
+                    restaurant.distance, haversine(*PUNE, restaurant.latitude, restaurant.longitude), places=6
+                )
+
+    def test_nearest_matches_brute_force(self):
+        for point in (PUNE, (18.7, 74.0), (19.5, 75.0)):
+            for k in (1, 5, 20):
+                expected = [r.pk for r in self.by_distance(*point)[:k]]
+                self.assertEqual([r.pk for r in geo.nearest(Restaurant.objects.all(), *point, k)], expected)
+
+    def test_near_filter_with_k_keeps_the_k_nearest_at_any_distance(self):
+        # Far from every row, so no radius would hold any of them.
+        point = (19.5, 75.0)
+        filterset = RestaurantFilter({"near": f"{point[0]},{point[1]}", "k": "7", "radius": "1"})
+
+        expected = [r.pk for r in self.by_distance(*point)[:7]]
+        self.assertEqual([r.pk for r in filterset.qs.order_by("distance", "pk")], expected)
+        self.assertFalse(RestaurantFilter({"near": f"{point[0]},{point[1]}", "k": "0"}).is_valid())
+
+    def test_saving_keeps_the_geohash_current(self):
+        restaurant = Restaurant.objects.get(name="Place 000")
+        restaurant.latitude, restaurant.longitude = 57.64911, 10.40744
+        restaurant.save(update_fields=["latitude", "longitude"])
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.geohash, "u4pruydqq")
+
+        restaurant.latitude = None
+        restaurant.save()
+        restaurant.refresh_from_db()
+        self.assertEqual(restaurant.geohash, "")
+
+    def test_near_filter_defaults_to_nearest_first(self):
+        filterset = RestaurantFilter({"near": f"{PUNE[0]},{PUNE[1]}", "radius": "5"})
+
+        self.assertEqual(filterset.get_sort_key(), "distance")
+        expected = [r.pk for r in self.by_distance(*PUNE) if haversine(*PUNE, r.latitude, r.longitude) <= 5]
+        self.assertEqual([r.pk for r in filterset.qs.order_by("distance", "pk")], expected)
+
+    def test_distance_ordering_needs_a_location(self):
+        filterset = RestaurantFilter({"ordering": "distance"})
+
+        self.assertEqual(filterset.get_sort_key(), "name")
+        self.assertEqual(filterset.qs.count(), Restaurant.objects.count())
+
+    def test_invalid_locations_are_rejected(self):
+        for near in ("north", "18.5", "91,73", "18.5,181", "nan,73"):
+            self.assertFalse(RestaurantFilter({"near": near}).is_valid(), near)
+        self.assertFalse(RestaurantFilter({"near": "18.5,73.8", "radius": "500"}).is_valid())
+
+        response = self.client.get(reverse("api:restaurant_list"), {"near": "north"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_pages_nearest_first(self):
+        cache.clear()
+        url = reverse("api:restaurant_list")
+        params = {"near": f"{PUNE[0]},{PUNE[1]}", "radius": "15", "page_size": "25", "fields": "id,distance"}
+        rows, cursor = [], None
+        while True:
+            data = self.client.get(url, {**params, **({"cursor": cursor} if cursor else {})}).json()
+            rows += data["data"]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        expected = [r for r in self.by_distance(*PUNE) if haversine(*PUNE, r.latitude, r.longitude) <= 15]
+        self.assertGreater(len(expected), 25)
+        self.assertEqual([row["id"] for row in rows], [r.pk for r in expected])
+        self.assertAlmostEqual(rows[0]["distance"], haversine(*PUNE, expected[0].latitude, expected[0].longitude), 3)
+
+    def test_api_returns_the_k_nearest(self):
+        cache.clear()
+        params = {"near": f"{PUNE[0]},{PUNE[1]}", "k": "3", "fields": "id,distance"}
+
+        rows = self.client.get(reverse("api:restaurant_list"), params).json()["data"]
+
+        self.assertEqual([row["id"] for row in rows], [r.pk for r in self.by_distance(*PUNE)[:3]])
+
+    def test_list_page_offers_the_location_button(self):
+        cache.clear()
+        response = self.client.get(reverse("restaurants:restaurant_list"), {"near": f"{PUNE[0]},{PUNE[1]}", "radius": "1"})
+
+        self.assertContains(response, "data-near-me")
+        self.assertEqual(
+            [r.pk for r in response.context["restaurants"]],
+            [r.pk for r in self.by_distance(*PUNE) if haversine(*PUNE, r.latitude, r.longitude) <= 1][:24],
+        )
+
+
+class GeocodeRestaurantsTests(TestCase):
+    def setUp(self):
+        self.fixture = os.path.join(tempfile.mkdtemp(), "geocodes.json")
+        with open(self.fixture, "w") as f:
+            json.dump({"cities": {"Pune": list(PUNE)}, "addresses": {"1 FC Road, Pune": [18.5236, 73.8412]}}, f)
+
+        self.listed = Restaurant.objects.create(
+            name="Listed", city="Pune", address="1  fc road", cost_for_two=500, veg_type="veg",
+        )
+        self.central = Restaurant.objects.create(
+            name="Central", city="pune", address="9 Other Lane", cost_for_two=500, veg_type="veg",
+        )
+        self.unknown = Restaurant.objects.create(
+            name="Unknown", city="Atlantis", address="1 Sea Floor", cost_for_two=500, veg_type="veg",
+        )
+        self.placed = Restaurant.objects.create(
+            name="Placed", city="Pune", address="1 FC Road", cost_for_two=500, veg_type="veg",
+            latitude=10.0, longitude=10.0,
+        )
+
+    def geocode(self, **options):
+        out = StringIO()
+        with override_settings(GEOCODER_FIXTURE=self.fixture):
+            call_command("geocode_restaurants", stdout=out, batch_size=2, **options)
+        return out.getvalue()
+
+    def test_fills_in_missing_coordinates_from_the_fixture(self):
+        self.assertIn("Geocoded 2 restaurants; 1 could not be located.", self.geocode())
+
+        located = {r.name: (r.latitude, r.longitude, r.geohash) for r in Restaurant.objects.all()}
+        self.assertEqual(located["Listed"], (18.5236, 73.8412, geo.encode_geohash(18.5236, 73.8412)))
+        self.assertEqual(located["Central"][:2], PUNE)
+        self.assertEqual(located["Unknown"], (None, None, ""))
+        self.assertEqual(located["Placed"][:2], (10.0, 10.0))
+
+    def test_all_redoes_located_restaurants(self):
+        self.geocode(all=True)
+
+        self.placed.refresh_from_db()
+        self.assertEqual((self.placed.latitude, self.placed.longitude), (18.5236, 73.8412))
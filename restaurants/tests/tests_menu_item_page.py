@@ -89,3 +89,22 @@ class MenuItemDetailViewTests(TestCase):
         url = reverse("restaurants:menu_item_detail", kwargs={'menu_id': self.menu_item.id})
         response = self.client.get(url)
         self.assertContains(response, "No_Image_Available.jpg")
+
+    def test_own_review_change_makes_the_page_stale(self):
+        self.client.login(username="testuser", password="testpass")
+        url = reverse("restaurants:menu_item_detail", kwargs={"menu_id": self.menu_item.id})
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        self.review.rating = 2
+        self.review.save()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_price_change_makes_the_page_stale(self):
+        url = reverse("restaurants:menu_item_detail", kwargs={"menu_id": self.menu_item.id})
+        response = self.client.get(url)
+
+        MenuItem.objects.filter(pk=self.menu_item.pk).update(price=self.menu_item.price + 50)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
@@ -0,0 +1,168 @@
+from django.test import Client, TestCase, override_settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpRequest, QueryDict
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from restaurants.page_cache import canonical_query
+from content.models import Review
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cuisine = Cuisine.objects.create(name="Italian")
+        self.restaurant = Restaurant.objects.create(
+            name="Cached Place", city="Test City", address="1 Street",
+            cost_for_two=500, veg_type="veg",
+        )
+        self.restaurant.cuisines.add(self.cuisine)
+        self.other = Restaurant.objects.create(
+            name="Other Place", city="Other City", address="2 Street",
+            cost_for_two=300, veg_type="veg",
+        )
+        self.menu_item = MenuItem.objects.create(
+            name="Pasta", price=250, restaurant=self.restaurant, cuisine=self.cuisine,
+        )
+        self.user = User.objects.create_user(username="cacheuser", email="cache@example.com", password="pass1234")
+
+        self.list_url = reverse('restaurants:restaurant_list')
+        self.detail_url = reverse('restaurants:restaurant_detail', args=[self.restaurant.pk])
+        self.other_url = reverse('restaurants:restaurant_detail', args=[self.other.pk])
+        self.menu_url = reverse('restaurants:menu_item_detail', args=[self.menu_item.pk])
+
+    def assertCached(self, url, data=None):
+        self.assertEqual(self.client.get(url, data)['X-Page-Cache'], 'hit')
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        # Detail pages still read their validators from the database.
+        for url, queries in ((self.list_url, 0), (self.detail_url, 1), (self.menu_url, 1)):
+            first = self.client.get(url)
+            self.assertEqual(first['X-Page-Cache'], 'miss')
+            with self.assertNumQueries(queries):
+                second = self.client.get(url)
+            self.assertEqual(second['X-Page-Cache'], 'hit')
+            self.assertEqual(second.content, first.content)
+
+    async def test_async_list_is_served_from_cache_under_asgi(self):
+        first = await self.async_client.get(self.list_url)
+        second = await self.async_client.get(self.list_url)
+
+        self.assertEqual((first['X-Page-Cache'], second['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(second.content, first.content)
+        self.assertContains(second, 'Cached Place')
+
+    def test_equivalent_filter_queries_share_an_entry(self):
+        self.client.get(self.list_url, {'city': 'Test City', 'veg_type': '', 'ordering': 'name'})
+        self.assertCached(self.list_url + '?ordering=name&city=Test+City')
+        self.assertEqual(
+            self.client.get(self.list_url, {'city': 'Other City'})['X-Page-Cache'], 'miss'
+        )
+
+    def test_canonical_query_sorts_and_drops_blanks(self):
+        self.assertEqual(canonical_query(QueryDict('q=&b=2&a=1&a=0')), 'a=0&a=1&b=2')
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.get(self.list_url)
+        self.client.login(username="cacheuser", password="pass1234")
+        response = self.client.get(self.list_url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_authenticated_pages_are_not_stored(self):
+        self.client.login(username="cacheuser", password="pass1234")
+        self.client.get(self.detail_url)
+        self.client.logout()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+
+    def test_ajax_requests_bypass_cache(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertEqual(response.json()['status'], 'success')
+
+    def test_pages_with_flash_messages_bypass_cache(self):
+        self.client.get(self.list_url)
+        storage = CookieStorage(HttpRequest())
+        self.client.cookies[storage.cookie_name] = storage._encode([Message(constants.INFO, "Welcome back")])
+
+        response = self.client.get(self.list_url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, "Welcome back")
+        self.assertNotContains(self.client.get(self.list_url), "Welcome back")
+
+    def test_missing_pages_are_not_cached(self):
+        url = reverse('restaurants:restaurant_detail', args=[999999])
+        self.client.get(url)
+        self.assertNotIn('X-Page-Cache', self.client.get(url))
+
+    def test_review_evicts_restaurant_menu_and_list_pages(self):
+        for url in (self.list_url, self.detail_url, self.menu_url, self.other_url):
+            self.client.get(url)
+
+        Review.objects.create(user=self.user, content_object=self.restaurant, rating=5)
+
+        for url in (self.list_url, self.detail_url, self.menu_url):
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+        self.assertCached(self.other_url)
+
+    def test_pages_cached_before_the_commit_are_retired_by_it(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, content_object=self.restaurant, rating=5)
+            # A request racing the writer caches the page before the review is committed.
+            self.client.get(self.detail_url)
+            self.assertCached(self.detail_url)
+
+        self.assertEqual(self.client.get(self.detail_url)['X-Page-Cache'], 'miss')
+
+    def test_admin_spotlight_action_evicts_the_restaurant_pages(self):
+        for url in (self.list_url, self.detail_url, self.other_url):
+            self.client.get(url)
+
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass1234")
+        staff_client = Client()
+        staff_client.force_login(admin)
+        staff_client.post(reverse("admin:restaurants_restaurant_changelist"), {
+            "action": "add_to_spotlight", "_selected_action": [self.restaurant.pk],
+        })
+
+        self.assertTrue(Restaurant.objects.get(pk=self.restaurant.pk).spotlight)
+        for url in (self.list_url, self.detail_url):
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+        self.assertCached(self.other_url)
+
+    def test_menu_item_review_keeps_list_pages(self):
+        for url in (self.list_url, self.detail_url, self.menu_url):
+            self.client.get(url)
+
+        Review.objects.create(user=self.user, content_object=self.menu_item, rating=3)
+
+        self.assertEqual(self.client.get(self.menu_url)['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(self.detail_url)['X-Page-Cache'], 'miss')
+        self.assertCached(self.list_url)
+
+    def test_menu_item_change_evicts_its_restaurant(self):
+        self.client.get(self.detail_url)
+        self.client.get(self.other_url)
+        MenuItem.objects.create(name="Pizza", price=300, restaurant=self.restaurant, cuisine=self.cuisine)
+        self.assertContains(self.client.get(self.detail_url), "Pizza")
+        self.assertCached(self.other_url)
+
+    def test_cuisine_rename_evicts_all_pages(self):
+        self.client.get(self.other_url)
+        self.cuisine.name = "Tuscan"
+        self.cuisine.save()
+        self.assertEqual(self.client.get(self.other_url)['X-Page-Cache'], 'miss')
+
+    @override_settings(PAGE_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get(self.list_url)
+        self.assertNotIn('X-Page-Cache', self.client.get(self.list_url))
@@ -0,0 +1,92 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from restaurants.models import Restaurant, MenuItem, Cuisine
+from content.models import Review, Photo
+from interactions.models import Bookmark, Visited
+from myrestaurant.testing import QueryBudgetTestMixin
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RestaurantQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    urlconf = 'restaurants.urls'
+    query_budgets = {
+        'restaurant_list': 9,
+        'restaurant_detail': 11,
+        'menu_item_detail': 10,
+        'restaurant_reviews': 4,
+        'menu_item_reviews': 4,
+        'catalog_export': 7,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="budget", email="budget@example.com", password="pass1234")
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="pass1234")
+        cuisine = Cuisine.objects.create(name="Italian")
+
+        # Several rows of everything, so a per-row query shows up as a budget overrun.
+        for i in range(4):
+            restaurant = Restaurant.objects.create(
+                name=f"Place {i}", city="Test City", address=f"{i} Street",
+                cost_for_two=500, veg_type="veg", spotlight=i % 2 == 0,
+            )
+            restaurant.cuisines.add(cuisine)
+            Bookmark.objects.create(user=self.user, restaurant=restaurant)
+            Visited.objects.create(user=self.user, restaurant=restaurant)
+            for author in (self.user, self.other):
+                Review.objects.create(user=author, content_object=restaurant, rating=4)
+                Photo.objects.create(
+                    content_object=restaurant, uploaded_by=author,
+                    image=SimpleUploadedFile(f"r{i}.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+                )
+            for j in range(3):
+                item = MenuItem.objects.create(name=f"Dish {i}{j}", price=100, restaurant=restaurant, cuisine=cuisine)
+                Review.objects.create(user=self.other, content_object=item, rating=3)
+                Photo.objects.create(
+                    content_object=item, uploaded_by=self.other,
+                    image=SimpleUploadedFile(f"m{i}{j}.jpg", b"\x47\x49\x46", content_type="image/jpeg"),
+                )
+
+        self.restaurant = restaurant
+        self.menu_item = item
+        self.client.login(username="budget", password="pass1234")
+
+    def test_restaurant_list(self):
+        self.assertWithinQueryBudget(self.client.get(reverse('restaurants:restaurant_list')))
+
+    def test_restaurant_detail(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('restaurants:restaurant_detail', args=[self.restaurant.pk]))
+        )
+
+    def test_menu_item_detail(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('restaurants:menu_item_detail', args=[self.menu_item.pk]))
+        )
+
+    def test_restaurant_reviews(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('restaurants:restaurant_reviews', args=[self.restaurant.pk]))
+        )
+
+    def test_menu_item_reviews(self):
+        self.assertWithinQueryBudget(
+            self.client.get(reverse('restaurants:menu_item_reviews', args=[self.menu_item.pk]))
+        )
+
+    def test_catalog_export(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertWithinQueryBudget(self.client.get(reverse('restaurants:catalog_export')))
+
+    def test_metrics_are_reported_in_header_and_log(self):
+        with self.assertLogs('myrestaurant.sql', level='INFO') as logs:
+            response = self.client.get(reverse('restaurants:restaurant_list'))
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="9 queries", db-slowest;dur=[\d.]+$')
+        self.assertIn('view=restaurants:restaurant_list status=200 queries=9', logs.output[0])
@@ -1,7 +1,10 @@
+from datetime import timedelta
 from django.test import TestCase
 from django.urls import reverse
+from django.core.cache import cache
+from django.utils import timezone
 from restaurants.models import Restaurant, MenuItem, Cuisine
-from content.models import Photo
+from content.models import Photo, Review
 from interactions.models import Bookmark, Visited
 from django.contrib.auth import get_user_model
 
@@ -110,3 +113,73 @@ class RestaurantDetailViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         restaurant = response.context['restaurant']
         self.assertTrue(restaurant.is_visited)
+
+
+class RestaurantDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.restaurant = Restaurant.objects.create(
+            name="Test Restaurant", city="Test City", address="1 Street", cost_for_two=500, veg_type="veg",
+        )
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="pass1234")
+        self.url = reverse("restaurants:restaurant_detail", args=[self.restaurant.pk])
+
+    def revalidate(self, response):
+        return self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+
+    def test_unchanged_page_is_not_modified_after_one_query(self):
+        response = self.client.get(self.url)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(response).status_code, 304)
+
+    def test_new_review_makes_the_page_stale(self):
+        response = self.client.get(self.url)
+
+        Review.objects.create(user=self.user, content_object=self.restaurant, rating=5)
+
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_validators_do_not_depend_on_the_cache(self):
+        response = self.client.get(self.url)
+
+        # A worker with a cold cache of its own must agree with the one that rendered the page.
+        cache.clear()
+
+        self.assertEqual(self.revalidate(response).status_code, 304)
+
+    def test_restaurant_edit_makes_the_page_stale(self):
+        response = self.client.get(self.url)
+
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_own_bookmark_makes_the_page_stale(self):
+        self.client.login(username="testuser", password="pass1234")
+        response = self.client.get(self.url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(self.revalidate(response).status_code, 304)
+
+        Bookmark.objects.create(user=self.user, restaurant=self.restaurant)
+
+        revalidated = self.revalidate(response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertTrue(revalidated.context["restaurant"].is_bookmarked)
+
+    def test_validators_are_per_user(self):
+        anonymous = self.client.get(self.url)
+        self.client.login(username="testuser", password="pass1234")
+
+        self.assertEqual(self.revalidate(anonymous).status_code, 200)
+
+    def test_missing_restaurant_has_no_validators(self):
+        response = self.client.get(reverse("restaurants:restaurant_detail", args=[999]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
@@ -1,5 +1,5 @@
 from django.test import TestCase
-from restaurants.models import Restaurant, Cuisine, MenuItem
+from restaurants.models import Restaurant, Cuisine, MenuItem, RestaurantSearchDocument
 from content.models import Review
 from restaurants.filters import RestaurantFilter
 from django.contrib.auth import get_user_model
@@ -189,3 +189,60 @@ class RestaurantFilterTests(TestCase):
     def test_sort_by_cost_high_to_low(self):
         qs = RestaurantFilter({'ordering': '-cost_for_two'}).qs
         self.assertEqual(list(qs), [self.restaurant4, self.restaurant1, self.restaurant3, self.restaurant2])
+
+
+class RestaurantSearchTests(TestCase):
+    def setUp(self):
+        self.thai = Cuisine.objects.create(name='Thai')
+        self.pasta_place = Restaurant.objects.create(
+            name='Pasta Paradise', city='New York', cost_for_two=50, veg_type='veg', address="1 Main St"
+        )
+        self.noodle_bar = Restaurant.objects.create(
+            name='Noodle Bar', city='Boston', cost_for_two=30, veg_type='veg', address="2 Main St"
+        )
+        self.noodle_bar.cuisines.add(self.thai)
+        MenuItem.objects.create(restaurant=self.pasta_place, name='Spaghetti Carbonara', price=20)
+
+    def test_search_covers_cuisines_and_menu_items(self):
+        self.assertEqual(list(RestaurantFilter({'q': 'thai'}).qs), [self.noodle_bar])
+        self.assertEqual(list(RestaurantFilter({'q': 'carbonara'}).qs), [self.pasta_place])
+
+    def test_menu_item_typo_is_tolerated(self):
+        qs = RestaurantFilter({'menu_item': 'spagetti'}).qs
+        self.assertEqual(list(qs), [self.pasta_place])
+
+    def test_typo_does_not_match_unrelated_restaurants(self):
+        self.assertEqual(RestaurantFilter({'name': 'zzzzzz'}).qs.count(), 0)
+
+    def test_short_query_falls_back_to_substring_match(self):
+        self.assertEqual(list(RestaurantFilter({'city': 'bo'}).qs), [self.noodle_bar])
+
+    def test_search_results_are_ranked(self):
+        filterset = RestaurantFilter({'q': 'noodle'})
+        self.assertEqual(filterset.get_sort_key(), '-search_rank')
+        self.assertTrue(all(hasattr(r, 'search_rank') for r in filterset.qs))
+
+    def test_index_refreshes_on_menu_item_and_cuisine_changes(self):
+        item = MenuItem.objects.create(restaurant=self.noodle_bar, name='Pad Thai', price=12)
+        self.assertIn(self.noodle_bar, RestaurantFilter({'menu_item': 'pad thai'}).qs)
+        item.delete()
+        self.assertNotIn(self.noodle_bar, RestaurantFilter({'menu_item': 'pad thai'}).qs)
+
+        self.noodle_bar.cuisines.clear()
+        self.assertEqual(RestaurantFilter({'q': 'thai'}).qs.count(), 0)
+
+        self.thai.restaurants.add(self.pasta_place)
+        self.thai.name = 'Thai Street Food'
+        self.thai.save()
+        self.assertEqual(list(RestaurantFilter({'q': 'street food'}).qs), [self.pasta_place])
+
+    def test_deleting_restaurant_removes_its_document(self):
+        pk = self.pasta_place.pk
+        self.pasta_place.delete()
+        self.assertFalse(RestaurantSearchDocument.objects.filter(pk=pk).exists())
+
+    def test_index_refreshes_on_restaurant_rename(self):
+        self.pasta_place.name = 'Gnocchi House'
+        self.pasta_place.save()
+        self.assertEqual(list(RestaurantFilter({'name': 'gnocchi'}).qs), [self.pasta_place])
+        self.assertEqual(RestaurantFilter({'name': 'paradise'}).qs.count(), 0)
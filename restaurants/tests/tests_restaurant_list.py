@@ -1,9 +1,20 @@
-from django.test import TestCase, Client
+from unittest.mock import patch
+from django.test import TestCase, Client, override_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
 from django.core.files.uploadedfile import SimpleUploadedFile
 from restaurants.models import Restaurant, Cuisine, Photo
 from interactions.models import Bookmark
 from restaurants.views import RestaurantListView
+from restaurants.filters import RestaurantFilter
+from restaurants.spotlight import get_spotlight_restaurants
+from restaurants.pagination import encode_cursor
+from restaurants.cards import render_cards
+from django.db.models import Value
+from django.test.signals import template_rendered
+from content.models import RatingSummary, Review
 from django.contrib.auth import get_user_model
 
 # Create your tests here.
@@ -66,3 +77,242 @@ class RestaurantListViewTests(TestCase):
         for r in restaurants:
             self.assertTrue(hasattr(r, "is_bookmarked"), f"Restaurant {r.pk} missing 'is_bookmarked' attribute")
 
+
+class RestaurantListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reviewer", email="reviewer@example.com", password="pass1234")
+        costs = [300, 100, 300, 200, 100, 400, 300]
+        self.restaurants = []
+        for i, cost in enumerate(costs):
+            restaurant = Restaurant.objects.create(
+                name=f"Restaurant {i}",
+                city="Test City",
+                address="123 Street",
+                cost_for_two=cost,
+                veg_type="veg",
+            )
+            self.restaurants.append(restaurant)
+        for restaurant, rating in zip(self.restaurants, [4, 2, 4, 5]):
+            Review.objects.create(user=self.user, content_object=restaurant, rating=rating)
+        self.url = reverse('restaurants:restaurant_list')
+
+    def collect_pages(self, params):
+        seen = []
+        cursor = None
+        with patch.object(RestaurantListView, 'paginate_by', 3):
+            while True:
+                query = dict(params, cursor=cursor) if cursor else params
+                response = self.client.get(self.url, query)
+                seen.extend(r.pk for r in response.context['restaurants'])
+                cursor = response.context['page_obj'].next_cursor
+                if not cursor:
+                    return seen
+
+    def test_pages_cover_every_restaurant_once_for_each_ordering(self):
+        orderings = [{}, {'q': 'restaurant'}] + [
+            {'ordering': ordering} for ordering in ['avg_rating', '-avg_rating', 'cost_for_two', '-cost_for_two']
+        ]
+        for params in orderings:
+            with self.subTest(params=params):
+                full = RestaurantFilter(params).qs
+                sort_key = RestaurantFilter(params).get_sort_key()
+                expected = list(full.order_by(sort_key, '-pk' if sort_key.startswith('-') else 'pk').values_list('pk', flat=True))
+                self.assertEqual(self.collect_pages(params), expected)
+
+    def test_first_page_is_limited_to_page_size(self):
+        with patch.object(RestaurantListView, 'paginate_by', 3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['restaurants']), 3)
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertContains(response, 'id="load-more"')
+
+    def test_ajax_load_more_returns_cards_and_next_cursor(self):
+        with patch.object(RestaurantListView, 'paginate_by', 3):
+            cursor = self.client.get(self.url).context['page_obj'].next_cursor
+            response = self.client.get(self.url, {'cursor': cursor}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertIn('Restaurant 3', data['html'])
+        self.assertTrue(data['next_cursor'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_from_other_ordering_returns_404(self):
+        with patch.object(RestaurantListView, 'paginate_by', 3):
+            cursor = self.client.get(self.url).context['page_obj'].next_cursor
+            response = self.client.get(self.url, {'ordering': 'cost_for_two', 'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_forged_cursor_values_return_404(self):
+        for ordering, sort_key, value in [
+            ('', 'name', None),
+            ('cost_for_two', 'cost_for_two', 'abc'),
+            ('-avg_rating', '-avg_rating', 'abc'),
+            ('-avg_rating', '-avg_rating', [1]),
+        ]:
+            cursor = encode_cursor(sort_key, value, 1)
+            response = self.client.get(self.url, {'ordering': ordering, 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, (sort_key, value))
+
+class SpotlightRestaurantsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.spotlit = Restaurant.objects.create(
+            name="Spotlit", city="Test City", address="1 Street",
+            cost_for_two=500, veg_type="veg", spotlight=True,
+        )
+        self.regular = Restaurant.objects.create(
+            name="Regular", city="Other City", address="2 Street",
+            cost_for_two=300, veg_type="veg",
+        )
+        self.user = User.objects.create_user(username="spotuser", email="spot@example.com", password="pass1234")
+        self.url = reverse('restaurants:restaurant_list')
+
+    def test_spotlight_ignores_list_filters(self):
+        response = self.client.get(self.url, {'city': 'Other City'})
+        self.assertNotIn(self.spotlit, response.context['restaurants'])
+        self.assertIn(self.spotlit, response.context['spotlight_restaurants'])
+
+    def test_spotlight_is_served_from_cache(self):
+        get_spotlight_restaurants()
+        with self.assertNumQueries(0):
+            restaurants = get_spotlight_restaurants()
+        self.assertEqual([r.pk for r in restaurants], [self.spotlit.pk])
+
+    def test_toggling_spotlight_invalidates_cache(self):
+        get_spotlight_restaurants()
+        self.regular.spotlight = True
+        self.regular.save()
+        self.assertEqual({r.pk for r in get_spotlight_restaurants()}, {self.spotlit.pk, self.regular.pk})
+
+        self.spotlit.spotlight = False
+        self.spotlit.save()
+        self.assertEqual([r.pk for r in get_spotlight_restaurants()], [self.regular.pk])
+
+    def test_new_review_refreshes_cached_rating(self):
+        self.assertEqual(get_spotlight_restaurants()[0].avg_rating, 0)
+        Review.objects.create(user=self.user, content_object=self.spotlit, rating=4)
+        self.assertEqual(get_spotlight_restaurants()[0].avg_rating, 4.0)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_spotlight_bookmark_state_is_per_user(self):
+        Bookmark.objects.create(user=self.user, restaurant=self.spotlit)
+        self.client.get(self.url)
+
+        self.client.login(username="spotuser", password="pass1234")
+        response = self.client.get(self.url)
+        self.assertTrue(response.context['spotlight_restaurants'][0].is_bookmarked)
+
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+
+
+class CoverPhotoTests(TestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(
+            name="Covered", city="Test City", address="1 Street",
+            cost_for_two=500, veg_type="veg",
+        )
+
+    def add_photo(self, name):
+        return Photo.objects.create(
+            content_object=self.restaurant,
+            image=SimpleUploadedFile(name=name, content=b'\x47\x49\x46', content_type='image/jpeg'),
+        )
+
+    def test_first_photo_becomes_cover(self):
+        first = self.add_photo('first.jpg')
+        self.add_photo('second.jpg')
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.cover_photo, first)
+        self.assertEqual(self.restaurant.cover_image.name, first.image.name)
+
+    def test_deleting_cover_promotes_next_photo(self):
+        first = self.add_photo('first.jpg')
+        second = self.add_photo('second.jpg')
+        first.delete()
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.cover_photo, second)
+
+        second.delete()
+        self.restaurant.refresh_from_db()
+        self.assertIsNone(self.restaurant.cover_photo)
+        self.assertFalse(self.restaurant.cover_image)
+
+    def test_stale_instance_save_keeps_cover(self):
+        photo = self.add_photo('first.jpg')
+        self.restaurant.name = "Renamed"
+        self.restaurant.save()
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.cover_photo, photo)
+
+    def test_list_cards_issue_no_photo_queries(self):
+        for i in range(5):
+            restaurant = Restaurant.objects.create(
+                name=f"Extra {i}", city="Test City", address="1 Street",
+                cost_for_two=500, veg_type="veg",
+            )
+            Photo.objects.create(
+                content_object=restaurant,
+                image=SimpleUploadedFile(name=f'extra{i}.jpg', content=b'\x47\x49\x46', content_type='image/jpeg'),
+            )
+        self.client.get(reverse('restaurants:restaurant_list'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('restaurants:restaurant_list'))
+        self.assertFalse([q for q in queries if '"content_photo"' in q['sql']])
+
+
+class RestaurantCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.restaurant = Restaurant.objects.create(
+            name="Cached Bistro", city="Test City", address="1 Street",
+            cost_for_two=500, veg_type="veg",
+        )
+        self.user = User.objects.create_user(username="carduser", email="card@example.com", password="pass1234")
+        self.url = reverse('restaurants:restaurant_list')
+
+    def render(self):
+        restaurants = Restaurant.objects.with_rating().annotate(is_bookmarked=Value(False))
+        return render_cards(restaurants, None)
+
+    def test_card_body_is_reused_from_cache(self):
+        self.render()
+        rendered = []
+        record = lambda sender, template, context, **kwargs: rendered.append(template.name)
+        template_rendered.connect(record)
+        try:
+            html = self.render()
+        finally:
+            template_rendered.disconnect(record)
+        self.assertIn("Cached Bistro", html)
+        self.assertNotIn("partials/_restaurant_card.html", rendered)
+        self.assertIn("partials/_card_bookmark.html", rendered)
+
+    def test_review_refreshes_cached_rating(self):
+        self.assertIn("No user ratings", self.client.get(self.url).content.decode())
+        Review.objects.create(user=self.user, content_object=self.restaurant, rating=4)
+        self.assertContains(self.client.get(self.url), "⭐ 4.0")
+
+    def test_bookmark_state_is_not_shared_between_users(self):
+        Bookmark.objects.create(user=self.user, restaurant=self.restaurant)
+        self.client.login(username="carduser", password="pass1234")
+        self.assertContains(self.client.get(self.url), "bi-bookmark-fill")
+
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "bi-bookmark-fill")
+        self.assertContains(response, "Login to bookmark")
+
+    def test_rating_change_refreshes_card_without_signals(self):
+        Review.objects.create(user=self.user, content_object=self.restaurant, rating=4)
+        self.assertIn("⭐ 4.0", self.render())
+
+        # Another worker's cache would not have seen any invalidation; the key alone must move.
+        RatingSummary.objects.for_instance(self.restaurant).update(average=2.0, review_count=2)
+
+        self.assertIn("⭐ 2.0", self.render())
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from restaurants.models import Restaurant, MenuItem
+from restaurants.views import ReviewFeedView
+from restaurants.pagination import encode_cursor
+from restaurants.templatetags.app_filters import review_feed_url
+from content.models import Review
+
+User = get_user_model()
+
+
+class ReviewFeedViewTests(TestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(
+            name="Feed Place", city="Pune", address="1 Street", cost_for_two=500, veg_type="veg",
+        )
+        self.menu_item = MenuItem.objects.create(restaurant=self.restaurant, name="Pasta", price=250)
+        self.url = reverse("restaurants:restaurant_reviews", args=[self.restaurant.pk])
+
+        # Pairs of reviews share a timestamp, so pages have to break ties on the id.
+        now = timezone.now()
+        for i in range(12):
+            author = User.objects.create_user(username=f"critic{i:02}", email=f"critic{i}@example.com")
+            review = Review.objects.create(user=author, content_object=self.restaurant, rating=i % 5 + 1, comment=f"#{i}")
+            Review.objects.filter(pk=review.pk).update(created_at=now - timedelta(minutes=i // 2))
+
+        self.newest_first = list(
+            Review.objects.filter(object_id=self.restaurant.pk).order_by("-created_at", "-id").values_list("comment", flat=True)
+        )
+
+    def walk(self, **params):
+        comments, url, pages = [], self.url, 0
+        while url:
+            data = self.client.get(url, {**params, "format": "json"} if pages == 0 else None).json()
+            comments += [review["comment"] for review in data["reviews"]]
+            url, pages = data["next"], pages + 1
+        return comments, pages
+
+    def test_pages_cover_every_review_once_newest_first(self):
+        comments, pages = self.walk()
+
+        self.assertEqual(comments, self.newest_first)
+        self.assertEqual(pages, 2)
+
+    def test_rating_filter(self):
+        comments, _ = self.walk(rating=["1", "5"])
+
+        expected = Review.objects.filter(rating__in=[1, 5]).order_by("-created_at", "-id")
+        self.assertEqual(comments, [review.comment for review in expected])
+
+    def test_invalid_rating_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"rating": "6"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"rating": "four"}).status_code, 400)
+
+    def test_html_fragment_links_to_the_next_page(self):
+        response = self.client.get(self.url)
+
+        self.assertTemplateUsed(response, "partials/_review_feed.html")
+        self.assertContains(response, "critic00")
+        self.assertContains(response, "data-review-feed-more")
+
+        next_url = response.context["next_url"]
+        last_page = self.client.get(next_url)
+        self.assertNotContains(last_page, "data-review-feed-more")
+        self.assertContains(last_page, "critic11")
+
+    def test_detail_page_continues_the_feed_after_its_latest_reviews(self):
+        response = self.client.get(reverse("restaurants:restaurant_detail", args=[self.restaurant.pk]))
+        self.assertContains(response, "data-review-feed-more")
+
+        latest = Review.objects.filter(object_id=self.restaurant.pk)[2]
+        data = self.client.get(review_feed_url(self.restaurant, after=latest) + "&format=json").json()
+
+        self.assertEqual([review["comment"] for review in data["reviews"]], self.newest_first[3:3 + ReviewFeedView.paginate_by])
+
+    def test_menu_item_feed(self):
+        Review.objects.create(user=User.objects.first(), content_object=self.menu_item, rating=4, comment="Tasty")
+
+        data = self.client.get(reverse("restaurants:menu_item_reviews", args=[self.menu_item.pk]), {"format": "json"}).json()
+
+        self.assertEqual([review["comment"] for review in data["reviews"]], ["Tasty"])
+        self.assertIsNone(data["next_cursor"])
+
+    def test_unknown_object_and_bad_cursor_are_404(self):
+        self.assertEqual(self.client.get(reverse("restaurants:restaurant_reviews", args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code, 404)
+
+    def test_tampered_cursor_is_404(self):
+        for value in (None, "yesterday", "2024-13-45T99:00:00", 1700000000, ["2024-01-01"]):
+            response = self.client.get(self.url, {"cursor": encode_cursor("-created_at", value, 1)})
+            self.assertEqual(response.status_code, 404, value)
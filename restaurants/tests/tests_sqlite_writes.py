@@ -0,0 +1,105 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from myrestaurant import settings as project_settings
+from myrestaurant.writes import serialized_write
+from restaurants.models import Restaurant
+
+User = get_user_model()
+
+
+class SQLitePerformanceModeTests(SimpleTestCase):
+    def test_performance_mode_tunes_every_new_connection(self):
+        path = os.path.join(tempfile.mkdtemp(), "tuned.sqlite3")
+        with mock.patch.object(project_settings, "SQLITE_PERFORMANCE_MODE", True):
+            database = project_settings.database_from_url(f"sqlite:///{path}")
+        self.assertEqual(database["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+
+        wrapper = DatabaseWrapper(
+            {**database, "TIME_ZONE": None, "AUTOCOMMIT": True, "ATOMIC_REQUESTS": False}, alias="tuned"
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                pragmas = {}
+                for pragma in ("journal_mode", "synchronous", "busy_timeout", "cache_size"):
+                    cursor.execute(f"PRAGMA {pragma}")
+                    pragmas[pragma] = cursor.fetchone()[0]
+        finally:
+            wrapper.close()
+
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "cache_size": -20000})
+
+    def test_stock_connections_are_left_alone(self):
+        with mock.patch.object(project_settings, "SQLITE_PERFORMANCE_MODE", False):
+            database = project_settings.database_from_url("sqlite:///db.sqlite3")
+        self.assertEqual(database["OPTIONS"], {})
+
+
+@override_settings(SQLITE_WRITE_RETRIES=3, SQLITE_WRITE_BACKOFF=0)
+class SerializedWriteTests(TransactionTestCase):
+    def flaky(self, failures, message="database is locked"):
+        calls = []
+
+        @serialized_write
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return Restaurant.objects.create(name="Queued", city="Pune", address="1 Street", cost_for_two=1, veg_type="veg")
+
+        return write, calls
+
+    def test_locked_writes_are_retried(self):
+        write, calls = self.flaky(failures=2)
+
+        self.assertEqual(write().name, "Queued")
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_the_configured_retries(self):
+        write, calls = self.flaky(failures=10)
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 4)
+        self.assertFalse(Restaurant.objects.exists())
+
+    async def test_coroutines_are_retried_without_a_transaction(self):
+        calls = []
+
+        @serialized_write
+        async def write():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return await Restaurant.objects.acreate(
+                name="Queued", city="Pune", address="1 Street", cost_for_two=1, veg_type="veg"
+            )
+
+        self.assertEqual((await write()).name, "Queued")
+        self.assertEqual(len(calls), 2)
+
+    def test_other_errors_are_not_retried(self):
+        write, calls = self.flaky(failures=1, message="no such table: nowhere")
+
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+
+class BenchmarkWritesTests(TransactionTestCase):
+    def test_reports_both_modes(self):
+        User.objects.create_user(username="writer", email="writer@example.com", password="pass1234")
+        Restaurant.objects.create(name="Busy", city="Pune", address="1 Street", cost_for_two=1, veg_type="veg")
+
+        out = StringIO()
+        call_command("benchmark_writes", threads=2, duration=0.2, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertIn("writes/s", lines[0])
+        self.assertEqual([line.split()[0] for line in lines[1:]], ["default", "tuned"])
@@ -1,10 +1,14 @@
 from django.urls import path
 from . import views
+from .models import Restaurant, MenuItem
 
 app_name = 'restaurants'
 
 urlpatterns = [
     path('', views.RestaurantListView.as_view(), name="restaurant_list"),
     path('restaurant/<int:pk>/', views.RestaurantDetailView.as_view(), name="restaurant_detail"),
+    path('restaurant/<int:pk>/reviews/', views.ReviewFeedView.as_view(model=Restaurant), name="restaurant_reviews"),
     path('menu/<int:menu_id>/', views.MenuItemDetailView.as_view(), name='menu_item_detail'),
+    path('menu/<int:menu_id>/reviews/', views.ReviewFeedView.as_view(model=MenuItem, pk_url_kwarg='menu_id'), name='menu_item_reviews'),
+    path('export/', views.CatalogExportView.as_view(), name='catalog_export'),
 ]
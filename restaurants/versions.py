@@ -0,0 +1,38 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def bump_versions(keys):
+    """
+    Move each version key to a fresh value, retiring everything cached under the old one.
+
+    Inside a transaction the keys move again once it commits: a concurrent
+    request may have cached the rows as they were under the first new value.
+    """
+    keys = list(keys)
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, None)
+
+    if transaction.get_connection().in_atomic_block:
+        bump()
+    transaction.on_commit(bump)
+
+
+def get_versions(keys):
+    """Current value of each version key, creating any that are missing."""
+    keys = list(keys)
+    found = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # A lost version must never fall back to one an older entry was cached under.
+        version = time.time_ns()
+        for key in missing:
+            cache.add(key, version, None)
+        found.update(cache.get_many(missing))
+
+    return {key: found.get(key) for key in keys}
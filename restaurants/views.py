@@ -1,72 +1,64 @@
-from django.shortcuts import redirect
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import ListView, DetailView
-from django.db.models import Avg, Prefetch
-from django.db.models.functions import Coalesce
+from django.db.models import OuterRef, Prefetch, Subquery
 from restaurants.models import Restaurant, MenuItem
 from interactions.views import BookmarkAnnotationMixin, VisitedAnnotationMixin
 from content.forms import ReviewForm
 from django.contrib.contenttypes.models import ContentType
-from content.models import Review, Photo
-from django.db import IntegrityError
+from content.models import Review, Photo, RatingSummary
+from content.renditions import attach_cover_renditions
+from content.views import render_reviews
 from django.urls import reverse
 from django.contrib import messages
 from restaurants.filters import RestaurantFilter
-from django.http import JsonResponse
+from restaurants.pagination import KeysetPaginator
+from restaurants.page_cache import AnonymousPageCacheMixin, ConditionalPageMixin, LIST_TAG, restaurant_tag, menu_item_tag
+from restaurants.spotlight import get_spotlight_restaurants
+from django.http import Http404, JsonResponse, StreamingHttpResponse, HttpResponseBadRequest
 from django.template.loader import render_to_string
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.views import View
+from restaurants.exports import EXPORT_FORMATS, EXPORT_KINDS, export_catalog
+from myrestaurant.writes import serialized_write
 
 # Create your views here.
 class ReviewHandleMixin:
+    """
+    Save a review of the page's object.
+
+    Only the object's existence is checked, the review is written with one
+    upsert, and an AJAX post gets back just the reviews fragment and the new
+    rating summary instead of a rebuild of the whole page.
+    """
+
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
+        target = get_object_or_404(self.model.objects.only('pk'), pk=self.kwargs[self.pk_url_kwarg])
+        content_type = ContentType.objects.get_for_model(target)
+        is_ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
-        content_type = ContentType.objects.get_for_model(self.object)
-        object_id = self.object.pk
+        form = ReviewForm(request.POST)
+        if form.is_valid():
+            review = serialized_write(Review.objects.upsert)(
+                request.user, content_type, target.pk, **form.cleaned_data
+            )
+            if not is_ajax:
+                return redirect(target.get_absolute_url())
+            html, rating = render_reviews(request, target, ReviewForm(instance=review))
+            return JsonResponse({"status": "success", "html": html, "rating": rating})
 
+        # Keep the "Edit Your Review" state of the form while showing its errors.
         existing_review = Review.objects.filter(
-            user=self.request.user,
-            content_type=content_type,
-            object_id=object_id
+            user=request.user, content_type=content_type, object_id=target.pk
         ).first()
+        if existing_review is not None:
+            form.instance = existing_review
 
-        form = ReviewForm(request.POST, instance=existing_review)
-
-        if form.is_valid():
-            try:
-                review = form.save(commit=False)
-                review.user = request.user
-                review.content_type = content_type
-                review.object_id = object_id
-                review.save()
-
-                if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-                    html = render_to_string(
-                        "partials/_reviews.html",
-                        self.get_context_data(),
-                        request=request
-                    )
-                    return JsonResponse({"status": "success", "html": html})
-                return redirect(self.object.get_absolute_url())
-
-            except IntegrityError:
-                if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-                    form = ReviewForm(request.POST)
-                    form.add_error(None, "You have already submitted a review for this item.")
-                    html = render_to_string(
-                        "partials/_reviews.html",
-                        self.get_context_data(form=form),
-                        request=request
-                    )
-                    return JsonResponse({"status": "error", "html": html})
-                return redirect(self.object.get_absolute_url())
-
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            html = render_to_string(
-                "partials/_reviews.html",
-                self.get_context_data(form=form),
-                request=request
-            )
-            return JsonResponse({"status": "error", "html": html})
+        if is_ajax:
+            html, rating = render_reviews(request, target, form)
+            return JsonResponse({"status": "error", "html": html, "rating": rating})
 
+        self.object = self.get_object()
         return self.render_to_response(self.get_context_data(form=form))
 
 class UserReviewFormMixin:
@@ -87,41 +79,89 @@ class BaseDetailView(UserReviewFormMixin, DetailView):
         else:
             context["review_form"] = self.get_review_form(obj)
 
-        context["latest_reviews"] = obj.reviews.all()[:3]
+        context["latest_reviews"] = obj.reviews.select_related("user")[:3]
         return context
 
-class RestaurantListView(BookmarkAnnotationMixin, ListView):
+class RestaurantListView(AnonymousPageCacheMixin, BookmarkAnnotationMixin, ListView):
     model = Restaurant
     template_name = 'restaurants/restaurant_list.html'
     context_object_name = 'restaurants'
+    paginate_by = 24
+    read_from_replica = True
+
+    def get_page_cache_tags(self):
+        return [LIST_TAG]
 
     def get_queryset(self):
         queryset= (
             Restaurant.objects
-            .prefetch_related('cuisines', 'photos')
-            .annotate(avg_rating=Coalesce(Avg('reviews__rating'), 0.0))
+            .prefetch_related('cuisines')
+            .with_rating()
         )
         queryset = self.annotate_with_bookmarks(queryset)
 
         self.filterset = RestaurantFilter(self.request.GET, queryset=queryset)
 
-        return self.filterset.qs.distinct()
+        return self.filterset.qs
 
-    def get_context_data(self, **kwargs):
+    def paginate_queryset(self, queryset, page_size):
+        # get() has already loaded the page with the async ORM.
+        self.page.object_list = attach_cover_renditions(self.page.object_list)
+        return self.paginator, self.page, self.page.object_list, self.page.has_next()
+
+    async def get(self, request, *args, **kwargs):
+        # Validating the filter form reads the cuisine table, so the queryset is built in a worker thread.
+        self.object_list = await sync_to_async(self.get_queryset)()
+        self.paginator = KeysetPaginator(self.object_list, self.filterset.get_sort_key(), self.paginate_by)
+        self.page = await self.paginator.apage(request.GET.get('cursor'))
+
+        if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+            context = await sync_to_async(self.get_context_data)()
+            return self.render_to_response(context)
+
+        context = await sync_to_async(self.get_context_data)(include_spotlight=False)
+        html = await sync_to_async(render_to_string)(
+            "partials/_restaurant_cards.html",
+            context,
+            request=request
+        )
+        return JsonResponse({
+            "status": "success",
+            "html": html,
+            "next_cursor": context["page_obj"].next_cursor,
+        })
+
+    def get_context_data(self, include_spotlight=True, **kwargs):
         context = super().get_context_data(**kwargs)
 
         context['filter'] = self.filterset
-        
-        context['spotlight_restaurants'] = [
-            restaurant for restaurant in self.object_list if restaurant.spotlight
-        ]
+
+        query = self.request.GET.copy()
+        query.pop('cursor', None)
+        context['filter_query'] = query.urlencode()
+
+        if include_spotlight:
+            context['spotlight_restaurants'] = self.mark_bookmarked(get_spotlight_restaurants())
 
         return context
 
-class RestaurantDetailView(BookmarkAnnotationMixin,VisitedAnnotationMixin, BaseDetailView, ReviewHandleMixin):
+class RestaurantDetailView(ConditionalPageMixin, AnonymousPageCacheMixin, BookmarkAnnotationMixin,VisitedAnnotationMixin, BaseDetailView, ReviewHandleMixin):
     model = Restaurant
     template_name = "restaurants/restaurant_detail.html"
     context_object_name = "restaurant"
+    read_from_replica = True
+
+    def get_page_cache_tags(self):
+        return [restaurant_tag(self.kwargs['pk'])]
+
+    def get_viewer_state_queryset(self):
+        # The page also lists the menu with each dish's rating.
+        menu_ratings = RatingSummary.objects.filter(menu_item__restaurant=OuterRef("pk")).order_by("-updated_at")
+        queryset = super().get_viewer_state_queryset().annotate(
+            menu_rating_updated_at=Subquery(menu_ratings.values("updated_at")[:1])
+        )
+        queryset = self.annotate_with_bookmarks(queryset)
+        return self.annotate_with_visited(queryset)
 
     def get_queryset(self):
         queryset = (Restaurant.objects
@@ -130,7 +170,7 @@ class RestaurantDetailView(BookmarkAnnotationMixin,VisitedAnnotationMixin, BaseD
                 self._prefetch_photos(),
                 self._prefetch_menu_items(),
             )
-            .annotate(avg_rating=Coalesce(Avg("reviews__rating"), 0.0))
+            .with_rating()
         )
         queryset = self.annotate_with_bookmarks(queryset)
 
@@ -138,31 +178,37 @@ class RestaurantDetailView(BookmarkAnnotationMixin,VisitedAnnotationMixin, BaseD
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        photos = list(self.object.photos.order_by('id'))
+        photos = list(self.object.photos.all())
         context["main_photo"] = photos[0] if photos else None
         context["extra_photos"] = photos[1:] if len(photos) > 1 else []
-        context["menu_items"] = self.object.menu_items.all()
+        context["menu_items"] = attach_cover_renditions(self.object.menu_items.all())
         return context
 
     def _prefetch_photos(self):
         return Prefetch(
             "photos",
-            queryset=Photo.objects.only("id", "image", "object_id")
+            queryset=Photo.objects.only("id", "image", "content_type", "object_id").order_by("id").prefetch_related("renditions")
         )
 
     def _prefetch_menu_items(self):
         return Prefetch(
             "menu_items",
-            queryset=MenuItem.objects.prefetch_related(
-                self._prefetch_photos()
-            ).annotate(avg_rating=Coalesce(Avg("reviews__rating"), 0.0))
+            queryset=MenuItem.objects.with_rating()
         )
 
-class MenuItemDetailView(BaseDetailView, ReviewHandleMixin):
+class MenuItemDetailView(ConditionalPageMixin, AnonymousPageCacheMixin, BaseDetailView, ReviewHandleMixin):
     model = MenuItem
     template_name = 'restaurants/menu_item_detail.html'
     context_object_name = 'menu_item'
     pk_url_kwarg = "menu_id"
+    read_from_replica = True
+    # Menu items carry no timestamp of their own.
+    validator_fields = (
+        "name", "description", "price", "is_available", "cuisine_id", "restaurant__updated_at",
+    )
+
+    def get_page_cache_tags(self):
+        return [menu_item_tag(self.kwargs['menu_id'])]
 
     def get_object(self, queryset=None):
         menu_id = self.kwargs.get('menu_id')
@@ -178,14 +224,15 @@ class MenuItemDetailView(BaseDetailView, ReviewHandleMixin):
         context.update({
             "restaurant": menu_item.restaurant,
             "menu_photo": menu_item.photos.all().first(),
-            "related_items": self._get_related_items(menu_item),
+            "related_items": attach_cover_renditions(self._get_related_items(menu_item)),
             "avg_rating": menu_item.avg_rating,
     })
         return context
 
     def _get_related_items(self, menu_item):
         return (
-            self._menuitem_with_details()
+            MenuItem.objects
+            .with_rating()
             .filter(
                 cuisine=menu_item.cuisine,
                 restaurant=menu_item.restaurant
@@ -197,11 +244,83 @@ class MenuItemDetailView(BaseDetailView, ReviewHandleMixin):
         return (
             MenuItem.objects
             .select_related('restaurant', 'cuisine')
-            .annotate(avg_rating=Avg('reviews__rating'))
+            .with_rating()
             .prefetch_related(
                 Prefetch(
                     'photos',
-                    queryset=Photo.objects.only('id', 'image', 'object_id').order_by('id')
+                    queryset=Photo.objects.only('id', 'image', 'content_type', 'object_id').order_by('id').prefetch_related('renditions')
                 )
             )
         )
+
+class ReviewFeedView(View):
+    """
+    Newest first reviews of one restaurant or menu item, a keyset page at a time.
+
+    ``?rating=`` (repeatable) keeps only those star ratings. The page comes
+    back as card HTML for infinite scroll, or as JSON with ``?format=json``.
+    """
+
+    model = None
+    pk_url_kwarg = 'pk'
+    paginate_by = 10
+    read_from_replica = True
+    http_method_names = ['get', 'head']
+
+    def get(self, request, *args, **kwargs):
+        pk = self.kwargs[self.pk_url_kwarg]
+        if not self.model.objects.filter(pk=pk).exists():
+            raise Http404
+        ratings = request.GET.getlist('rating')
+        if not set(ratings) <= {'1', '2', '3', '4', '5'}:
+            return HttpResponseBadRequest("rating must be a whole number from 1 to 5.")
+
+        reviews = Review.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.model), object_id=pk
+        ).select_related('user')
+        if ratings:
+            reviews = reviews.filter(rating__in=ratings)
+        page = KeysetPaginator(reviews, '-created_at', self.paginate_by).page(request.GET.get('cursor'))
+
+        next_url = None
+        if page.has_next():
+            query = request.GET.copy()
+            query['cursor'] = page.next_cursor
+            next_url = f"{request.path}?{query.urlencode()}"
+
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                "reviews": [
+                    {
+                        "id": review.pk,
+                        "user": review.user.username,
+                        "rating": review.rating,
+                        "comment": review.comment,
+                        "created_at": review.created_at.isoformat(),
+                    }
+                    for review in page
+                ],
+                "next_cursor": page.next_cursor,
+                "next": next_url,
+            })
+        return render(request, 'partials/_review_feed.html', {"reviews": page, "next_url": next_url})
+
+
+class CatalogExportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Stream the whole catalog as CSV or JSONL for staff, chunk by chunk."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        format = request.GET.get('format', 'jsonl')
+        kind = request.GET.get('kind', 'restaurants')
+        if format not in EXPORT_FORMATS or kind not in EXPORT_KINDS:
+            return HttpResponseBadRequest("Unknown export format or kind.")
+
+        response = StreamingHttpResponse(
+            export_catalog(format, kind),
+            content_type=f"{EXPORT_FORMATS[format]}; charset=utf-8",
+        )
+        response['Content-Disposition'] = f'attachment; filename="{kind}.{format}"'
+        return response